@@ -0,0 +1 @@
+"""Benchmarks for the Bangla FAQ chatbot on synthetic corpora"""
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recall and latency of MinHash LSH retrieval against exhaustive search
+
+Usage:
+    python3 benchmarks/bench_lsh.py --size 50000 --queries 300
+    python3 benchmarks/bench_lsh.py --configs 32x2 16x4 64x1
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.faq_retriever import FAQRetriever
+from benchmarks.synthetic_corpus import generate_faqs, generate_queries, write_faqs, percentile
+
+
+def time_queries(retriever, queries, top_k, mode):
+    """Run queries and return (results per query, latencies in ms)"""
+    results, latencies = [], []
+    for item in queries:
+        start = time.perf_counter()
+        ranked = retriever.retrieve(item['query'], top_k=top_k, mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([faq['id'] for faq, _ in ranked])
+    return results, latencies
+
+
+def recall_at_k(approx, exact):
+    """Mean fraction of exact top-k ids found by the approximate search"""
+    total = 0.0
+    for found, expected in zip(approx, exact):
+        total += len(set(found) & set(expected)) / len(expected) if expected else 1.0
+    return total / len(exact) if exact else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=20000, help='Number of synthetic FAQs')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--configs', nargs='+', default=['32x2', '16x4', '64x1'],
+                        help='LSH configurations as BANDSxROWS')
+    args = parser.parse_args()
+
+    faqs = generate_faqs(args.size)
+    queries = generate_queries(faqs, args.queries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_faqs(faqs, os.path.join(tmp, 'faqs.json'))
+        retriever = FAQRetriever(path)
+
+        exact, exact_ms = time_queries(retriever, queries, args.top_k, 'exact')
+        _, pruned_ms = time_queries(retriever, queries, args.top_k, 'pruned')
+
+        print(f"FAQs: {args.size}  queries: {args.queries}  top_k: {args.top_k}\n")
+        print(f"{'mode':<14}{'recall@k':>10}{'mean ms':>10}{'p95 ms':>10}{'build s':>10}{'cand/q':>10}")
+        print(f"{'exact':<14}{1.0:>10.3f}{sum(exact_ms) / len(exact_ms):>10.2f}{percentile(exact_ms, 95):>10.2f}")
+        print(f"{'pruned':<14}{1.0:>10.3f}{sum(pruned_ms) / len(pruned_ms):>10.2f}{percentile(pruned_ms, 95):>10.2f}")
+
+        for config in args.configs:
+            bands, rows = (int(value) for value in config.lower().split('x'))
+            retriever.lsh_bands, retriever.lsh_rows = bands, rows
+            start = time.perf_counter()
+            retriever._ensure_lsh()
+            build_s = time.perf_counter() - start
+
+            retriever.stats.clear()
+            approx, lsh_ms = time_queries(retriever, queries, args.top_k, 'lsh')
+            candidates = retriever.get_stats().get('lsh_candidates', 0) / len(queries)
+            print(
+                f"{'lsh ' + config:<14}{recall_at_k(approx, exact):>10.3f}"
+                f"{sum(lsh_ms) / len(lsh_ms):>10.2f}{percentile(lsh_ms, 95):>10.2f}"
+                f"{build_s:>10.2f}{candidates:>10.0f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
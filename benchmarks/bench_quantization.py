@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Memory and recall@k of quantized embedding storage against float32
+
+Without --faqs, clustered unit vectors stand in for sentence embeddings
+(sentence-transformers is optional). With --faqs and sentence-transformers
+installed, FAQ questions are embedded and other questions are the queries.
+
+Usage:
+    python3 benchmarks/bench_quantization.py --size 100000 --dim 384
+    python3 benchmarks/bench_quantization.py --faqs data/bangla_faqs.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.vector_index import QuantizedVectorIndex, SentenceEmbedder, recall_at_k
+from benchmarks.synthetic_corpus import percentile
+
+
+def synthetic_embeddings(size, dim, clusters=256, seed=42):
+    """Unit vectors drawn around random cluster centers (like topical embeddings)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def faq_embeddings(path):
+    """Embed FAQ questions with the default sentence-transformers model"""
+    with open(path, 'r', encoding='utf-8') as f:
+        faqs = json.load(f)
+    return SentenceEmbedder().encode([faq.get('question', '') for faq in faqs])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=50000, help='Synthetic vectors')
+    parser.add_argument('--dim', type=int, default=384, help='Synthetic dimension')
+    parser.add_argument('--faqs', help='Embed this FAQ database instead (needs sentence-transformers)')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--rerank', type=int, default=100, help='Candidates re-scored exactly')
+    parser.add_argument('--subspaces', type=int, nargs='+', default=[16, 48])
+    args = parser.parse_args()
+
+    vectors = faq_embeddings(args.faqs) if args.faqs else synthetic_embeddings(args.size, args.dim)
+    rng = np.random.default_rng(7)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    configs = [('none', None, None), ('int8', None, None), ('int8', None, args.rerank)]
+    for subspaces in args.subspaces:
+        configs += [('pq', subspaces, None), ('pq', subspaces, args.rerank)]
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.k}")
+    print(f"{'storage':<12} {'rerank':>6} {'memory MB':>10} {'vs f32':>7} {'recall':>7} {'p50 ms':>7} {'p95 ms':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantization, subspaces, rerank in configs:
+            start = time.perf_counter()
+            index = QuantizedVectorIndex.build(
+                vectors, quantization, rerank_path=os.path.join(tmp, 'vectors.npy') if rerank else None,
+                subspaces=subspaces or 16
+            )
+            build_s = time.perf_counter() - start
+
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, args.k, rerank)
+                latencies.append((time.perf_counter() - start) * 1000)
+            recall = recall_at_k(index, vectors, queries, args.k, rerank)
+
+            stats = index.get_stats()
+            label = quantization + (f"/{subspaces}" if subspaces else '')
+            print(
+                f"{label:<12} {rerank or '-':>6} {stats['memory_bytes'] / 2**20:>10.2f} "
+                f"{stats['memory_bytes'] / stats['float32_bytes']:>7.3f} {recall:>7.3f} "
+                f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f}  (build {build_s:.1f}s)"
+            )
+
+
+if __name__ == '__main__':
+    main()
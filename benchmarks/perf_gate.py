@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Performance regression gate: throughput and peak allocations against a baseline
+
+Each workload runs on a fixed-seed synthetic corpus. Throughput is the
+best of several timed rounds, divided by a pure-Python calibration loop
+so a baseline recorded on one machine roughly carries over to another.
+Peak allocations are measured with tracemalloc in a separate round.
+
+Usage:
+    python3 benchmarks/perf_gate.py              # compare with the baseline
+    python3 benchmarks/perf_gate.py --refresh    # record a new baseline
+    PERF_TESTS=1 python3 -m pytest -q tests/test_performance.py
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bangla_processor import BanglaProcessor
+from src.chatbot import BanglaFAQChatbot
+from src.faq_index import FAQIndex
+from src.faq_retriever import FAQRetriever
+from benchmarks.synthetic_corpus import generate_faqs, generate_queries, write_faqs
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_baseline.json')
+
+# Corpus and workload sizes (changing them requires a baseline refresh)
+CORPUS_SIZE = 5000
+QUERY_COUNT = 200
+ROUNDS = 5
+
+# Allowed relative change before a workload counts as regressed
+DEFAULT_TOLERANCE = {'ops_per_sec': 0.30, 'peak_kb': 0.25}
+
+
+def calibration_loop() -> List[Tuple[str, int]]:
+    """Fixed pure-Python work (dict, str and list operations) used as the machine's unit of speed"""
+    counts = {}
+    for i in range(50000):
+        key = str(i % 500)
+        counts[key] = counts.get(key, 0) + 1
+    return sorted(counts.items())
+
+
+def _timed(operation: Callable[[], object]) -> float:
+    """Wall time of one call in seconds"""
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+
+def build_workloads(tmp_dir: str) -> Dict[str, Tuple[Callable[[], object], int, Optional[Callable[[], None]]]]:
+    """
+    Create the measured workloads
+
+    Returns:
+        Dict of name -> (operation, operations per call, optional reset before each call)
+    """
+    faqs = generate_faqs(CORPUS_SIZE)
+    queries = generate_queries(faqs, QUERY_COUNT)
+    faq_path = write_faqs(faqs, os.path.join(tmp_dir, 'perf_faqs.json'))
+    questions = [faq['question'] for faq in faqs[:QUERY_COUNT * 5]]
+
+    retriever = FAQRetriever(faq_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        chatbot = BanglaFAQChatbot(faq_path)
+
+    def tokenize():
+        for question in questions:
+            BanglaProcessor.tokenize(question.lower())
+
+    def retrieve():
+        for item in queries:
+            retriever.retrieve(item['query'], top_k=5)
+
+    def generate_answer():
+        for item in queries:
+            chatbot.generate_answer(item['query'], item['topic'])
+
+    def build_index():
+        FAQIndex(faqs)
+
+    # Answers are cached per query; clear the cache to measure the full pipeline
+    return {
+        'tokenize': (tokenize, len(questions), None),
+        'retrieve': (retrieve, len(queries), None),
+        'generate_answer': (generate_answer, len(queries), chatbot.answer_cache.clear),
+        'build_index': (build_index, 1, None),
+    }
+
+
+def measure(rounds: int = ROUNDS) -> Dict:
+    """
+    Run every workload
+
+    Returns:
+        Dict with the calibration score and per-workload ops_per_sec,
+        normalized throughput and peak_kb
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workloads = build_workloads(tmp)
+        # Calibration rounds are interleaved with the workloads, so both
+        # see the same machine load; best times filter out interruptions
+        calibration_times, best = [], {}
+        for name, (operation, ops, reset) in workloads.items():
+            times = []
+            for _ in range(rounds):
+                if reset:
+                    reset()
+                times.append(_timed(operation))
+                calibration_times.append(_timed(calibration_loop))
+            best[name] = min(times)
+        calibration = 1.0 / min(calibration_times)
+
+        for name, (operation, ops, reset) in workloads.items():
+            ops_per_sec = ops / best[name]
+
+            if reset:
+                reset()
+            tracemalloc.start()
+            try:
+                operation()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            results[name] = {
+                'ops_per_sec': round(ops_per_sec, 1),
+                'normalized': round(ops_per_sec / calibration, 6),
+                'peak_kb': round(peak / 1024, 1),
+            }
+    return {'calibration': round(calibration, 2), 'workloads': results}
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """
+    Compare measurements with a baseline
+
+    Returns:
+        Regression messages (empty if within tolerance)
+    """
+    tolerance = {**DEFAULT_TOLERANCE, **baseline.get('tolerance', {})}
+    regressions = []
+    for name, expected in baseline.get('workloads', {}).items():
+        measured = current['workloads'].get(name)
+        if measured is None:
+            regressions.append(f"{name}: workload missing")
+            continue
+        floor = expected['normalized'] * (1 - tolerance['ops_per_sec'])
+        if measured['normalized'] < floor:
+            regressions.append(
+                f"{name}: {measured['normalized']:.6f} normalized ops/sec, baseline "
+                f"{expected['normalized']:.6f} (-{tolerance['ops_per_sec']:.0%} allowed)"
+            )
+        ceiling = expected['peak_kb'] * (1 + tolerance['peak_kb'])
+        if measured['peak_kb'] > ceiling:
+            regressions.append(
+                f"{name}: peak {measured['peak_kb']:.1f} KB, baseline "
+                f"{expected['peak_kb']:.1f} KB (+{tolerance['peak_kb']:.0%} allowed)"
+            )
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict:
+    """Load the checked-in baseline"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Performance baseline not found: {path} (run with --refresh)")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(measurements: Dict, path: str = BASELINE_PATH) -> None:
+    """Write measurements as the new baseline"""
+    baseline = {
+        'tolerance': DEFAULT_TOLERANCE,
+        'machine': {'python': platform.python_version(), 'platform': platform.platform()},
+        **measurements,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--refresh', action='store_true', help='Record the measurements as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file')
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='Timed rounds per workload')
+    args = parser.parse_args()
+
+    current = measure(args.rounds)
+    print(f"{'workload':<16} {'ops/sec':>12} {'normalized':>12} {'peak KB':>10}")
+    for name, result in current['workloads'].items():
+        print(f"{name:<16} {result['ops_per_sec']:>12.1f} {result['normalized']:>12.6f} {result['peak_kb']:>10.1f}")
+
+    if args.refresh:
+        save_baseline(current, args.baseline)
+        print(f"✅ Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(current, load_baseline(args.baseline))
+    for message in regressions:
+        print(f"❌ {message}")
+    if not regressions:
+        print("✅ Within baseline tolerances")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
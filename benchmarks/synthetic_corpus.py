@@ -0,0 +1,117 @@
+"""Fixed-seed synthetic FAQ corpora and query logs for benchmarks"""
+
+import json
+import random
+from typing import List, Dict, Optional
+
+from src.metadata_filter import MetadataFilter
+
+# Consonants only: BanglaProcessor.tokenize keeps them inside one token
+CONSONANTS = 'কখগঘচছজঝটঠডঢতথদধনপফবভমযরলশসহ'
+
+
+def make_vocabulary(size: int) -> List[str]:
+    """Build a vocabulary of distinct Bangla-script pseudo words"""
+    n = len(CONSONANTS)
+    return [
+        f"{CONSONANTS[i % n]}{CONSONANTS[(i // n) % n]}{CONSONANTS[(i // (n * n)) % n]}{i}"
+        for i in range(size)
+    ]
+
+
+def generate_faqs(
+    count: int,
+    seed: int = 42,
+    vocab_size: int = 5000,
+    question_length: tuple = (4, 10)
+) -> List[Dict]:
+    """
+    Generate FAQs in the bangla_faqs.json schema
+
+    Question words follow a Zipf-like distribution, so common words have
+    long posting lists and rare words short ones, as in real corpora.
+
+    Args:
+        count: Number of FAQs
+        seed: Random seed
+        vocab_size: Number of distinct words
+        question_length: (min, max) words per question
+
+    Returns:
+        List of FAQ dictionaries
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(vocab_size)
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    topics = list(MetadataFilter.VALID_TOPICS)
+    difficulties = list(MetadataFilter.VALID_DIFFICULTY)
+
+    faqs = []
+    for i in range(count):
+        question_words = rng.choices(words, weights=weights, k=rng.randint(*question_length))
+        keywords = rng.sample(question_words, min(len(question_words), rng.randint(1, 3)))
+        faqs.append({
+            'id': f'syn_{i:07d}',
+            'topic': rng.choice(topics),
+            'difficulty': rng.choice(difficulties),
+            'question': ' '.join(question_words) + '?',
+            'answer': f"উত্তর {i}। " + ' '.join(rng.choices(words, k=12)) + '।',
+            'keywords': keywords,
+            'tags': []
+        })
+    return faqs
+
+
+def generate_queries(
+    faqs: List[Dict],
+    count: int,
+    seed: int = 7,
+    vocab_size: int = 5000,
+    noise: float = 0.3
+) -> List[Dict]:
+    """
+    Generate queries by perturbing FAQ questions
+
+    Each query keeps most words of a random FAQ question, drops or replaces
+    a fraction of them and shuffles the order.
+
+    Returns:
+        List of {'query', 'topic', 'difficulty', 'source_id'} dictionaries
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(vocab_size)
+
+    queries = []
+    for _ in range(count):
+        faq = rng.choice(faqs)
+        tokens = faq['question'].rstrip('?').split()
+        perturbed = []
+        for token in tokens:
+            roll = rng.random()
+            if roll < noise / 2:
+                continue
+            perturbed.append(rng.choice(words) if roll < noise else token)
+        rng.shuffle(perturbed)
+        queries.append({
+            'query': ' '.join(perturbed) or rng.choice(words),
+            'topic': faq['topic'],
+            'difficulty': faq['difficulty'],
+            'source_id': faq['id']
+        })
+    return queries
+
+
+def write_faqs(faqs: List[Dict], path: str) -> str:
+    """Write FAQs as a JSON database and return the path"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(faqs, f, ensure_ascii=False)
+    return path
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Get the pct-th percentile of values (nearest rank)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -1,12 +1,15 @@
 """Console-based user interface for Bangla FAQ chatbot"""
 
-from typing import Optional
+from typing import Optional, Callable, List
 from src.metadata_filter import MetadataFilter
 
 
 class ConsoleUI:
     """Handle console-based menu and user interaction"""
 
+    # Menu value for "detect the topic from the question"
+    AUTO_TOPIC = 'স্বয়ংক্রিয়'
+
     MENU_HEADER = """
 ╔════════════════════════════════════════════════════════╗
 ║           বাংলা FAQ চ্যাটবট স্বাগতম             ║
@@ -24,6 +27,7 @@ class ConsoleUI:
 3. ✈️  ভ্রমণ (Travel)
 4. 💻 প্রযুক্তি (Technology)
 5. ⚽ খেলাধুলা (Sports)
+6. 🔎 স্বয়ংক্রিয় (Auto-detect topic)
 0. 🚪 বের হন (Exit)
 
 >>> আপনার পছন্দ (Your Choice): """
@@ -48,7 +52,8 @@ class ConsoleUI:
             '2': 'স্বাস্থ্য',
             '3': 'ভ্রমণ',
             '4': 'প্রযুক্তি',
-            '5': 'খেলাধুলা'
+            '5': 'খেলাধুলা',
+            '6': self.AUTO_TOPIC
         }
         
         self.difficulty_map = {
@@ -97,28 +102,61 @@ class ConsoleUI:
         print("❌ অবৈধ নির্বাচন। অনুগ্রহ করে আবার চেষ্টা করুন।")
         return self.display_difficulty_menu()
 
-    def get_user_query(self, topic: str) -> str:
+    # A query ending with this marker asks for suggestions instead of an answer
+    SUGGEST_MARKER = '*'
+
+    def get_user_query(self, topic: str, suggest: Optional[Callable[[str], List[str]]] = None) -> str:
         """
         Get user's question for selected topic
         
         Args:
             topic: Selected topic in Bangla
+            suggest: Optional prefix -> completions callback; typing a
+                prefix followed by SUGGEST_MARKER lists completions to pick
             
         Returns:
             User's question
         """
         print(f"\n╔════════════════════════════════════════════════════════╗")
-        print(f"║ বিষয়: {topic:20} (Topic: {MetadataFilter.VALID_TOPICS.get(topic, 'Unknown')})")
+        label = 'Auto-detect' if topic == self.AUTO_TOPIC else MetadataFilter.VALID_TOPICS.get(topic, 'Unknown')
+        print(f"║ বিষয়: {topic:20} (Topic: {label})")
         print(f"╚════════════════════════════════════════════════════════╝\n")
         
-        query = input(">>> আপনার প্রশ্ন (Your Question): ").strip()
+        hint = f", {self.SUGGEST_MARKER} = suggestions" if suggest is not None else ""
+        query = input(f">>> আপনার প্রশ্ন (Your Question{hint}): ").strip()
         
         if not query:
             print("❌ অনুগ্রহ করে একটি প্রশ্ন লিখুন।")
-            return self.get_user_query(topic)
+            return self.get_user_query(topic, suggest)
+        
+        if suggest is not None and query.endswith(self.SUGGEST_MARKER):
+            return self.choose_suggestion(query[:-1], suggest(query[:-1])) or self.get_user_query(topic, suggest)
         
         return query
 
+    def choose_suggestion(self, prefix: str, suggestions: List[str]) -> Optional[str]:
+        """
+        List completions of a prefix and let the user pick one
+        
+        Returns:
+            Chosen completion, the prefix itself for an empty choice, or
+            None to ask again
+        """
+        if not suggestions:
+            print("❌ কোনো পরামর্শ পাওয়া যায়নি। (No suggestions)")
+            return None
+        
+        print("\n💡 পরামর্শ (Suggestions):")
+        for i, suggestion in enumerate(suggestions, 1):
+            print(f"  {i}. {suggestion}")
+        
+        choice = input(">>> নম্বর নির্বাচন করুন, Enter = যেমন আছে (Pick a number): ").strip()
+        if not choice:
+            return prefix.strip() or None
+        if choice.isdigit() and 1 <= int(choice) <= len(suggestions):
+            return suggestions[int(choice) - 1]
+        return None
+
     def display_response(self, response: str, is_fallback: bool = False) -> None:
         """
         Display response to user
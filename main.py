@@ -3,30 +3,64 @@
 
 """Main entry point for Bangla FAQ Chatbot"""
 
+import argparse
+import json
 import os
 import sys
 
 from src.chatbot import BanglaFAQChatbot
+from src.batch_runner import BatchRunner
+from src.profiling import Profiler
 from console_ui import ConsoleUI
 
 
-def main():
-    """Main application loop"""
-    
-    # Determine FAQ database path
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    faq_path = os.path.join(script_dir, 'data', 'bangla_faqs.json')
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Bangla FAQ Chatbot")
+    parser.add_argument(
+        '--batch', metavar='FILE',
+        help="Answer queries from FILE ('-' for stdin) instead of the interactive menu. "
+             "One query per line: plain/TSV (query<TAB>topic<TAB>difficulty) or JSON objects"
+    )
+    parser.add_argument('--output', metavar='FILE', default='-', help="JSON Lines output ('-' for stdout)")
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for batch mode')
+    parser.add_argument('--unordered', action='store_true', help='Write batch results as they finish')
+    parser.add_argument('--chunk-size', type=int, default=16, help='Queries per worker task')
+    return parser.parse_args(argv)
+
+
+def run_batch(args, faq_path, cache_dir):
+    """Batch mode: stream queries to JSON Lines and print a throughput summary"""
+    try:
+        runner = BatchRunner(
+            faq_path, cache_dir, workers=args.workers,
+            ordered=not args.unordered, chunk_size=args.chunk_size
+        )
+        source = sys.stdin if args.batch == '-' else open(args.batch, 'r', encoding='utf-8')
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
     
-    # Initialize chatbot and UI
     try:
-        chatbot = BanglaFAQChatbot(faq_path)
-        ui = ConsoleUI()
+        summary = runner.run(source, output)
     except FileNotFoundError as e:
-        print(f"❌ Error: {e}")
-        sys.exit(1)
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
     
-    # Main loop
+    print(f"📊 {json.dumps(summary, ensure_ascii=False)}", file=sys.stderr)
+    return 0
+
+
+def run_interactive(chatbot, ui):
+    """Interactive menu loop"""
     ui.display_header()
+    conversation = 0
     
     while True:
         # Get topic from user
@@ -40,17 +74,21 @@ def main():
         # Get difficulty filter (optional)
         difficulty = ui.display_difficulty_menu()
         
+        search_topic = None if topic == ui.AUTO_TOPIC else topic
+        
+        # Follow-up questions on this topic re-rank the previous answer's candidates
+        conversation += 1
+        session_id = f"console-{conversation}"
+        
         # Query loop for selected topic
         while True:
-            # Get user's question
-            query = ui.get_user_query(topic)
+            # Get user's question ("prefix*" lists suggestions)
+            query = ui.get_user_query(topic, lambda prefix: chatbot.autocomplete(prefix, search_topic))
             
             ui.display_loading()
             
-            # Generate answer
-            response, is_fallback = chatbot.generate_answer(
-                query, topic, difficulty
-            )
+            # Generate answer (auto-detect routes the query to likely topics)
+            response, is_fallback = chatbot.generate_answer(query, search_topic, difficulty, session_id=session_id)
             
             # Display response
             ui.display_response(response, is_fallback)
@@ -59,6 +97,8 @@ def main():
             if not ui.ask_continue():
                 break
         
+        chatbot.sessions.end(session_id)
+        
         # Ask if user wants to select another topic
         print("\n" + "─" * 54)
         another = input(">>> অন্য বিষয় নির্বাচন করতে চান? (Select another topic?) (হ্যাঁ/না): ").strip().lower()
@@ -70,5 +110,39 @@ def main():
         print()
 
 
+def main(argv=None):
+    """Main application loop"""
+    args = parse_args(argv)
+    
+    # Determine FAQ database path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    faq_path = os.path.join(script_dir, 'data', 'bangla_faqs.json')
+    cache_dir = os.path.join(script_dir, 'data', '.index_cache')
+    query_stats_path = os.path.join(script_dir, 'data', '.query_stats.json')
+    
+    # BANGLA_FAQ_PROFILE=<dir> profiles from startup; SIGUSR2 toggles profiling
+    profiler = Profiler.from_environment()
+    profiler.install_signal_handler()
+    
+    if args.batch:
+        code = run_batch(args, faq_path, cache_dir)
+        profiler.stop()
+        sys.exit(code)
+    
+    # Initialize chatbot and UI
+    try:
+        chatbot = BanglaFAQChatbot(faq_path, cache_dir=cache_dir, query_stats_path=query_stats_path)
+        ui = ConsoleUI()
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    
+    try:
+        run_interactive(chatbot, ui)
+    finally:
+        chatbot.close()
+        profiler.stop()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,212 @@
+"""Non-blocking audio pipeline with worker threads and bounded job queues"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional, List, Callable
+
+from src.voice_backends import TTSBackend, RecognizerBackend, AudioPlayer
+
+
+class AudioPipeline:
+    """
+    Run speech synthesis, playback and recognition off the caller's thread
+
+    Synthesis jobs are spread over a pool of worker threads; playback runs
+    on a single thread in submission order, so the next answer can be
+    synthesized while the current one is playing. All queues are bounded:
+    when the pipeline is saturated, submissions block for up to
+    submit_timeout seconds and then raise queue.Full.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        tts: Optional[TTSBackend] = None,
+        player: Optional[AudioPlayer] = None,
+        recognizer: Optional[RecognizerBackend] = None,
+        synth_workers: int = 2,
+        queue_size: int = 8,
+        submit_timeout: Optional[float] = None
+    ):
+        """
+        Initialize audio pipeline
+
+        Args:
+            tts: Text-to-speech backend
+            player: Audio output
+            recognizer: Speech recognizer
+            synth_workers: Number of synthesis worker threads
+            queue_size: Maximum queued jobs per stage
+            submit_timeout: Seconds to wait for queue space (None = wait forever)
+        """
+        self.tts = tts
+        self.player = player
+        self.recognizer = recognizer
+        self.submit_timeout = submit_timeout
+
+        self._synth_queue = queue.Queue(maxsize=queue_size)
+        self._play_queue = queue.Queue(maxsize=queue_size)
+        self._listen_queue = queue.Queue(maxsize=queue_size)
+
+        self._threads: List[threading.Thread] = []
+        for i in range(max(1, synth_workers)):
+            self._start_thread(self._synth_worker, f'tts-{i}')
+        self._start_thread(self._play_worker, 'playback')
+        self._start_thread(self._listen_worker, 'listener')
+        self._closed = False
+
+    def _start_thread(self, target, name: str) -> None:
+        """Start a daemon worker thread"""
+        thread = threading.Thread(target=target, name=f'audio-{name}', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _put(self, job_queue: queue.Queue, item) -> None:
+        """Enqueue a job, applying backpressure"""
+        if self._closed:
+            raise RuntimeError("Audio pipeline is closed")
+        job_queue.put(item, timeout=self.submit_timeout)
+
+    def synthesize(self, text: str, tts: Optional[TTSBackend] = None) -> Future:
+        """
+        Submit a synthesis job
+
+        Args:
+            text: Text to synthesize
+            tts: Backend to use instead of the pipeline default
+
+        Returns:
+            Future resolving to audio bytes
+        """
+        tts = tts or self.tts
+        if tts is None:
+            raise RuntimeError("No TTS backend configured")
+        future = Future()
+        self._put(self._synth_queue, (tts, text, future))
+        return future
+
+    def speak(self, text: str, tts: Optional[TTSBackend] = None) -> Future:
+        """
+        Submit text to be synthesized and played
+
+        Returns:
+            Future resolving to True once playback finished (False on error)
+        """
+        tts = tts or self.tts
+        if self.player is None:
+            raise RuntimeError("No audio player configured")
+        return self.play(self.synthesize(text, tts), tts.audio_format)
+
+    def play(
+        self,
+        audio: Future,
+        audio_format: str = 'wav',
+        on_start: Optional[Callable[[], None]] = None
+    ) -> Future:
+        """
+        Queue (possibly still synthesizing) audio for playback
+
+        Args:
+            audio: Future resolving to audio bytes
+            audio_format: Audio container format (file suffix)
+            on_start: Called on the playback thread right before playing
+
+        Returns:
+            Future resolving to True once playback finished (False on error)
+        """
+        if self.player is None:
+            raise RuntimeError("No audio player configured")
+        done = Future()
+        self._put(self._play_queue, (audio, audio_format, on_start, done))
+        return done
+
+    def recognize(self, timeout: float = 10) -> Future:
+        """
+        Submit a recognition job
+
+        Returns:
+            Future resolving to recognized text ('' on failure)
+        """
+        if self.recognizer is None:
+            raise RuntimeError("No recognizer configured")
+        future = Future()
+        self._put(self._listen_queue, (timeout, future))
+        return future
+
+    async def aspeak(self, text: str, tts: Optional[TTSBackend] = None) -> bool:
+        """Asyncio wrapper around speak()"""
+        return await asyncio.wrap_future(self.speak(text, tts))
+
+    async def arecognize(self, timeout: float = 10) -> str:
+        """Asyncio wrapper around recognize()"""
+        return await asyncio.wrap_future(self.recognize(timeout))
+
+    def _synth_worker(self) -> None:
+        """Synthesis worker loop"""
+        while True:
+            job = self._synth_queue.get()
+            if job is self._STOP:
+                return
+            tts, text, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(tts.synthesize(text))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _play_worker(self) -> None:
+        """Playback worker loop (one clip at a time, in submission order)"""
+        while True:
+            job = self._play_queue.get()
+            if job is self._STOP:
+                return
+            audio, audio_format, on_start, done = job
+            if not done.set_running_or_notify_cancel():
+                continue
+            try:
+                data = audio.result()
+                if on_start is not None:
+                    on_start()
+                self.player.play(data, audio_format)
+                done.set_result(True)
+            except Exception as e:
+                print(f"❌ Error playing audio: {e}")
+                done.set_result(False)
+
+    def _listen_worker(self) -> None:
+        """Recognition worker loop"""
+        while True:
+            job = self._listen_queue.get()
+            if job is self._STOP:
+                return
+            timeout, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.recognizer.listen(timeout))
+            except Exception as e:
+                future.set_exception(e)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop worker threads after queued jobs are done"""
+        if self._closed:
+            return
+        self._closed = True
+        synth_count = len(self._threads) - 2
+        for _ in range(synth_count):
+            self._synth_queue.put(self._STOP)
+        self._play_queue.put(self._STOP)
+        self._listen_queue.put(self._STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> 'AudioPipeline':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,179 @@
+"""Prefix index over FAQ questions and keywords for as-you-type suggestions"""
+
+from array import array
+from typing import List, Dict, Optional, Mapping
+
+import numpy as np
+
+from .bangla_processor import BanglaProcessor
+from .faq_index import FAQIndex
+
+
+class _TopicPrefixIndex:
+    """
+    Sorted completions of one topic packed into UTF-8 pools
+
+    Keys and display texts live in two bytes pools with offset arrays
+    instead of lists of str objects: a few bytes per completion, and
+    processes forked after building share the pages untouched. UTF-8
+    byte order equals code point order, so the pools stay sorted.
+    """
+
+    def __init__(self, entries: Dict[str, tuple]):
+        """
+        Args:
+            entries: Normalized key -> (popularity, first FAQ position, display text)
+        """
+        keys = sorted(entries, key=lambda key: key.encode('utf-8'))
+        self.key_pool, self.key_offsets = self._pack(keys)
+        self.display_pool, self.display_offsets = self._pack([entries[key][2] for key in keys])
+        self.popularity = np.array([entries[key][0] for key in keys], dtype=np.float64)
+        self.first_positions = np.array([entries[key][1] for key in keys], dtype=np.uint32)
+        # Rank 0 is the most popular completion; ties keep database order
+        order = sorted(range(len(keys)), key=lambda i: (-entries[keys[i]][0], entries[keys[i]][1], i))
+        self.ranks = np.empty(len(keys), dtype=np.int32)
+        self.ranks[order] = np.arange(len(keys))
+
+    @staticmethod
+    def _pack(texts: List[str]) -> tuple:
+        """Encode texts into one bytes pool plus offsets"""
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = array('q', [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        return b''.join(encoded), offsets
+
+    def __len__(self) -> int:
+        return len(self.key_offsets) - 1
+
+    def _lower_bound(self, target: bytes) -> int:
+        """First key position not below target"""
+        offsets, pool = self.key_offsets, self.key_pool
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if pool[offsets[mid]:offsets[mid + 1]] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def complete(self, prefix: str, limit: int) -> List[tuple]:
+        """Best (-popularity, first FAQ position, display text) whose key starts with prefix"""
+        target = prefix.encode('utf-8')
+        lo = self._lower_bound(target)
+        # 0xFF never occurs in UTF-8, so it sorts after every extension of the prefix
+        hi = self._lower_bound(target + b'\xff')
+        if lo >= hi:
+            return []
+        ranks = self.ranks[lo:hi]
+        if len(ranks) > limit:
+            best = np.argpartition(ranks, limit - 1)[:limit]
+        else:
+            best = np.arange(len(ranks))
+        best = best[np.argsort(ranks[best])] + lo
+
+        results = []
+        for i in best.tolist():
+            text = self.display_pool[self.display_offsets[i]:self.display_offsets[i + 1]].decode('utf-8')
+            results.append((-float(self.popularity[i]), int(self.first_positions[i]), text))
+        return results
+
+    def nbytes(self) -> int:
+        """Memory footprint of the pools and arrays"""
+        offsets = (len(self.key_offsets) + len(self.display_offsets)) * self.key_offsets.itemsize
+        return (len(self.key_pool) + len(self.display_pool) + offsets + self.ranks.nbytes + self.popularity.nbytes
+                + self.first_positions.nbytes)
+
+
+class Autocompleter:
+    """
+    Topic-partitioned prefix index for as-you-type query suggestions
+
+    FAQ questions and keywords are normalized with BanglaProcessor and
+    lowercased, then kept in one sorted array per topic. A prefix maps to
+    a contiguous range found by two binary searches; the best completions
+    in that range are picked by precomputed popularity rank with a
+    partial sort, so a keystroke costs O(log n) Python steps plus one
+    numpy pass over the range, rather than a walk over trie nodes.
+    """
+
+    def __init__(self, index: FAQIndex, popularity: Optional[Mapping[str, float]] = None):
+        """
+        Build prefix index
+
+        Args:
+            index: FAQ index
+            popularity: Optional FAQ id -> popularity (e.g. answer counts);
+                a completion ranks by its most popular FAQ
+
+        Completions are matched on normalized, lowercased text but returned
+        as written in the FAQ database.
+        """
+        popularity = popularity or {}
+        entries: Dict[str, Dict[str, tuple]] = {}
+        for pos, faq in enumerate(index.faqs):
+            score = popularity.get(faq.get('id'), 0)
+            topic_entries = entries.setdefault(faq.get('topic'), {})
+            texts = [faq.get('question', '')] + list(faq.get('keywords', []))
+            for text in texts:
+                text = ' '.join(text.split())
+                key = BanglaProcessor.normalize(text).lower()
+                if not key:
+                    continue
+                current = topic_entries.get(key)
+                if current is None or score > current[0]:
+                    topic_entries[key] = (score, pos if current is None else current[1], text)
+
+        self.topics: Dict[str, _TopicPrefixIndex] = {
+            topic: _TopicPrefixIndex(topic_entries) for topic, topic_entries in entries.items()
+        }
+
+    @staticmethod
+    def normalize_prefix(prefix: str) -> str:
+        """Normalize typed text the same way as the indexed completions"""
+        # normalize() strips whitespace; keep a typed word boundary
+        trailing = ' ' if prefix[-1:].isspace() and prefix.strip() else ''
+        return BanglaProcessor.normalize(prefix).lower() + trailing
+
+    def complete(self, prefix: str, topic: Optional[str] = None, limit: int = 5) -> List[str]:
+        """
+        Get completions of a typed prefix
+
+        Args:
+            prefix: Text typed so far
+            topic: Topic partition to search (None for all topics)
+            limit: Maximum number of completions
+
+        Returns:
+            Completions (FAQ questions or keywords), most popular first
+        """
+        key = self.normalize_prefix(prefix)
+        if not key or limit < 1:
+            return []
+
+        if topic is not None:
+            partition = self.topics.get(topic)
+            return [text for _, _, text in partition.complete(key, limit)] if partition else []
+
+        # Merge the best of every partition by popularity, then database order
+        candidates = []
+        for partition in self.topics.values():
+            candidates.extend(partition.complete(key, limit))
+        candidates.sort()
+
+        results: List[str] = []
+        for _, _, text in candidates:
+            if text not in results:
+                results.append(text)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def nbytes(self) -> int:
+        """Approximate memory footprint of all partitions"""
+        return sum(partition.nbytes() for partition in self.topics.values())
+
+    def size(self) -> int:
+        """Number of distinct completions over all topics"""
+        return sum(len(partition) for partition in self.topics.values())
@@ -0,0 +1,268 @@
+"""Non-interactive batch answering of query streams into JSON Lines"""
+
+import bisect
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator, TextIO
+
+from src.chatbot import BanglaFAQChatbot
+
+
+def parse_query_line(line: str) -> Optional[Dict]:
+    """
+    Parse one input line into a query record
+
+    Accepted formats: a JSON object with query/topic/difficulty keys, or
+    tab-separated "query[<TAB>topic[<TAB>difficulty]]". An empty topic
+    means automatic topic routing.
+
+    Returns:
+        Dict with query, topic and difficulty, or None for blank lines
+
+    Raises:
+        ValueError: If a JSON line is malformed or has no query
+    """
+    line = line.strip('\r\n')
+    if not line.strip():
+        return None
+
+    if line.lstrip().startswith('{'):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(record, dict) or not str(record.get('query', '')).strip():
+            raise ValueError("Missing 'query'")
+        query, topic, difficulty = str(record['query']), record.get('topic'), record.get('difficulty')
+    else:
+        columns = line.split('\t')
+        columns += [''] * (3 - len(columns))
+        query, topic, difficulty = columns[:3]
+
+    return {'query': query.strip(), 'topic': topic or None, 'difficulty': difficulty or None}
+
+
+class LatencyHistogram:
+    """
+    Constant-memory latency distribution
+
+    Latencies fall into geometrically growing buckets (GROWTH apart), so
+    percentiles are reported with at most that relative error.
+    """
+
+    GROWTH = 1.05
+    MIN_MS = 0.01
+    MAX_MS = 600000.0
+
+    def __init__(self):
+        """Initialize empty histogram"""
+        self.bounds: List[float] = []
+        bound = self.MIN_MS
+        while bound < self.MAX_MS:
+            self.bounds.append(bound)
+            bound *= self.GROWTH
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        """Record one latency"""
+        self.counts[bisect.bisect_left(self.bounds, latency_ms)] += 1
+        self.count += 1
+        self.total += latency_ms
+        self.max = max(self.max, latency_ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile"""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Mean, p50, p95, p99 and max in milliseconds"""
+        return {
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+_WORKER_CHATBOT: Optional[BanglaFAQChatbot] = None
+
+
+def _init_worker(faq_path: str, cache_dir: Optional[str]) -> None:
+    """Worker process: load the chatbot once (chatbot messages go to stderr)"""
+    global _WORKER_CHATBOT
+    sys.stdout = sys.stderr
+    _WORKER_CHATBOT = BanglaFAQChatbot(faq_path, cache_dir=cache_dir)
+
+
+def answer_record(chatbot: BanglaFAQChatbot, line_no: int, record: Dict) -> Dict:
+    """Answer one query record and describe the result"""
+    if 'error' in record:
+        return {'line': line_no, 'error': record['error']}
+
+    start = time.perf_counter()
+    results, is_fallback = chatbot.answer_question(record['query'], record['topic'], record['difficulty'])
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    faq, score = results[0] if results else ({}, 0.0)
+    return {
+        'line': line_no,
+        'query': record['query'],
+        'topic': record['topic'],
+        'answer_id': faq.get('id'),
+        'score': score,
+        'is_fallback': is_fallback,
+        'latency_ms': round(latency_ms, 3)
+    }
+
+
+def _answer_chunk(chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+    """Worker process: answer a chunk of records"""
+    return [answer_record(_WORKER_CHATBOT, line_no, record) for line_no, record in chunk]
+
+
+class BatchRunner:
+    """
+    Answer a stream of queries and write one JSON line per query
+
+    Input is consumed lazily and at most `window` chunks are in flight, so
+    memory stays constant regardless of input size. With more than one
+    worker, chunks are answered in a process pool; results are written in
+    input order, or as soon as they are ready when ordered is False.
+    """
+
+    def __init__(
+        self,
+        faq_path: str,
+        cache_dir: Optional[str] = None,
+        workers: int = 1,
+        ordered: bool = True,
+        chunk_size: int = 16,
+        window: Optional[int] = None
+    ):
+        """
+        Initialize batch runner
+
+        Args:
+            faq_path: Path to FAQ JSON database
+            cache_dir: Optional directory for the persistent index cache
+            workers: Worker processes (1 answers in this process)
+            ordered: Write results in input order
+            chunk_size: Queries per task sent to a worker
+            window: Maximum chunks in flight (default: 4 per worker)
+        """
+        if workers < 1 or chunk_size < 1:
+            raise ValueError("workers and chunk_size must be positive")
+        self.faq_path = faq_path
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.ordered = ordered
+        self.chunk_size = chunk_size
+        self.window = window or 4 * workers
+
+    def _chunks(self, lines: Iterable[str]) -> Iterator[List[Tuple[int, Dict]]]:
+        """Parse lines lazily into chunks of (line number, record)"""
+        chunk = []
+        for line_no, line in enumerate(lines, 1):
+            try:
+                record = parse_query_line(line)
+            except ValueError as e:
+                # Malformed lines keep their place in the output as error records
+                record = {'error': str(e)}
+            if record is None:
+                continue
+            chunk.append((line_no, record))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _results_inline(self, chunks: Iterator[List[Tuple[int, Dict]]]) -> Iterator[List[Dict]]:
+        """Answer chunks in this process"""
+        with redirect_stdout(sys.stderr):
+            chatbot = BanglaFAQChatbot(self.faq_path, cache_dir=self.cache_dir)
+        for chunk in chunks:
+            with redirect_stdout(sys.stderr):
+                results = [answer_record(chatbot, line_no, record) for line_no, record in chunk]
+            yield results
+
+    def _results_pooled(self, chunks: Iterator[List[Tuple[int, Dict]]]) -> Iterator[List[Dict]]:
+        """Answer chunks in a process pool with a bounded number in flight"""
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.faq_path, self.cache_dir)
+        ) as pool:
+            pending: deque = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_answer_chunk, chunk))
+                while len(pending) >= self.window:
+                    yield from self._drain(pending)
+            while pending:
+                yield from self._drain(pending)
+
+    def _drain(self, pending: deque) -> Iterator[List[Dict]]:
+        """Yield finished results (the oldest one first when ordered)"""
+        if self.ordered:
+            future: Future = pending.popleft()
+            yield future.result()
+            return
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield future.result()
+
+    def run(self, lines: Iterable[str], output: TextIO) -> Dict:
+        """
+        Answer all queries and write JSON Lines
+
+        Args:
+            lines: Input lines (consumed lazily)
+            output: Text stream for the JSON Lines results
+
+        Returns:
+            Throughput summary
+        """
+        histogram = LatencyHistogram()
+        counts = {'queries': 0, 'answered': 0, 'fallbacks': 0, 'errors': 0}
+
+        start = time.perf_counter()
+        chunks = self._chunks(lines)
+        results = self._results_inline(chunks) if self.workers == 1 else self._results_pooled(chunks)
+
+        for batch in results:
+            for result in batch:
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                if 'error' in result:
+                    counts['errors'] += 1
+                    continue
+                counts['queries'] += 1
+                counts['fallbacks' if result['is_fallback'] else 'answered'] += 1
+                histogram.add(result['latency_ms'])
+        output.flush()
+
+        elapsed = time.perf_counter() - start
+        return {
+            **counts,
+            'workers': self.workers,
+            'elapsed_s': round(elapsed, 3),
+            'queries_per_s': round(counts['queries'] / elapsed, 1) if elapsed > 0 else 0.0,
+            'latency_ms': {key: round(value, 3) for key, value in histogram.summary().items()}
+        }
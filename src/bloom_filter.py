@@ -0,0 +1,202 @@
+"""Bloom filters for rejecting unanswerable queries before retrieval"""
+
+import math
+from collections import Counter
+from typing import List, Dict, Optional, Iterable, Set
+
+from .bangla_processor import BanglaProcessor
+from .faq_index import FAQIndex
+from .faq_retriever import FAQRetriever
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set of strings
+
+    Membership tests have no false negatives and a false-positive rate of
+    about fp_rate at the given capacity. Bits are derived from the
+    built-in str hash (double hashing), so a filter is only valid in the
+    process that built it (and processes forked from it).
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01):
+        """
+        Initialize an empty filter
+
+        Args:
+            capacity: Expected number of items
+            fp_rate: Target false-positive rate at capacity (0 < fp_rate < 1)
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError(f"Invalid false-positive rate: {fp_rate}")
+
+        capacity = max(1, capacity)
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _bit_positions(self, item: str) -> Iterable[int]:
+        """Bit positions of an item (Kirsch-Mitzenmacher double hashing)"""
+        h = hash(item) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        """Add an item"""
+        for bit in self._bit_positions(item):
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        h = hash(item) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % num_bits
+            if not bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def estimated_fp_rate(self) -> float:
+        """False-positive rate expected for the items added so far"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def nbytes(self) -> int:
+        """Size of the bit array"""
+        return len(self.bits)
+
+
+class FastRejectFilter:
+    """
+    Per-topic Bloom filters over question tokens, plus exact keyword lookup
+
+    A FAQ can only score above zero by sharing a question token with the
+    query or by having a keyword inside the query. With m of the |q| query
+    tokens possibly present in a topic, no FAQ of that topic can score more
+    than question_weight * m / |q| without a keyword hit (Jaccard <= shared / |q|).
+    When that bound is below the threshold and no keyword occurs in the
+    query, the query is rejected without filtering or scoring.
+
+    Keywords are matched as substrings, which takes one probe per query
+    substring; they are few, so an exact set is used there instead of a
+    Bloom filter whose false positives would add up over the probes.
+    False positives only let a query through to normal retrieval; a query
+    that could be answered is never rejected, as long as question_weight
+    is the retriever's QUESTION_WEIGHT.
+    """
+
+    def __init__(self, fp_rate: float = 0.01, question_weight: float = FAQRetriever.QUESTION_WEIGHT):
+        """
+        Initialize empty filter set (see from_index)
+
+        Args:
+            fp_rate: Target false-positive rate of the token Bloom filters
+            question_weight: Weight of question similarity in the retriever's score
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError(f"Invalid false-positive rate: {fp_rate}")
+        self.fp_rate = fp_rate
+        self.question_weight = question_weight
+        self.token_filters: Dict[str, BloomFilter] = {}
+        self.keyword_topics: Dict[str, Set[str]] = {}
+        self.keyword_lengths: List[int] = []
+        self.keyword_starts: Set[str] = set()
+        self.stats = Counter()
+
+    @classmethod
+    def from_index(
+        cls,
+        index: FAQIndex,
+        fp_rate: float = 0.01,
+        question_weight: float = FAQRetriever.QUESTION_WEIGHT
+    ) -> 'FastRejectFilter':
+        """Build the filters from an FAQ index"""
+        reject_filter = cls(fp_rate, question_weight)
+        for topic, positions in index.topic_positions.items():
+            tokens = {token for pos in positions for token in index.question_tokens(pos)}
+            keywords = {keyword for pos in positions for keyword in index.keywords[pos]}
+            reject_filter.add_topic(topic, tokens, keywords)
+        return reject_filter
+
+    def add_topic(self, topic: str, tokens: Iterable[str], keywords: Iterable[str]) -> None:
+        """
+        Add the tokens and keywords of one topic
+
+        Args:
+            topic: Topic name
+            tokens: Question tokens of the topic's FAQs
+            keywords: Lowercased keywords of the topic's FAQs
+        """
+        tokens = set(tokens)
+        token_filter = BloomFilter(len(tokens), self.fp_rate)
+        for token in tokens:
+            token_filter.add(token)
+        self.token_filters[topic] = token_filter
+
+        for keyword in keywords:
+            self.keyword_topics.setdefault(keyword, set()).add(topic)
+            self.keyword_starts.add(keyword[:1])
+        self.keyword_lengths = sorted({len(keyword) for keyword in self.keyword_topics})
+
+    def keyword_hit_topics(self, query_lower: str) -> Set[str]:
+        """Topics having a keyword that occurs inside the query"""
+        topics: Set[str] = set()
+        if '' in self.keyword_starts:
+            topics.update(self.keyword_topics.get('', ()))
+        for start in range(len(query_lower)):
+            if query_lower[start] not in self.keyword_starts:
+                continue
+            for length in self.keyword_lengths:
+                if start + length > len(query_lower):
+                    break
+                hit = self.keyword_topics.get(query_lower[start:start + length])
+                if hit:
+                    topics.update(hit)
+        return topics
+
+    def may_answer(self, query: str, topics: Optional[List[str]], threshold: float) -> bool:
+        """
+        Decide whether any FAQ of the topics could reach the threshold
+
+        Args:
+            query: User query
+            topics: Topics to consider (None for all)
+            threshold: Minimum score an answer needs
+
+        Returns:
+            False only if no FAQ can possibly score at least threshold
+        """
+        self.stats['checks'] += 1
+        query_lower = query.lower()
+        query_tokens = set(BanglaProcessor.tokenize(query_lower))
+        keyword_topics = self.keyword_hit_topics(query_lower)
+
+        for topic in self.token_filters if topics is None else topics:
+            token_filter = self.token_filters.get(topic)
+            if token_filter is None:
+                continue
+            if topic in keyword_topics:
+                self.stats['passed'] += 1
+                return True
+            present = sum(1 for token in query_tokens if token in token_filter)
+            bound = (present / len(query_tokens) if query_tokens else 0.0) * self.question_weight
+            if bound >= threshold:
+                self.stats['passed'] += 1
+                return True
+
+        self.stats['rejected'] += 1
+        return False
+
+    def get_stats(self) -> Dict:
+        """Get counters, filter sizes and false-positive rates"""
+        filters = list(self.token_filters.values())
+        return {
+            **self.stats,
+            'fp_rate': self.fp_rate,
+            'estimated_fp_rate': max((f.estimated_fp_rate() for f in filters), default=0.0),
+            'filters': len(filters),
+            'bytes': sum(f.nbytes() for f in filters),
+            'keywords': len(self.keyword_topics)
+        }
@@ -1,12 +1,25 @@
 """Main chatbot orchestration and logic"""
 
-from typing import Optional, Tuple, List
+from collections import OrderedDict, Counter
+from typing import Optional, Tuple, List, Union, Iterator
+import json
 import os
+import threading
+import time
 
 from src.faq_retriever import FAQRetriever
 from src.metadata_filter import MetadataFilter
-from src.response_generator import ResponseGenerator
+from src.response_generator import ResponseGenerator, ResponseTemplateCache, StructuredResponse
 from src.bangla_processor import BanglaProcessor
+from src.topic_router import TopicRouter
+from src.bloom_filter import FastRejectFilter
+from src.heavy_hitters import HeavyHitterTracker
+from src.index_cache import IndexCache
+from src.related_graph import RelatedQuestionsGraph
+from src.autocomplete import Autocompleter
+from src.shard_coordinator import ShardCoordinator
+from src.vocabulary import TokenPool, Vocabulary
+from src.conversation import ConversationSession, SessionStore
 
 
 class BanglaFAQChatbot:
@@ -25,54 +38,253 @@ class BanglaFAQChatbot:
     # Confidence threshold for accepting an answer
     CONFIDENCE_THRESHOLD = 0.1  # Lower threshold for simpler matching
 
-    def __init__(self, faq_database_path: str):
+    # Exhaustive scoring is vectorized over token ids and outruns pruning
+    RETRIEVAL_MODE = 'exact'
+
+    # Answers kept in memory (LRU) and heavy-hitter queries pre-warmed at startup
+    ANSWER_CACHE_SIZE = 1024
+    PREWARM_COUNT = 100
+
+    # Neighbors precomputed per FAQ for related questions
+    RELATED_K = 5
+
+    # Answers after which autocomplete is re-ranked by FAQ popularity
+    AUTOCOMPLETE_REFRESH = 1000
+
+    # Previous-turn candidates a follow-up question re-ranks first, and the
+    # score they must reach before the search widens to the whole partition
+    SESSION_CANDIDATES = 20
+    FOLLOWUP_CONFIDENCE = 0.7
+
+    def __init__(
+        self,
+        faq_database_path: Optional[str],
+        cache_dir: Optional[str] = None,
+        bloom_fp_rate: float = 0.01,
+        query_stats_path: Optional[str] = None,
+        coordinator: Optional[ShardCoordinator] = None,
+        token_pool: Optional[TokenPool] = None,
+        dedup_threshold: Optional[float] = None
+    ):
         """
         Initialize chatbot
         
         Args:
-            faq_database_path: Path to FAQ JSON file
+            faq_database_path: Path to FAQ JSON file (optional with a
+                coordinator: the shard servers then hold all FAQs, and
+                features that need the local index raise RuntimeError)
+            cache_dir: Optional directory for the persistent index cache
+            bloom_fp_rate: False-positive rate of the fast-reject Bloom filters
+            query_stats_path: Optional file persisting query frequencies; the
+                most frequent queries recorded there are answered in a
+                background thread at startup
+            coordinator: Optional ShardCoordinator; retrieval then fans out
+                to shard servers instead of scoring the local database
+            token_pool: Optional TokenPool sharing token strings with the
+                chatbots of other FAQ databases (see TenantRegistry)
+            dedup_threshold: Optional similarity at which near-duplicate
+                questions are merged at load time (see NearDuplicateDetector)
         """
-        if not os.path.exists(faq_database_path):
+        if faq_database_path is None:
+            if coordinator is None:
+                raise ValueError("faq_database_path is required without a coordinator")
+        elif not os.path.exists(faq_database_path):
             raise FileNotFoundError(f"FAQ database not found: {faq_database_path}")
         
-        self.retriever = FAQRetriever(faq_database_path)
+        self.cache_dir = cache_dir
         self.filter = MetadataFilter()
         self.processor = BanglaProcessor()
+        self.retriever: Optional[FAQRetriever] = None
+        self.router: Optional[TopicRouter] = None
+        self.reject_filter: Optional[FastRejectFilter] = None
+        self.templates = ResponseTemplateCache()
+        if faq_database_path is not None:
+            self.retriever = FAQRetriever(
+                faq_database_path, mode=self.RETRIEVAL_MODE, cache_dir=cache_dir,
+                token_pool=token_pool, dedup_threshold=dedup_threshold
+            )
+            self.templates = ResponseTemplateCache(self.retriever.get_all_faqs())
+            self.router = TopicRouter.from_index(self.retriever.index)
+            self.reject_filter = FastRejectFilter.from_index(
+                self.retriever.index, bloom_fp_rate, self.retriever.QUESTION_WEIGHT
+            )
+        
+        self.answer_cache: OrderedDict = OrderedDict()
+        self.cache_stats = Counter()
+        self._cache_lock = threading.Lock()
+        self.query_stats = HeavyHitterTracker(query_stats_path, top_k=self.PREWARM_COUNT)
+        self.prewarm_thread: Optional[threading.Thread] = None
+        self.related_graph: Optional[RelatedQuestionsGraph] = None
+        self.faq_popularity = Counter()
+        self.autocompleter: Optional[Autocompleter] = None
+        self.autocomplete_thread: Optional[threading.Thread] = None
+        self._popularity_updates = 0
+        self.coordinator = coordinator
+        self.sessions = SessionStore()
+        self.session_stats = Counter()
+        self.deadline_stats = Counter()
+        
+        if self.retriever is not None:
+            print(f"✅ चेटबट आरम्भ किया गया। {self.retriever.get_faq_count()} FAQs लोड किए गए।")
+            if self.retriever.compaction_report is not None:
+                print(f"✅ {self.retriever.compaction_report['merged']} near-duplicate FAQs merged")
+        else:
+            print(f"✅ चेटबट आरम्भ किया गया। {len(coordinator.shards)} shards")
         
-        print(f"✅ चेटबट आरम्भ किया गया। {self.retriever.get_faq_count()} FAQs लोड किए गए।")
+        if self.query_stats.top:
+            self.prewarm_thread = threading.Thread(target=self._prewarm, name='answer-prewarm', daemon=True)
+            self.prewarm_thread.start()
+
+    @staticmethod
+    def _query_key(query: str, topic: Optional[str], difficulty: Optional[str]) -> str:
+        """Key identifying a question for frequency tracking"""
+        return json.dumps([query, topic, difficulty], ensure_ascii=False)
+
+    def _prewarm(self) -> None:
+        """Background thread: answer the recorded heavy hitters into the cache"""
+        for key, _ in self.query_stats.heavy_hitters(self.PREWARM_COUNT):
+            try:
+                query, topic, difficulty = json.loads(key)
+            except ValueError:
+                continue
+            cache_key = (query, topic, difficulty, False)
+            with self._cache_lock:
+                if cache_key in self.answer_cache:
+                    continue
+            *entry, degraded = self._compute_answer(query, topic, difficulty, False)
+            if not degraded:
+                self._store_answer(cache_key, tuple(entry))
+                self.cache_stats['prewarmed'] += 1
+
+    def wait_prewarmed(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for startup pre-warming to finish
+        
+        Returns:
+            True if no pre-warming is running anymore
+        """
+        if self.prewarm_thread is not None:
+            self.prewarm_thread.join(timeout)
+            return not self.prewarm_thread.is_alive()
+        return True
+
+    def _store_answer(self, cache_key: tuple, answer: tuple) -> None:
+        """Insert an answer into the LRU cache"""
+        with self._cache_lock:
+            self.answer_cache[cache_key] = answer
+            self.answer_cache.move_to_end(cache_key)
+            while len(self.answer_cache) > self.ANSWER_CACHE_SIZE:
+                self.answer_cache.popitem(last=False)
+
+    def close(self) -> None:
+        """Persist query statistics and stop shard requests"""
+        self.query_stats.save()
+        if self.coordinator is not None:
+            self.coordinator.close()
+
+    def _require_local_index(self, feature: str) -> FAQRetriever:
+        """Get the local retriever, or fail for chatbots serving from shards only"""
+        if self.retriever is None:
+            raise RuntimeError(f"{feature} needs the local FAQ database")
+        return self.retriever
+
+    def route_topics(self, query: str) -> Optional[List[str]]:
+        """
+        Predict the topic partitions to search for a query
+        
+        Returns:
+            Routed topics, or None if the router is not confident (or
+            there is no local database to route over)
+        """
+        if self.router is None:
+            return None
+        return self.router.route(BanglaProcessor.tokenize(query.lower()))
+
+    def may_answer(self, query: str, topic: Optional[str]) -> bool:
+        """
+        Cheap pre-check: False if no FAQ of the topic can reach CONFIDENCE_THRESHOLD
+        
+        Queries rejected here get the fallback without filtering or scoring.
+        """
+        if self.reject_filter is None:
+            return True
+        topics = None if topic is None else [topic]
+        return self.reject_filter.may_answer(query, topics, self.CONFIDENCE_THRESHOLD)
+
+    def _filter_candidates(
+        self,
+        topic: Optional[str],
+        difficulty: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Get FAQs matching topic and (optional) difficulty
+        
+        With topic None the query is routed to its most likely topics,
+        falling back to the whole corpus. Empty if topic is invalid.
+        """
+        if topic is None:
+            routed = self.route_topics(query or '')
+            if routed:
+                filtered_faqs = self.retriever.get_topic_faqs(routed)
+            else:
+                filtered_faqs = self.retriever.get_all_faqs()
+        elif not self.filter.is_valid_topic(topic):
+            return []
+        else:
+            filtered_faqs = self.filter.filter_by_topic(
+                self.retriever.get_all_faqs(),
+                topic
+            )
+        
+        if difficulty and self.filter.is_valid_difficulty(difficulty):
+            filtered_faqs = self.filter.filter_by_difficulty(filtered_faqs, difficulty)
+        
+        return filtered_faqs
 
     def answer_question(
         self,
         query: str,
-        topic: str,
+        topic: Optional[str],
         difficulty: Optional[str] = None,
         return_multiple: bool = False,
-        top_k: int = 1
+        top_k: int = 1,
+        session: Optional[ConversationSession] = None,
+        deadline: Optional[float] = None
     ) -> Tuple[Optional[List], bool]:
         """
         Answer a question using RAG pipeline
         
         Args:
             query: User's question
-            topic: Selected topic
+            topic: Selected topic, or None to route the query automatically
             difficulty: Optional difficulty filter
             return_multiple: Whether to return multiple results
             top_k: Number of results to return
+            session: Optional conversation whose previous turn is re-ranked first
+            deadline: Optional time.monotonic() value to answer by; retrieval
+                degrades to cheaper strategies when short of time (see
+                answer_within_deadline, which also reports degradation)
             
         Returns:
             Tuple of (results, is_fallback) where results is list of (FAQ, score)
         """
+        if deadline is not None and session is None:
+            results, is_fallback, _ = self.answer_within_deadline(query, topic, difficulty, deadline, top_k)
+            return results, is_fallback
+        
         try:
-            if not self.filter.is_valid_topic(topic):
+            if self.coordinator is not None:
+                results, is_fallback, _ = self._answer_from_shards(query, topic, difficulty, top_k)
+                return results, is_fallback
+            
+            if not self.may_answer(query, topic):
                 return None, True
             
-            filtered_faqs = self.filter.filter_by_topic(
-                self.retriever.get_all_faqs(),
-                topic
-            )
+            if session is not None:
+                return self._answer_in_session(session, query, top_k)
             
-            if difficulty and self.filter.is_valid_difficulty(difficulty):
-                filtered_faqs = self.filter.filter_by_difficulty(filtered_faqs, difficulty)
+            filtered_faqs = self._filter_candidates(topic, difficulty, query)
             
             if not filtered_faqs:
                 return None, True
@@ -80,7 +292,8 @@ class BanglaFAQChatbot:
             results = self.retriever.retrieve(
                 query,
                 candidates=filtered_faqs,
-                top_k=top_k
+                top_k=top_k,
+                min_score=self.CONFIDENCE_THRESHOLD
             )
             
             if results and results[0][1] >= self.CONFIDENCE_THRESHOLD:
@@ -92,55 +305,339 @@ class BanglaFAQChatbot:
             print(f"Error: {str(e)}")
             return None, True
 
+    def answer_within_deadline(
+        self,
+        query: str,
+        topic: Optional[str],
+        difficulty: Optional[str],
+        deadline: float,
+        top_k: int = 1
+    ) -> Tuple[Optional[List], bool, bool]:
+        """
+        Answer a question by a deadline, degrading retrieval when short of time
+        
+        The topic partition is taken from precomputed positions instead of
+        filtering the database, and FAQRetriever.retrieve_by_deadline picks
+        the exact ranking if it fits the remaining time, else the best
+        keyword and partial-scan matches found before the deadline.
+        Undegraded results equal answer_question without a deadline.
+        
+        Args:
+            query: User's question
+            topic: Selected topic, or None to route the query automatically
+            difficulty: Optional difficulty filter
+            deadline: time.monotonic() value to answer by
+            top_k: Number of results to return
+            
+        Returns:
+            Tuple of (results, is_fallback, degraded)
+        """
+        try:
+            if self.coordinator is not None:
+                # Shard requests are bounded by the coordinator's own timeout
+                return self._answer_from_shards(query, topic, difficulty, top_k)
+            
+            if not self.may_answer(query, topic):
+                return None, True, False
+            
+            if topic is None:
+                topics = self.route_topics(query)
+            elif not self.filter.is_valid_topic(topic):
+                return None, True, False
+            else:
+                topics = [topic]
+            if difficulty and not self.filter.is_valid_difficulty(difficulty):
+                difficulty = None
+            
+            positions = self.retriever.partition_positions(topics, difficulty or None)
+            results, degraded = self.retriever.retrieve_by_deadline(query, positions, deadline, top_k)
+            
+            self.deadline_stats['queries'] += 1
+            if degraded:
+                self.deadline_stats['degraded'] += 1
+            if time.monotonic() > deadline:
+                self.deadline_stats['missed'] += 1
+            
+            if results and results[0][1] >= self.CONFIDENCE_THRESHOLD:
+                return results, False, degraded
+            return None, True, degraded
+            
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return None, True, False
+
+    def _answer_in_session(
+        self,
+        session: ConversationSession,
+        query: str,
+        top_k: int
+    ) -> Tuple[Optional[List], bool]:
+        """
+        Answer a conversation turn, re-ranking the previous turn's candidates first
+        
+        A follow-up sharing a token with the previous question is scored
+        against the previous SESSION_CANDIDATES only. If its best match
+        reaches FOLLOWUP_CONFIDENCE and no FAQ of the partition scores
+        higher, that ranking is used. The check is a pruned top-1 search
+        over the cached partition positions with that score as min_score:
+        it returns at once when no FAQ can reach it and otherwise stops
+        walking posting lists as soon as no unseen FAQ can. On equal
+        scores the previous turn's candidate wins. Otherwise the whole
+        (cached) topic partition is ranked exactly, as without a session,
+        and its top candidates are kept for the next turn.
+        """
+        session.turns += 1
+        query_ids, _ = self.retriever.index.query_ids(query.lower())
+        
+        # Routed partitions depend on the query; explicit topics are cached
+        partition, positions = session.partition, session.positions
+        if partition is None or session.topic is None:
+            partition = self._filter_candidates(session.topic, session.difficulty, query)
+            positions = self.retriever.index.positions(partition)
+            if session.topic is not None:
+                session.partition, session.positions = partition, positions
+        if not partition:
+            return None, True
+        
+        if session.candidates and Vocabulary.intersection_size(query_ids, session.query_ids):
+            reranked = self.retriever.rerank(query, session.candidates)
+            best = reranked[0][1]
+            if best >= self.FOLLOWUP_CONFIDENCE:
+                rival = self.retriever.retrieve(
+                    query, partition, top_k=1, mode='pruned', min_score=best, positions=positions
+                )
+                if not rival or rival[0][1] <= best:
+                    self.session_stats['reranked'] += 1
+                    session.query_ids = query_ids
+                    session.candidates = [faq for faq, _ in reranked]
+                    return reranked[:top_k], False
+                self.session_stats['outscored'] += 1
+        
+        self.session_stats['widened'] += 1
+        ranked = self.retriever.rank_partition(
+            query, partition, positions, max(top_k, self.SESSION_CANDIDATES)
+        )
+        session.query_ids = query_ids
+        session.candidates = [faq for faq, _ in ranked]
+        
+        if ranked and ranked[0][1] >= self.CONFIDENCE_THRESHOLD:
+            return ranked[:top_k], False
+        return None, True
+
+    def _record_cached_turn(self, session: ConversationSession, query: str, faq_id: Optional[str]) -> None:
+        """Update a session for a turn answered from the answer cache"""
+        session.turns += 1
+        self.session_stats['cached'] += 1
+        faq = self.retriever.get_faq_by_id(faq_id) if faq_id is not None else None
+        candidates = [candidate for candidate in session.candidates if candidate is not faq]
+        if faq is not None:
+            candidates.insert(0, faq)
+        session.query_ids, _ = self.retriever.index.query_ids(query.lower())
+        session.candidates = candidates[:self.SESSION_CANDIDATES]
+
+    def _answer_from_shards(
+        self,
+        query: str,
+        topic: Optional[str],
+        difficulty: Optional[str],
+        top_k: int
+    ) -> Tuple[Optional[List], bool, bool]:
+        """
+        Answer via the shard coordinator: (results, is_fallback, degraded)
+        
+        Missing shards only lower recall, but such answers are flagged as
+        degraded so that they are not cached.
+        """
+        if topic is not None and not self.filter.is_valid_topic(topic):
+            return None, True, False
+        if difficulty and not self.filter.is_valid_difficulty(difficulty):
+            difficulty = None
+        
+        try:
+            results, missing = self.coordinator.search(
+                query, topic, difficulty, top_k, min_score=self.CONFIDENCE_THRESHOLD
+            )
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return None, True, True
+        if missing:
+            print(f"⚠️  Shards {missing} did not answer in time; results are partial")
+        if results:
+            return results, False, bool(missing)
+        return None, True, bool(missing)
+
     def generate_answer(
         self,
         query: str,
-        topic: str,
-        difficulty: Optional[str] = None
-    ) -> Tuple[str, bool]:
+        topic: Optional[str],
+        difficulty: Optional[str] = None,
+        structured: bool = False,
+        session_id: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[Union[str, StructuredResponse], bool]:
         """
         Generate complete answer for user query
         
         Args:
             query: User's question
-            topic: Selected topic
+            topic: Selected topic, or None to route the query automatically
             difficulty: Optional difficulty filter
+            structured: Return a StructuredResponse instead of formatted text
+            session_id: Optional conversation id; follow-up questions of a
+                session re-rank the previous turn's candidates first (see
+                _answer_in_session). Session answers are not cached, but
+                cached answers do count as session turns.
+            deadline: Optional time.monotonic() value to answer by (not used
+                for session answers). Cached answers are served first; otherwise
+                retrieval may degrade (StructuredResponse.degraded), and
+                degraded answers are not cached.
             
         Returns:
-            Tuple of (response_text, is_fallback)
+            Tuple of (response, is_fallback)
         """
+        self.query_stats.record(self._query_key(query, topic, difficulty))
+        
+        cache_key = (query, topic, difficulty, structured)
+        with self._cache_lock:
+            entry = self.answer_cache.get(cache_key)
+            if entry is not None:
+                self.answer_cache.move_to_end(cache_key)
+                self.cache_stats['hits'] += 1
+            else:
+                self.cache_stats['misses'] += 1
+        
+        if session_id is not None and self.coordinator is None:
+            session = self.sessions.get(session_id, topic, difficulty)
+            if entry is None:
+                entry = self._compute_answer(query, topic, difficulty, structured, session)[:3]
+            else:
+                self._record_cached_turn(session, query, entry[2])
+        elif entry is None:
+            *entry, degraded = self._compute_answer(query, topic, difficulty, structured, deadline=deadline)
+            entry = tuple(entry)
+            if not degraded:
+                self._store_answer(cache_key, entry)
+        
+        response, is_fallback, faq_id = entry
+        if faq_id is not None:
+            with self._cache_lock:
+                self.faq_popularity[faq_id] += 1
+                self._popularity_updates += 1
+        return response, is_fallback
+
+    def _compute_answer(
+        self,
+        query: str,
+        topic: Optional[str],
+        difficulty: Optional[str],
+        structured: bool,
+        session: Optional[ConversationSession] = None,
+        deadline: Optional[float] = None
+    ) -> Tuple[Union[str, StructuredResponse], bool, Optional[str], bool]:
+        """Run the RAG pipeline and format the answer: (response, is_fallback, answered FAQ id, degraded)"""
         # Get answer from RAG
-        results, is_fallback = self.answer_question(
-            query, topic, difficulty, return_multiple=False
-        )
+        if self.coordinator is not None:
+            results, is_fallback, degraded = self._answer_from_shards(query, topic, difficulty, 1)
+        elif deadline is not None and session is None:
+            results, is_fallback, degraded = self.answer_within_deadline(query, topic, difficulty, deadline)
+        else:
+            results, is_fallback = self.answer_question(
+                query, topic, difficulty, return_multiple=False, session=session
+            )
+            degraded = False
         
         if is_fallback or not results:
+            if structured:
+                return ResponseGenerator.to_structured(None, topic)._replace(degraded=degraded), True, None, degraded
+            
             # Return fallback response
             fallback_msg = ResponseGenerator.get_fallback_response(topic)
-            return fallback_msg, True
+            return fallback_msg, True, None, degraded
         
         # Generate response from matched FAQ
         faq_match = results[0]
         faq, score = faq_match
         
+        if structured:
+            return ResponseGenerator.to_structured(faq_match)._replace(degraded=degraded), False, faq.get('id'), degraded
+        
         # Format response with metadata
-        response = ResponseGenerator.format_response_with_context(
-            response_text=faq.get('answer', ''),
-            topic=topic,
-            difficulty=faq.get('difficulty', ''),
-            confidence=score,
-            is_fallback=False
+        response = self.templates.format_context(
+            faq, topic or faq.get('topic', ''), faq.get('difficulty', ''), score
         )
         
-        return response, False
+        return response, False, faq.get('id'), degraded
+
+    def stream_answer(
+        self,
+        query: str,
+        topic: Optional[str],
+        difficulty: Optional[str] = None,
+        top_k: int = 3,
+        sentence_chunks: bool = False
+    ) -> Iterator[str]:
+        """
+        Stream a multi-result answer chunk by chunk
+        
+        Results are pulled from FAQRetriever.iter_retrieve, so the first
+        chunk is produced as soon as the best match is certain and above
+        CONFIDENCE_THRESHOLD, before the remaining candidates are scored.
+        The joined chunks equal ResponseGenerator.generate_detailed_response
+        for the same results.
+        
+        Args:
+            query: User's question
+            topic: Selected topic
+            difficulty: Optional difficulty filter
+            top_k: Number of results to include
+            sentence_chunks: Yield long answers one sentence at a time
+            
+        Yields:
+            Response text chunks (a single fallback message if nothing matches)
+        """
+        self._require_local_index("Streaming answers")
+        filtered_faqs = self._filter_candidates(topic, difficulty, query) if self.may_answer(query, topic) else []
+        if not filtered_faqs:
+            yield ResponseGenerator.get_fallback_response(topic)
+            return
+        
+        ranked = self.retriever.iter_retrieve(query, candidates=filtered_faqs, top_k=top_k)
+        first = next(ranked, None)
+        
+        if first is None or first[1] < self.CONFIDENCE_THRESHOLD:
+            yield ResponseGenerator.get_fallback_response(topic)
+            return
+        
+        def results():
+            yield first
+            yield from ranked
+        
+        yield from ResponseGenerator.iter_detailed_response(
+            results(), top_k=top_k, templates=self.templates, sentence_chunks=sentence_chunks
+        )
 
     def get_stats(self) -> dict:
         """Get chatbot statistics"""
         stats = {
-            'total_faqs': self.retriever.get_faq_count(),
             'topics': list(self.filter.get_topics().keys()),
-            'difficulties': list(self.filter.get_difficulties().keys())
+            'difficulties': list(self.filter.get_difficulties().keys()),
+            'answer_cache': {**self.cache_stats, 'size': len(self.answer_cache)},
+            'heavy_hitters': self.query_stats.get_stats(),
+            'sessions': {**self.sessions.get_stats(), **self.session_stats},
+            'autocomplete_bytes': self.autocompleter.nbytes() if self.autocompleter else 0
         }
+        if self.coordinator is not None:
+            stats['shards'] = self.coordinator.get_stats()
+        if self.retriever is None:
+            return stats
+        
+        stats.update({
+            'total_faqs': self.retriever.get_faq_count(),
+            'retrieval': self.retriever.get_stats(),
+            'routing': self.router.get_stats(),
+            'fast_reject': self.reject_filter.get_stats(),
+            'deadline': {**self.deadline_stats, 'full_rank_cost': self.retriever.full_rank_cost},
+        })
         
         # Count FAQs per topic
         for topic in stats['topics']:
@@ -151,16 +648,107 @@ class BanglaFAQChatbot:
         
         return stats
 
-    def search_similar(self, query: str, top_k: int = 3) -> List[dict]:
+    def load_related_graph(self) -> RelatedQuestionsGraph:
+        """
+        Get the related-questions graph, computing it on first use
+        
+        With a cache_dir the graph is stored next to the index cache and
+        only recomputed when the FAQ database changes.
+        """
+        if self.related_graph is not None:
+            return self.related_graph
+        self._require_local_index("Related questions")
+        
+        cache = None
+        if self.cache_dir:
+            config = {
+                **self.retriever.index_config(),
+                'related_graph': RelatedQuestionsGraph.VERSION,
+                'k': self.RELATED_K
+            }
+            cache = IndexCache(self.cache_dir, config)
+            graph = cache.load(self.retriever.faq_file_path)
+            if isinstance(graph, RelatedQuestionsGraph):
+                self.related_graph = graph
+                return graph
+        
+        graph = RelatedQuestionsGraph.build(self.retriever.index, self.RELATED_K)
+        if cache is not None:
+            cache.save(self.retriever.faq_file_path, graph)
+        self.related_graph = graph
+        return graph
+
+    def related_questions(self, faq_id: str, top_k: int = 3) -> List[dict]:
+        """
+        Get FAQs related to an FAQ (precomputed, no corpus scan)
+        
+        Same ranking as search_similar with the FAQ's question, without
+        the FAQ itself and without unrelated (zero-score) FAQs.
+        
+        Args:
+            faq_id: FAQ id
+            top_k: Number of related FAQs (at most RELATED_K)
+            
+        Returns:
+            List of related FAQs, best first (empty for unknown ids)
+        """
+        graph = self.load_related_graph()
+        faqs = self.retriever.index.faqs
+        return [faqs[pos] for pos, _ in graph.related(faq_id, top_k)]
+
+    def autocomplete(self, prefix: str, topic: Optional[str] = None, limit: int = 5) -> List[str]:
+        """
+        Suggest completions for a partially typed question
+        
+        Completions are FAQ questions and keywords of the topic, ranked by
+        how often their FAQs were answered. Every AUTOCOMPLETE_REFRESH
+        answers the prefix index is rebuilt in a background thread, and
+        suggestions come from the previous index until it is swapped in.
+        
+        Args:
+            prefix: Text typed so far
+            topic: Selected topic, or None for all topics
+            limit: Maximum number of suggestions
+            
+        Returns:
+            Suggested completions, most popular first
+        """
+        self._require_local_index("Autocomplete")
+        autocompleter = self.autocompleter
+        if autocompleter is None:
+            autocompleter = self._rebuild_autocompleter()
+        elif self._popularity_updates >= self.AUTOCOMPLETE_REFRESH:
+            with self._cache_lock:
+                start = self.autocomplete_thread is None or not self.autocomplete_thread.is_alive()
+                if start:
+                    self.autocomplete_thread = threading.Thread(
+                        target=self._rebuild_autocompleter, name='autocomplete-rebuild', daemon=True
+                    )
+                    self.autocomplete_thread.start()
+        return autocompleter.complete(prefix, topic, limit)
+
+    def _rebuild_autocompleter(self) -> Autocompleter:
+        """Build the prefix index with current answer counts and swap it in"""
+        with self._cache_lock:
+            popularity = dict(self.faq_popularity)
+            self._popularity_updates = 0
+        autocompleter = Autocompleter(self.retriever.index, popularity)
+        self.autocompleter = autocompleter
+        return autocompleter
+
+    def search_similar(self, query: str, top_k: int = 3, route: bool = False) -> List[dict]:
         """
         Search for similar FAQs without topic filter
         
         Args:
             query: Search query
             top_k: Number of results
+            route: Only scan the topic partitions predicted by the router
             
         Returns:
             List of similar FAQs
         """
-        results = self.retriever.retrieve(query, top_k=top_k)
+        self._require_local_index("Similar-question search")
+        candidates = self._filter_candidates(None, query=query) if route else None
+        results = self.retriever.retrieve(query, candidates=candidates, top_k=top_k)
         return [faq for faq, _ in results]
@@ -0,0 +1,115 @@
+"""Conversation sessions carrying retrieval state between follow-up questions"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict, Counter
+from typing import Optional, List, Dict
+
+
+class ConversationSession:
+    """
+    Retrieval state of one conversation on a fixed topic and difficulty
+
+    partition holds the topic/difficulty-filtered FAQs and their database
+    positions (cached after the first turn for an explicit topic);
+    query_ids and candidates are the previous turn's query token ids and
+    its ranked top FAQs, which a follow-up question re-ranks first.
+    """
+
+    def __init__(self, session_id: str, topic: Optional[str], difficulty: Optional[str]):
+        self.session_id = session_id
+        self.topic = topic
+        self.difficulty = difficulty
+        self.partition: Optional[List[Dict]] = None
+        self.positions: Optional[List[int]] = None
+        self.query_ids = array('I')
+        self.candidates: List[Dict] = []
+        self.turns = 0
+        self.last_used = time.monotonic()
+
+
+class SessionStore:
+    """
+    Bounded set of conversation sessions with idle-timeout eviction
+
+    Sessions unused for idle_timeout seconds are dropped whenever the
+    store is accessed; beyond max_sessions the least recently used
+    session is dropped as well.
+    """
+
+    IDLE_TIMEOUT = 900.0
+    MAX_SESSIONS = 1000
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, max_sessions: int = MAX_SESSIONS):
+        """
+        Initialize empty store
+
+        Args:
+            idle_timeout: Seconds after which an unused session is dropped
+            max_sessions: Most sessions kept at once
+        """
+        if idle_timeout <= 0 or max_sessions < 1:
+            raise ValueError("idle_timeout and max_sessions must be positive")
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions: OrderedDict = OrderedDict()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, topic: Optional[str], difficulty: Optional[str]) -> ConversationSession:
+        """
+        Get a session, creating it (or resetting it if topic or difficulty changed)
+
+        Returns:
+            The session, marked as just used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle(now)
+            session = self.sessions.get(session_id)
+            if session is None or (session.topic, session.difficulty) != (topic, difficulty):
+                session = ConversationSession(session_id, topic, difficulty)
+                self.sessions[session_id] = session
+                self.stats['created'] += 1
+            self.sessions.move_to_end(session_id)
+            session.last_used = now
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.stats['evicted'] += 1
+            return session
+
+    def end(self, session_id: str) -> None:
+        """Drop a finished conversation"""
+        with self._lock:
+            self.sessions.pop(session_id, None)
+
+    def evict_idle(self) -> int:
+        """
+        Drop sessions idle for longer than idle_timeout
+
+        Returns:
+            Number of sessions dropped
+        """
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now: float) -> int:
+        """Drop idle sessions from the least recently used end"""
+        dropped = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if now - session.last_used <= self.idle_timeout:
+                break
+            self.sessions.popitem(last=False)
+            dropped += 1
+        self.stats['expired'] += dropped
+        return dropped
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def get_stats(self) -> Dict:
+        """Get session counts"""
+        with self._lock:
+            return {'active': len(self.sessions), **self.stats}
@@ -0,0 +1,324 @@
+"""Precomputed per-FAQ features used by the retriever"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Iterable, Set, Sequence
+
+import numpy as np
+
+from .bangla_processor import BanglaProcessor
+from .minhash_lsh import MinHashLSH
+from .vocabulary import Vocabulary, TokenPool
+
+
+class FAQIndex:
+    """
+    Derived scoring structures for a loaded FAQ database
+
+    FAQ questions and keywords are static once loaded, so their
+    tokenization is done once here instead of on every query. Question
+    tokens are interned into a Vocabulary and stored as sorted integer
+    id arrays.
+
+    With workers > 1 the per-FAQ work (normalization, tokenization,
+    keyword lowercasing, question postings) runs on chunks of the FAQ
+    list in a process pool. Chunks intern tokens into their own
+    vocabulary; merging them in database order assigns every token the
+    id it gets in a serial build, so both builds pickle to the same
+    bytes (with forked workers, which share the parent's str hashing).
+    """
+
+    # Bump whenever the derived structures change, to invalidate on-disk caches
+    VERSION = 4
+
+    # Chunks per worker process (more chunks even out uneven FAQ lengths)
+    CHUNKS_PER_WORKER = 4
+
+    # Smaller databases are always built serially
+    PARALLEL_MIN_FAQS = 2000
+
+    def __init__(self, faqs: List[Dict], workers: int = 1):
+        """
+        Build index for a list of FAQs
+
+        Args:
+            faqs: FAQ dictionaries in database order
+            workers: Worker processes for the per-FAQ work (1 builds in this process)
+        """
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self.faqs = faqs
+        self.vocabulary = Vocabulary()
+        if workers > 1 and len(faqs) >= self.PARALLEL_MIN_FAQS:
+            self._build_parallel(workers)
+        else:
+            self._build_serial()
+        self._positions = {id(faq): pos for pos, faq in enumerate(faqs)}
+        
+        # Topic partitions: topic -> positions in database order
+        self.topic_positions: Dict[str, List[int]] = {}
+        for pos, faq in enumerate(faqs):
+            self.topic_positions.setdefault(faq.get('topic'), []).append(pos)
+        
+        # Inverted index: keyword -> positions
+        self.keyword_postings: Dict[str, List[int]] = {}
+        for pos, keywords in enumerate(self.keywords):
+            for keyword in set(keywords):
+                self.keyword_postings.setdefault(keyword, []).append(pos)
+        
+        # Question sizes for vectorized scoring
+        self.question_sizes = np.array([len(ids) for ids in self.question_ids], dtype=np.int64)
+        
+        # Optional MinHash LSH over question tokens (see build_lsh)
+        self.lsh: Optional[MinHashLSH] = None
+        
+        # Report of the near-duplicate compaction faqs went through, if any
+        # (kept with the index so that index cache hits still have it)
+        self.compaction_report: Optional[Dict] = None
+
+    def _build_serial(self) -> None:
+        """Tokenize questions and build question postings in this process"""
+        self.question_ids: List[array] = [
+            self.vocabulary.add_all(BanglaProcessor.tokenize(faq.get('question', '').lower()))
+            for faq in self.faqs
+        ]
+        self.keywords: List[List[str]] = [
+            [keyword.lower() for keyword in faq.get('keywords', [])]
+            for faq in self.faqs
+        ]
+
+        # Inverted index: question token id -> positions
+        self.postings: Dict[int, array] = {}
+        for pos, ids in enumerate(self.question_ids):
+            for token_id in ids:
+                self.postings.setdefault(token_id, array('I')).append(pos)
+
+    def _build_parallel(self, workers: int) -> None:
+        """Build chunks in a process pool and merge them in database order"""
+        size = max(1, -(-len(self.faqs) // (workers * self.CHUNKS_PER_WORKER)))
+        chunks = [
+            (start, [(faq.get('question', ''), faq.get('keywords', [])) for faq in self.faqs[start:start + size]])
+            for start in range(0, len(self.faqs), size)
+        ]
+
+        self.question_ids = []
+        self.keywords = []
+        self.postings = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for tokens, local_ids, lengths, keywords, positions, bounds in pool.map(_index_chunk, chunks):
+                # Chunk tokens are in first-occurrence order, as a serial build meets them
+                mapping = np.array([self.vocabulary.add(token) for token in tokens], dtype=np.uint32)
+
+                # Global ids sorted within each FAQ, split into one array per FAQ
+                faq_of = np.repeat(np.arange(len(lengths)), lengths)
+                global_ids = mapping[local_ids]
+                data = global_ids[np.lexsort((global_ids, faq_of))].tobytes()
+                offsets = np.concatenate(([0], np.cumsum(lengths) * global_ids.itemsize)).tolist()
+                self.question_ids.extend(
+                    array(Vocabulary.TYPECODE, data[lo:hi]) for lo, hi in zip(offsets[:-1], offsets[1:])
+                )
+                self.keywords.extend(keywords)
+
+                # Postings keys are inserted in serial order: first position, then id
+                data, bounds = positions.tobytes(), (bounds * positions.itemsize).tolist()
+                new_keys = sorted(
+                    (int(positions[bounds[local] // positions.itemsize]), token_id, local)
+                    for local, token_id in enumerate(mapping.tolist()) if token_id not in self.postings
+                )
+                for _, token_id, local in new_keys:
+                    self.postings[token_id] = array('I')
+                for local, token_id in enumerate(mapping.tolist()):
+                    self.postings[token_id].frombytes(data[bounds[local]:bounds[local + 1]])
+
+    def __getstate__(self) -> Dict:
+        """Pickle support: object-id positions are rebuilt on load"""
+        state = self.__dict__.copy()
+        del state['_positions']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        """Restore pickled index"""
+        self.__dict__.update(state)
+        self._positions = {id(faq): pos for pos, faq in enumerate(self.faqs)}
+
+    def position(self, faq: Dict) -> Optional[int]:
+        """Get database position of an indexed FAQ, or None if not indexed"""
+        pos = self._positions.get(id(faq))
+        if pos is not None and self.faqs[pos] is faq:
+            return pos
+        return None
+
+    def features(self, faq: Dict, extra: Optional[Dict[str, int]] = None) -> Tuple[array, int, List[str]]:
+        """
+        Get (question token ids, question token count, lowercased keywords)
+
+        FAQs that are not part of the index are tokenized on the fly (see
+        Vocabulary.encode for the meaning of extra).
+        """
+        pos = self.position(faq)
+        if pos is not None:
+            ids = self.question_ids[pos]
+            return ids, len(ids), self.keywords[pos]
+
+        ids, size = self.vocabulary.encode(BanglaProcessor.tokenize(faq.get('question', '').lower()), extra)
+        return ids, size, [keyword.lower() for keyword in faq.get('keywords', [])]
+
+    def query_ids(self, query_lower: str, extra: Optional[Dict[str, int]] = None) -> Tuple[array, int]:
+        """
+        Map a lowercased query to (sorted token ids, distinct token count)
+
+        Tokens outside the vocabulary are dropped immediately unless extra
+        is given (needed when scoring FAQs that are not indexed).
+        """
+        return self.vocabulary.encode(BanglaProcessor.tokenize(query_lower), extra)
+
+    def question_tokens(self, pos: int) -> List[str]:
+        """Get the question tokens of an indexed FAQ"""
+        return self.vocabulary.decode(self.question_ids[pos])
+
+    def positions(self, faqs: Iterable[Dict]) -> Optional[List[int]]:
+        """Get database positions of FAQs, or None if any FAQ is not indexed"""
+        result = []
+        for faq in faqs:
+            pos = self.position(faq)
+            if pos is None:
+                return None
+            result.append(pos)
+        return result
+
+    def overlap_counts(self, query_ids: Iterable[int]) -> np.ndarray:
+        """Count shared question tokens of every FAQ by walking the postings"""
+        lists = [np.frombuffer(self.postings[token_id], dtype=np.uint32) for token_id in query_ids
+                 if token_id in self.postings]
+        if not lists:
+            return np.zeros(len(self.faqs), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self.faqs))
+
+    def keyword_hits(self, query_lower: str) -> Set[int]:
+        """Get positions of FAQs having at least one keyword inside the query"""
+        hits: Set[int] = set()
+        for keyword, positions in self.keyword_postings.items():
+            if keyword in query_lower:
+                hits.update(positions)
+        return hits
+
+    def intern_tokens(self, pool: TokenPool) -> None:
+        """Share question tokens and keywords with other indexes through a pool"""
+        self.vocabulary.intern(pool)
+        self.keywords = [[pool.intern(keyword) for keyword in keywords] for keywords in self.keywords]
+        self.keyword_postings = {
+            pool.intern(keyword): positions for keyword, positions in self.keyword_postings.items()
+        }
+
+    def build_lsh(self, bands: int, rows: int, workers: int = 1) -> MinHashLSH:
+        """Compute MinHash signatures of all questions (in workers processes) and bucket them"""
+        lsh = MinHashLSH(bands=bands, rows=rows)
+        if workers > 1 and len(self.faqs) >= self.PARALLEL_MIN_FAQS:
+            size = max(1, -(-len(self.faqs) // (workers * self.CHUNKS_PER_WORKER)))
+            chunks = [
+                (bands, rows, [self.question_tokens(pos) for pos in range(start, min(start + size, len(self.faqs)))])
+                for start in range(0, len(self.faqs), size)
+            ]
+            pos = 0
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for signatures, empty, token_hashes in pool.map(_signature_chunk, chunks):
+                    for token, value in token_hashes.items():
+                        # Key with the vocabulary's str object, as serial hashing does
+                        token = self.vocabulary.tokens[self.vocabulary.ids[token]]
+                        lsh._token_hashes.setdefault(token, value)
+                    # Unpickled arrays carry their own dtype instance; astype
+                    # restores the shared native one that serial signatures use
+                    signatures = signatures.astype(np.uint64)
+                    for signature, is_empty in zip(signatures, empty.tolist()):
+                        lsh.insert(pos, None if is_empty else signature.copy())
+                        pos += 1
+        else:
+            for pos in range(len(self.faqs)):
+                lsh.add(pos, self.question_tokens(pos))
+        self.lsh = lsh
+        return lsh
+
+    def size(self) -> int:
+        """Get number of indexed FAQs"""
+        return len(self.faqs)
+
+
+def _index_chunk(chunk: Tuple[int, List[Tuple[str, Sequence[str]]]]) -> Tuple:
+    """
+    Worker: build the per-FAQ structures of one chunk
+
+    Token ids are local to the chunk and results are flat arrays, which
+    pickle far faster than one object per FAQ or token.
+
+    Args:
+        chunk: (database position of the first FAQ, [(question, keywords)])
+
+    Returns:
+        Tuple of (chunk tokens by local id, concatenated local question
+        ids, token count per FAQ, lowercased keywords per FAQ, database
+        positions grouped by local id, group bounds)
+    """
+    start, items = chunk
+    vocabulary = Vocabulary()
+    question_ids, keywords = [], []
+    for question, faq_keywords in items:
+        question_ids.append(vocabulary.add_all(BanglaProcessor.tokenize(question.lower())))
+        keywords.append([keyword.lower() for keyword in faq_keywords])
+
+    lengths = np.array([len(ids) for ids in question_ids], dtype=np.int64)
+    local_ids = np.frombuffer(b''.join(ids.tobytes() for ids in question_ids), dtype=np.uint32)
+
+    # Partial postings: stable sort keeps positions ascending per token
+    order = np.argsort(local_ids, kind='stable')
+    positions = (np.repeat(np.arange(len(items)), lengths)[order] + start).astype(np.uint32)
+    bounds = np.searchsorted(local_ids[order], np.arange(len(vocabulary) + 1)).astype(np.int64)
+    return vocabulary.tokens, local_ids, lengths, keywords, positions, bounds
+
+
+def _signature_chunk(chunk: Tuple[int, int, List[List[str]]]) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    """
+    Worker: MinHash signatures of a chunk of questions
+
+    Returns:
+        Tuple of (signature per row, empty-question flags, token hashes computed)
+    """
+    bands, rows, token_lists = chunk
+    lsh = MinHashLSH(bands=bands, rows=rows)
+    signatures = np.zeros((len(token_lists), lsh.num_perm), dtype=np.uint64)
+    empty = np.zeros(len(token_lists), dtype=bool)
+    for row, tokens in enumerate(token_lists):
+        signature = lsh.signature(tokens)
+        if signature is None:
+            empty[row] = True
+        else:
+            signatures[row] = signature
+    return signatures, empty, lsh._token_hashes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Build the FAQ index of a large database in parallel into the index cache"""
+    import argparse
+    import os
+    import time
+    from .faq_retriever import FAQRetriever
+
+    parser = argparse.ArgumentParser(description="Build the FAQ index cache with a process pool")
+    parser.add_argument('--faqs', default='data/bangla_faqs.json', help='FAQ JSON database')
+    parser.add_argument('--cache-dir', default='data/.index_cache', help='Index cache directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--mode', default='exact', help="Retrieval mode ('lsh' also builds signatures)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        retriever = FAQRetriever(args.faqs, mode=args.mode, cache_dir=args.cache_dir, build_workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    print(f"✅ Indexed {retriever.get_faq_count()} FAQs with {args.workers} workers "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
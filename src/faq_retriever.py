@@ -1,38 +1,210 @@
 """RAG-based FAQ retriever using semantic search"""
 
+import heapq
 import json
 import os
-from typing import List, Dict, Tuple, Optional
+import time
+from array import array
+from itertools import chain
+from typing import List, Dict, Tuple, Optional, Iterator, Set
 import numpy as np
 from collections import Counter
 
 from .bangla_processor import BanglaProcessor
+from .faq_index import FAQIndex
+from .index_cache import IndexCache
+from .near_duplicates import NearDuplicateDetector, compact_faqs
+from .vocabulary import Vocabulary, TokenPool
 
 
 class FAQRetriever:
     """Retrieve relevant FAQs using semantic search and similarity matching"""
 
-    def __init__(self, faq_file_path: str):
+    # Scoring weights: question similarity and (capped) keyword bonus
+    QUESTION_WEIGHT = 0.7
+    KEYWORD_BONUS = 0.3
+
+    # Retrieval modes: exhaustive scoring, exact dynamic pruning, or
+    # approximate MinHash LSH candidates re-scored exactly
+    MODES = ('exact', 'pruned', 'lsh')
+
+    # Deadline-aware retrieval (retrieve_by_deadline): posting entries
+    # walked for a degraded answer, weight of the newest sample in the
+    # learned cost of a full ranking, and decay of that cost on every
+    # degraded answer (so full rankings resume once load drops)
+    DEGRADED_POSTINGS = 8192
+    COST_SMOOTHING = 0.2
+    COST_DECAY = 0.95
+
+    def __init__(
+        self,
+        faq_file_path: str,
+        mode: str = 'exact',
+        cache_dir: Optional[str] = None,
+        lsh_bands: int = 32,
+        lsh_rows: int = 2,
+        build_workers: int = 1,
+        token_pool: Optional[TokenPool] = None,
+        dedup_threshold: Optional[float] = None
+    ):
         """
         Initialize FAQ retriever
         
         Args:
             faq_file_path: Path to FAQ JSON database
+            mode: Default retrieval mode (see MODES)
+            cache_dir: Optional directory for the persistent index cache
+            lsh_bands: Number of LSH bands for the 'lsh' mode
+            lsh_rows: MinHash values per band (signature length = bands * rows)
+            build_workers: Processes building the index on a cache miss
+                (the result is identical to a serial build)
+            token_pool: Optional pool sharing token strings with other retrievers
+            dedup_threshold: Merge near-duplicate questions of a topic at this
+                shingle similarity before indexing (None keeps every FAQ)
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid retrieval mode: {mode}")
+        
         self.faq_file_path = faq_file_path
+        self.mode = mode
+        self.lsh_bands = lsh_bands
+        self.lsh_rows = lsh_rows
+        self.build_workers = build_workers
+        self.token_pool = token_pool
+        self.dedup_threshold = dedup_threshold
+        self.compaction_report: Optional[Dict] = None
         self.faqs = []
+        self.index = FAQIndex([])
+        self.stats = Counter()
+        self.full_rank_cost = 0.0
+        self._partitions: Dict[Tuple, np.ndarray] = {}
+        self._keyword_tokens: Optional[Dict[str, List[str]]] = None
+        self._faqs_by_id: Optional[Dict[str, Dict]] = None
+        self.cache = IndexCache(cache_dir, self.index_config()) if cache_dir else None
         self.load_faqs()
+        self._seed_rank_cost()
+
+    def index_config(self) -> Dict:
+        """Configuration the built index depends on (used as cache key)"""
+        return {
+            'index_version': FAQIndex.VERSION,
+            'question_weight': self.QUESTION_WEIGHT,
+            'keyword_bonus': self.KEYWORD_BONUS,
+            'stop_words': sorted(BanglaProcessor.STOP_WORDS),
+            'lsh': [self.lsh_bands, self.lsh_rows],
+            'dedup_threshold': self.dedup_threshold
+        }
+
+    def _ensure_lsh(self):
+        """Get the LSH index, building it on first use"""
+        lsh = self.index.lsh
+        if lsh is None or (lsh.bands, lsh.rows) != (self.lsh_bands, self.lsh_rows):
+            lsh = self.index.build_lsh(self.lsh_bands, self.lsh_rows, self.build_workers)
+        return lsh
 
     def load_faqs(self) -> None:
-        """Load FAQ database from JSON file"""
+        """Load FAQ database from JSON file (or from the index cache)"""
         if not os.path.exists(self.faq_file_path):
             raise FileNotFoundError(f"FAQ file not found: {self.faq_file_path}")
         
+        if self.cache is not None:
+            cached = self.cache.load(self.faq_file_path)
+            if isinstance(cached, FAQIndex) and cached.faqs:
+                self.faqs = cached.faqs
+                self.index = cached
+                self._record_compaction(cached.compaction_report)
+                if self.token_pool is not None:
+                    self.index.intern_tokens(self.token_pool)
+                self.stats['index_cache_hits'] += 1
+                if self.mode == 'lsh':
+                    self._ensure_lsh()
+                return
+            self.stats['index_cache_misses'] += 1
+        
         with open(self.faq_file_path, 'r', encoding='utf-8') as f:
             self.faqs = json.load(f)
         
         if not self.faqs:
             raise ValueError("FAQ database is empty")
+        
+        report = None
+        if self.dedup_threshold is not None:
+            self.faqs, report = compact_faqs(self.faqs, NearDuplicateDetector(self.dedup_threshold))
+        
+        self.index = FAQIndex(self.faqs, workers=self.build_workers)
+        self.index.compaction_report = report
+        self._record_compaction(report)
+        if self.token_pool is not None:
+            self.index.intern_tokens(self.token_pool)
+        if self.mode == 'lsh':
+            self._ensure_lsh()
+        
+        if self.cache is not None:
+            self.cache.save(self.faq_file_path, self.index)
+
+    def _record_compaction(self, report: Optional[Dict]) -> None:
+        """Expose the compaction report of the loaded index"""
+        self.compaction_report = report
+        if report is not None:
+            self.stats['near_duplicates_merged'] += report['merged']
+
+    def _query_features(self, query: str, extra: Optional[Dict[str, int]] = None) -> Tuple[array, int, str]:
+        """Get (token ids, distinct token count, lowercased text) of a query"""
+        query_lower = query.lower()
+        query_ids, query_size = self.index.query_ids(query_lower, extra)
+        return query_ids, query_size, query_lower
+
+    @classmethod
+    def _keyword_score(cls, query_lower: str, keywords: List[str]) -> float:
+        """Keyword bonus: KEYWORD_BONUS if any keyword occurs in the query"""
+        keyword_score = 0
+        for keyword in keywords:
+            if keyword in query_lower:
+                keyword_score += cls.KEYWORD_BONUS
+        return min(keyword_score, cls.KEYWORD_BONUS)
+
+    @classmethod
+    def _score(
+        cls,
+        query_ids: array,
+        query_size: int,
+        query_lower: str,
+        ids: array,
+        size: int,
+        keywords: List[str]
+    ) -> float:
+        """Score one FAQ from precomputed features (sorted token id arrays)"""
+        if not query_size or not size:
+            question_sim = 0.0
+        else:
+            shared = Vocabulary.intersection_size(query_ids, ids)
+            question_sim = shared / (query_size + size - shared)
+        
+        return (question_sim * cls.QUESTION_WEIGHT) + cls._keyword_score(query_lower, keywords)
+
+    @classmethod
+    def _upper_bound(cls, query_size: int, query_lower: str, size: int, keywords: List[str]) -> float:
+        """
+        Upper bound of _score computed from token-set sizes only
+        
+        Jaccard similarity can never exceed min(|q|, |d|) / max(|q|, |d|).
+        """
+        if not query_size or not size:
+            sim_bound = 0.0
+        else:
+            sim_bound = min(query_size, size) / max(query_size, size)
+        
+        return (sim_bound * cls.QUESTION_WEIGHT) + cls._keyword_score(query_lower, keywords)
+
+    @classmethod
+    def _score_from_overlap(cls, shared: int, query_size: int, text_size: int, bonus: float) -> float:
+        """Score one FAQ from its shared-token count; same value as _score"""
+        if not query_size or not text_size:
+            question_sim = 0.0
+        else:
+            question_sim = shared / (query_size + text_size - shared)
+        
+        return (question_sim * cls.QUESTION_WEIGHT) + bonus
 
     def _calculate_similarity(self, query: str, text: str) -> float:
         """
@@ -56,37 +228,226 @@ class FAQRetriever:
         
         return len(intersection) / len(union) if union else 0.0
 
-    def _rank_results(self, query: str, candidates: List[Dict]) -> List[Tuple[Dict, float]]:
+    def _rank_results(
+        self,
+        query: str,
+        candidates: List[Dict],
+        limit: Optional[int] = None
+    ) -> List[Tuple[Dict, float]]:
         """
         Rank FAQ candidates by relevance to query
         
         Args:
             query: User query
             candidates: List of candidate FAQs
+            limit: Optional number of top results to return
             
         Returns:
             List of (FAQ, score) tuples sorted by score (descending)
         """
-        results = []
+        positions = None if candidates is self.faqs else self.index.positions(candidates)
+        if candidates is self.faqs or positions is not None:
+            query_ids, query_size, query_lower = self._query_features(query)
+            return self._rank_indexed(query_ids, query_size, query_lower, candidates, positions, limit)
         
+        # Candidates outside the index: unknown tokens need consistent temporary ids
+        extra = {}
+        query_ids, query_size, query_lower = self._query_features(query, extra)
+        results = []
         for faq in candidates:
-            question_sim = self._calculate_similarity(query, faq.get('question', ''))
-            keyword_score = 0
-            for keyword in faq.get('keywords', []):
-                if keyword.lower() in query.lower():
-                    keyword_score += 0.3
-            
-            total_score = (question_sim * 0.7) + min(keyword_score, 0.3)
+            ids, size, keywords = self.index.features(faq, extra)
+            total_score = self._score(query_ids, query_size, query_lower, ids, size, keywords)
             results.append((faq, total_score))
         
         results.sort(key=lambda x: x[1], reverse=True)
-        return results
+        return results[:limit] if limit is not None else results
+
+    def _rank_indexed(
+        self,
+        query_ids: array,
+        query_size: int,
+        query_lower: str,
+        candidates: List[Dict],
+        positions: Optional[List[int]],
+        limit: Optional[int]
+    ) -> List[Tuple[Dict, float]]:
+        """
+        Exhaustive ranking of indexed candidates, vectorized over token ids
+        
+        Shared-token counts for every FAQ come from one bincount over the
+        posting lists of the query's token ids; scores and their stable
+        order are identical to the per-FAQ computation.
+        """
+        index = self.index
+        shared = index.overlap_counts(query_ids)
+        sizes = index.question_sizes
+        hit = np.zeros(len(index.faqs), dtype=bool)
+        hits = index.keyword_hits(query_lower)
+        if hits:
+            hit[list(hits)] = True
+        
+        if positions is not None:
+            selected = np.asarray(positions, dtype=np.int64)
+            shared, sizes, hit = shared[selected], sizes[selected], hit[selected]
+        
+        question_sim = np.zeros(len(sizes), dtype=np.float64)
+        if query_size:
+            nonempty = sizes > 0
+            question_sim[nonempty] = shared[nonempty] / (query_size + sizes[nonempty] - shared[nonempty])
+        scores = (question_sim * self.QUESTION_WEIGHT) + np.where(hit, self.KEYWORD_BONUS, 0.0)
+        
+        order = np.argsort(-scores, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return [(candidates[i], float(scores[i])) for i in order.tolist()]
+
+    def _rank_pruned(
+        self,
+        query: str,
+        search_space: List[Dict],
+        top_k: int,
+        min_score: Optional[float] = None,
+        positions: Optional[List[int]] = None
+    ) -> Optional[List[Tuple[Dict, float]]]:
+        """
+        Exact top-k ranking with MaxScore-style dynamic pruning
+        
+        Query tokens are processed rarest posting list first. A FAQ that
+        has not been reached after r remaining tokens can share at most r
+        of the |q| query tokens, so its score is bounded by 0.7 * r / |q|
+        (keyword hits are known up front and always scored). Once that
+        bound falls below the k-th best score found so far, the remaining
+        posting lists are no longer walked and only the FAQs already seen
+        are completed by lookups in their token id arrays.
+        
+        Database positions of search_space may be passed in when they are
+        already known, which skips looking them up.
+        
+        Returns:
+            Same list as the exhaustive ranking truncated to top_k (or [] when
+            the best score is below min_score), or None if the search space
+            contains FAQs that are not part of the index
+        """
+        index = self.index
+        if search_space is self.faqs:
+            local = None
+        else:
+            db_positions = positions if positions is not None else index.positions(search_space)
+            if db_positions is None:
+                return None
+            local = {db: lp for lp, db in enumerate(db_positions)}
+        
+        query_ids, query_size, query_lower = self._query_features(query)
+        question_ids = index.question_ids
+        self.stats['pruned_queries'] += 1
+        
+        # FAQs with a keyword hit are always scored
+        hits = index.keyword_hits(query_lower)
+        if local is not None:
+            hits = {db for db in hits if db in local}
+        shared = {db: 0 for db in hits}
+        
+        terms = sorted(
+            (token_id for token_id in query_ids if token_id in index.postings),
+            key=lambda token: len(index.postings[token])
+        )
+        
+        if min_score is not None:
+            best_possible = (len(terms) / query_size if query_size else 0.0) * self.QUESTION_WEIGHT
+            if hits:
+                best_possible += self.KEYWORD_BONUS
+            if best_possible < min_score:
+                self.stats['early_rejects'] += 1
+                self.stats['skipped_faqs'] += len(search_space)
+                return []
+        
+        def lower_bound(db: int) -> float:
+            bonus = self.KEYWORD_BONUS if db in hits else 0
+            return self._score_from_overlap(shared[db], query_size, len(question_ids[db]), bonus)
+        
+        processed = 0
+        for remaining, token_id in zip(range(len(terms), 0, -1), terms):
+            if len(shared) >= top_k:
+                kth_best = heapq.nlargest(top_k, map(lower_bound, shared))[-1]
+                if (remaining / query_size) * self.QUESTION_WEIGHT < kth_best:
+                    break
+            
+            for db in index.postings[token_id]:
+                if local is None or db in local:
+                    shared[db] = shared.get(db, 0) + 1
+            processed += 1
+        
+        # Complete the FAQs already seen with the unwalked (longest) posting lists
+        for token_id in terms[processed:]:
+            for db in shared:
+                if token_id in question_ids[db]:
+                    shared[db] += 1
+        
+        self.stats['skipped_postings'] += len(terms) - processed
+        
+        order = (lambda db: db) if local is None else local.__getitem__
+        ranked = sorted(
+            ((lower_bound(db), order(db), db) for db in shared),
+            key=lambda item: (-item[0], item[1])
+        )[:top_k]
+        
+        # Unreached FAQs share no token and have no keyword hit: score 0.0
+        if len(ranked) < top_k and processed == len(terms):
+            zero = self._score_from_overlap(0, query_size, 0, 0)
+            for lp, faq in enumerate(search_space):
+                if len(ranked) >= top_k:
+                    break
+                db = lp if local is None else db_positions[lp]
+                if db not in shared:
+                    ranked.append((zero, lp, db))
+        
+        self.stats['scored_faqs'] += len(shared)
+        self.stats['skipped_faqs'] += len(search_space) - len(shared)
+        
+        if min_score is not None and (not ranked or ranked[0][0] < min_score):
+            return []
+        
+        return [(index.faqs[db], score) for score, _, db in ranked]
+
+    def _rank_lsh(self, query: str, search_space: List[Dict]) -> Optional[List[Tuple[Dict, float]]]:
+        """
+        Approximate ranking: exact scores for LSH bucket collisions only
+        
+        Candidates are the FAQs whose question signature collides with
+        the query in at least one band, plus FAQs with a keyword hit (the
+        keyword bonus is not part of Jaccard). FAQs outside that set are
+        never scored, so low-similarity matches may be missed.
+        
+        Returns:
+            Ranked (FAQ, score) tuples, or None if the search space contains
+            FAQs that are not part of the index
+        """
+        query_lower = query.lower()
+        lsh = self._ensure_lsh()
+        
+        collisions = lsh.query(BanglaProcessor.tokenize(query_lower)) | self.index.keyword_hits(query_lower)
+        
+        if search_space is self.faqs:
+            subset = [self.faqs[db] for db in sorted(collisions)]
+        else:
+            db_positions = self.index.positions(search_space)
+            if db_positions is None:
+                return None
+            subset = [faq for faq, db in zip(search_space, db_positions) if db in collisions]
+        
+        self.stats['lsh_queries'] += 1
+        self.stats['lsh_candidates'] += len(subset)
+        self.stats['skipped_faqs'] += len(search_space) - len(subset)
+        return self._rank_results(query, subset)
 
     def retrieve(
         self,
         query: str,
         candidates: Optional[List[Dict]] = None,
-        top_k: int = 1
+        top_k: int = 1,
+        mode: Optional[str] = None,
+        min_score: Optional[float] = None,
+        positions: Optional[List[int]] = None
     ) -> List[Tuple[Dict, float]]:
         """
         Retrieve top-k most relevant FAQs for a query
@@ -95,23 +456,308 @@ class FAQRetriever:
             query: User question/query
             candidates: Optional list of pre-filtered FAQs to search within
             top_k: Number of top results to return
+            mode: Retrieval mode (see MODES), defaults to self.mode
+            min_score: Return [] if the best result scores below this value
+            positions: Known database positions of candidates ('pruned' mode
+                       uses them instead of looking them up)
             
         Returns:
             List of (FAQ, score) tuples
         """
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid retrieval mode: {mode}")
+        
         search_space = candidates if candidates else self.faqs
         if not search_space:
             return []
         
-        ranked = self._rank_results(query, search_space)
-        return ranked[:top_k]
+        if mode == 'pruned' and top_k > 0:
+            ranked = self._rank_pruned(query, search_space, top_k, min_score, positions)
+            if ranked is not None:
+                return ranked
+        
+        ranked = None
+        if mode == 'lsh':
+            ranked = self._rank_lsh(query, search_space)
+        
+        if ranked is None:
+            self.stats['exact_queries'] += 1
+            ranked = self._rank_results(query, search_space, top_k)
+        
+        ranked = ranked[:top_k]
+        if min_score is not None and ranked and ranked[0][1] < min_score:
+            return []
+        return ranked
+
+    def rank_partition(
+        self,
+        query: str,
+        partition: List[Dict],
+        positions: List[int],
+        limit: Optional[int] = None
+    ) -> List[Tuple[Dict, float]]:
+        """
+        Exact ranking of indexed FAQs whose database positions are known
+
+        Same result as exhaustive retrieve() over partition, without
+        looking up the positions again (see ConversationSession).
+        """
+        query_ids, query_size, query_lower = self._query_features(query)
+        return self._rank_indexed(query_ids, query_size, query_lower, partition, positions, limit)
+
+    def rerank(self, query: str, faqs: List[Dict], top_k: Optional[int] = None) -> List[Tuple[Dict, float]]:
+        """
+        Score a few FAQs one by one, without a pass over the whole index
+
+        Used to re-rank a previous turn's candidates for a follow-up
+        question; scores equal those of retrieve().
+        """
+        extra = {}
+        query_ids, query_size, query_lower = self._query_features(query, extra)
+        results = []
+        for faq in faqs:
+            ids, size, keywords = self.index.features(faq, extra)
+            results.append((faq, self._score(query_ids, query_size, query_lower, ids, size, keywords)))
+        
+        results.sort(key=lambda x: x[1], reverse=True)
+        self.stats['reranked_faqs'] += len(faqs)
+        return results[:top_k] if top_k is not None else results
+
+    def partition_positions(self, topics: Optional[List[str]], difficulty: Optional[str] = None) -> np.ndarray:
+        """
+        Database positions of the FAQs in topics (all if None) with difficulty
+
+        Partitions are computed once per (topics, difficulty).
+
+        Returns:
+            Sorted int64 positions, the same FAQs and order as filtering the database
+        """
+        key = (None if topics is None else tuple(topics), difficulty)
+        positions = self._partitions.get(key)
+        if positions is None:
+            if topics is None:
+                selected = range(len(self.faqs))
+            else:
+                selected = heapq.merge(*[self.index.topic_positions.get(topic, []) for topic in topics])
+            positions = np.array(
+                [pos for pos in selected if difficulty is None or self.faqs[pos].get('difficulty') == difficulty],
+                dtype=np.int64
+            )
+            self._partitions[key] = positions
+        return positions
+
+    def retrieve_by_deadline(
+        self,
+        query: str,
+        positions: np.ndarray,
+        deadline: float,
+        top_k: int = 1
+    ) -> Tuple[List[Tuple[Dict, float]], bool]:
+        """
+        Best results over indexed FAQs reachable before a deadline
+        
+        Strategies, most complete first:
+        
+            full     exact ranking, as retrieve(); chosen when its learned
+                     cost per FAQ (seeded by a warm-up ranking at load)
+                     times len(positions) fits the remaining time
+            keyword  FAQs with a keyword sharing a token with the query
+                     and occurring in it; their bonus is the full
+                     KEYWORD_BONUS and their overlap is counted exactly,
+                     so scores are exact
+            postings the other FAQs on the query's rarest posting lists,
+                     walked until the deadline or DEGRADED_POSTINGS
+                     entries; their overlap counts only the walked tokens
+                     and keywords sharing no token with the query are not
+                     checked (checking every keyword is what makes the
+                     full ranking expensive)
+        
+        When the full ranking does not fit, only these candidates are
+        scored, never the whole partition or corpus, and the results are
+        flagged as degraded. Ties keep database order, as in retrieve().
+        
+        Args:
+            query: User question/query
+            positions: Sorted database positions to search (see partition_positions)
+            deadline: time.monotonic() value by which to answer
+            top_k: Number of top results to return
+            
+        Returns:
+            Tuple of (list of (FAQ, score), degraded)
+        """
+        start = time.monotonic()
+        if not len(positions) or top_k <= 0:
+            return [], False
+        
+        if start + self.full_rank_cost * len(positions) <= deadline:
+            order = positions.tolist()
+            ranked = self.rank_partition(query, [self.faqs[pos] for pos in order], order, top_k)
+            sample = (time.monotonic() - start) / len(positions)
+            self.full_rank_cost += self.COST_SMOOTHING * (sample - self.full_rank_cost)
+            self.stats['deadline_full'] += 1
+            return ranked, False
+        self.full_rank_cost *= self.COST_DECAY
+        self.stats['deadline_degraded'] += 1
+        
+        index = self.index
+        query_lower = query.lower()
+        tokens = BanglaProcessor.tokenize(query_lower)
+        query_ids, query_size = index.vocabulary.encode(tokens)
+        
+        def in_partition(docs: np.ndarray) -> np.ndarray:
+            found = np.minimum(np.searchsorted(positions, docs), len(positions) - 1)
+            return positions[found] == docs
+        
+        matches: Set[int] = set()
+        for keyword in self._keywords_sharing_tokens(tokens):
+            if keyword in query_lower:
+                matches.update(index.keyword_postings[keyword])
+        matches = np.array(sorted(matches), dtype=np.int64)
+        matches = matches[in_partition(matches)]
+        
+        terms = sorted(
+            (token_id for token_id in query_ids if token_id in index.postings),
+            key=lambda token: len(index.postings[token])
+        )
+        walked, budget = [], self.DEGRADED_POSTINGS
+        for token_id in terms:
+            posting = np.frombuffer(index.postings[token_id], dtype=np.uint32)
+            if len(posting) > budget or time.monotonic() >= deadline:
+                break
+            walked.append(posting)
+            budget -= len(posting)
+        self.stats['deadline_skipped_postings'] += len(terms) - len(walked)
+        
+        if walked:
+            docs, shared = np.unique(np.concatenate(walked).astype(np.int64), return_counts=True)
+            keep = in_partition(docs)
+            docs, shared = docs[keep], shared[keep]
+        else:
+            docs = shared = np.zeros(0, dtype=np.int64)
+        
+        # Keyword matches are scored exactly, from their own token ids
+        lengths = index.question_sizes[matches]
+        match_ids = np.fromiter(
+            chain.from_iterable(index.question_ids[pos] for pos in matches.tolist()),
+            dtype=np.int64, count=int(lengths.sum())
+        )
+        exact = np.bincount(
+            np.repeat(np.arange(len(matches)), lengths),
+            weights=np.isin(match_ids, np.asarray(query_ids, dtype=np.int64)),
+            minlength=len(matches)
+        ).astype(np.int64)
+        other = ~np.isin(docs, matches, assume_unique=True)
+        docs = np.concatenate((matches, docs[other]))
+        shared = np.concatenate((exact, shared[other]))
+        bonus = np.zeros(len(docs), dtype=np.float64)
+        bonus[:len(matches)] = self.KEYWORD_BONUS
+        
+        sizes = index.question_sizes[docs]
+        question_sim = np.zeros(len(docs), dtype=np.float64)
+        if query_size:
+            nonempty = sizes > 0
+            question_sim[nonempty] = shared[nonempty] / (query_size + sizes[nonempty] - shared[nonempty])
+        scores = (question_sim * self.QUESTION_WEIGHT) + bonus
+        self.stats['deadline_scanned_faqs'] += len(docs)
+        
+        best = np.lexsort((docs, -scores))[:top_k]
+        return [(self.faqs[docs[i]], float(scores[i])) for i in best.tolist()], True
+
+    def _seed_rank_cost(self) -> None:
+        """Seed the learned full-ranking cost per FAQ with one warm-up ranking"""
+        if not self.faqs:
+            return
+        query_ids, query_size, query_lower = self._query_features(self.faqs[0].get('question', ''))
+        start = time.monotonic()
+        self._rank_indexed(query_ids, query_size, query_lower, self.faqs, None, 1)
+        self.full_rank_cost = (time.monotonic() - start) / len(self.faqs)
+
+    def _keywords_sharing_tokens(self, tokens: List[str]) -> Set[str]:
+        """Indexed keywords having one of tokens among their own tokens"""
+        if self._keyword_tokens is None:
+            self._keyword_tokens = {}
+            for keyword in self.index.keyword_postings:
+                for token in set(BanglaProcessor.tokenize(keyword)):
+                    self._keyword_tokens.setdefault(token, []).append(keyword)
+        return {keyword for token in set(tokens) for keyword in self._keyword_tokens.get(token, ())}
+
+    def iter_retrieve(
+        self,
+        query: str,
+        candidates: Optional[List[Dict]] = None,
+        top_k: int = 1
+    ) -> Iterator[Tuple[Dict, float]]:
+        """
+        Yield the top-k results one by one, as soon as each rank is certain
+        
+        Candidates are scored best-first by their upper bound. A scored
+        result is emitted once no unscored candidate can still outrank it,
+        so the first result is usually available before the whole search
+        space has been scored. The yielded sequence is identical to
+        retrieve() with the same arguments.
+        
+        Args:
+            query: User question/query
+            candidates: Optional list of pre-filtered FAQs to search within
+            top_k: Number of top results to yield
+            
+        Yields:
+            (FAQ, score) tuples in rank order
+        """
+        search_space = candidates if candidates else self.faqs
+        if not search_space or top_k <= 0:
+            return
+        
+        extra = {}
+        query_ids, query_size, query_lower = self._query_features(query, extra)
+        
+        pending = []
+        for pos, faq in enumerate(search_space):
+            ids, size, keywords = self.index.features(faq, extra)
+            bound = self._upper_bound(query_size, query_lower, size, keywords)
+            pending.append((-bound, pos, ids, size, keywords))
+        pending.sort(key=lambda item: (item[0], item[1]))
+        
+        # Heap of scored candidates ordered like the stable sort in _rank_results
+        scored = []
+        emitted = 0
+        
+        for neg_bound, pos, ids, size, keywords in pending:
+            # Emit every scored result that this (and any later) candidate cannot beat
+            while scored and scored[0] < (neg_bound, pos):
+                neg_score, best_pos = heapq.heappop(scored)
+                yield search_space[best_pos], -neg_score
+                emitted += 1
+                if emitted >= top_k:
+                    return
+            
+            score = self._score(query_ids, query_size, query_lower, ids, size, keywords)
+            heapq.heappush(scored, (-score, pos))
+        
+        while scored and emitted < top_k:
+            neg_score, best_pos = heapq.heappop(scored)
+            yield search_space[best_pos], -neg_score
+            emitted += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get retrieval instrumentation counters"""
+        return dict(self.stats)
+
+    def get_topic_faqs(self, topics: List[str]) -> List[Dict]:
+        """Get FAQs of the given topic partitions in database order"""
+        partitions = [self.index.topic_positions.get(topic, []) for topic in topics]
+        return [self.faqs[pos] for pos in heapq.merge(*partitions)]
 
     def get_faq_by_id(self, faq_id: str) -> Optional[Dict]:
-        """Get FAQ by its ID"""
-        for faq in self.faqs:
-            if faq.get('id') == faq_id:
-                return faq
-        return None
+        """Get FAQ by its ID (or the ID of a near duplicate merged into it)"""
+        if self._faqs_by_id is None:
+            by_id: Dict[str, Dict] = {}
+            for faq in self.faqs:
+                for key in [faq.get('id')] + list(faq.get('aliases', ())):
+                    by_id.setdefault(key, faq)
+            self._faqs_by_id = by_id
+        return self._faqs_by_id.get(faq_id)
 
     def get_all_faqs(self) -> List[Dict]:
         """Get all FAQs"""
@@ -0,0 +1,207 @@
+"""Bounded-memory tracking of the most frequent queries"""
+
+import base64
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counts in a fixed depth x width table
+
+    Estimates never undercount; they overcount by at most
+    e / width * total with probability 1 - exp(-depth). Hashes are
+    derived from BLAKE2b, so a persisted sketch stays valid across runs.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        """
+        Initialize empty sketch
+
+        Args:
+            width: Counters per row
+            depth: Number of rows (independent hash functions)
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+        self.total = 0
+
+    def _columns(self, key: str) -> np.ndarray:
+        """Column of key in every row (double hashing)"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(h1 + row * h2) % self.width for row in range(self.depth)], dtype=np.int64)
+
+    def add(self, key: str, count: int = 1) -> int:
+        """
+        Count key occurrences
+
+        Returns:
+            New estimated count of key
+        """
+        rows = np.arange(self.depth)
+        columns = self._columns(key)
+        self.table[rows, columns] += np.uint32(count)
+        self.total += count
+        return int(self.table[rows, columns].min())
+
+    def estimate(self, key: str) -> int:
+        """Estimated count of key (never below the true count)"""
+        return int(self.table[np.arange(self.depth), self._columns(key)].min())
+
+
+class HeavyHitterTracker:
+    """
+    Streaming top-k query tracker: Count-Min Sketch plus a top-k heap
+
+    Memory is fixed by the sketch size and k, however many distinct
+    queries are seen. State is saved to disk atomically every
+    persist_interval seconds (checked when recording) and on save().
+    """
+
+    FORMAT = 1
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        top_k: int = 100,
+        width: int = 2048,
+        depth: int = 4,
+        persist_interval: float = 60.0
+    ):
+        """
+        Initialize tracker, loading saved state from path if present
+
+        Args:
+            path: Optional file to persist the sketch and top-k in
+            top_k: Number of heavy hitters to keep
+            width: Count-Min Sketch width
+            depth: Count-Min Sketch depth
+            persist_interval: Seconds between automatic saves
+        """
+        self.path = path
+        self.top_k = top_k
+        self.persist_interval = persist_interval
+        self.sketch = CountMinSketch(width, depth)
+        self.top: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._dirty = False
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def record(self, key: str) -> int:
+        """
+        Count one occurrence of key
+
+        Returns:
+            Estimated count of key
+        """
+        with self._lock:
+            estimate = self.sketch.add(key)
+            self._offer(key, estimate)
+            self._dirty = True
+            due = self.path and time.monotonic() - self._last_save >= self.persist_interval
+
+        if due:
+            self.save()
+        return estimate
+
+    def _offer(self, key: str, estimate: int) -> None:
+        """Update the top-k with a new estimate (heap entries are lazily invalidated)"""
+        if key not in self.top and len(self.top) >= self.top_k:
+            # Drop stale entries to find the current minimum
+            while self._heap and self.top.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap or estimate <= self._heap[0][0]:
+                return
+            _, evicted = heapq.heappop(self._heap)
+            del self.top[evicted]
+
+        self.top[key] = estimate
+        heapq.heappush(self._heap, (estimate, key))
+        if len(self._heap) > 4 * self.top_k:
+            self._heap = [(count, k) for k, count in self.top.items()]
+            heapq.heapify(self._heap)
+
+    def heavy_hitters(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Get up to n (key, estimated count) pairs, most frequent first"""
+        with self._lock:
+            ranked = sorted(self.top.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:n] if n is not None else ranked
+
+    def save(self) -> None:
+        """Atomically write the sketch and top-k to path"""
+        if not self.path:
+            return
+        with self._lock:
+            state = {
+                'format': self.FORMAT,
+                'width': self.sketch.width,
+                'depth': self.sketch.depth,
+                'total': self.sketch.total,
+                'table': base64.b64encode(self.sketch.table.tobytes()).decode('ascii'),
+                'top': sorted(self.top.items(), key=lambda item: -item[1])
+            }
+            self._last_save = time.monotonic()
+            self._dirty = False
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save query statistics: {e}")
+
+    def load(self) -> bool:
+        """
+        Load saved state from path
+
+        Returns:
+            True if state was loaded (an unreadable or mismatching file is ignored)
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('format') != self.FORMAT:
+                raise ValueError(f"unsupported format {state.get('format')}")
+            table = np.frombuffer(base64.b64decode(state['table']), dtype=np.uint32)
+            table = table.reshape(state['depth'], state['width']).copy()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Ignoring query statistics {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self.sketch = CountMinSketch(state['width'], state['depth'])
+            self.sketch.table = table
+            self.sketch.total = state['total']
+            self.top, self._heap = {}, []
+            for key, count in state['top']:
+                self._offer(key, count)
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get tracker statistics"""
+        return {
+            'total': self.sketch.total,
+            'tracked': len(self.top),
+            'top_k': self.top_k,
+            'sketch_bytes': self.sketch.table.nbytes
+        }
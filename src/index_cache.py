@@ -0,0 +1,154 @@
+"""Persistent on-disk cache of built FAQ indexes"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+from typing import Dict, Optional, Any
+
+
+class IndexCache:
+    """
+    Store built FAQ indexes on disk, keyed by source file and configuration
+
+    A cache file holds two pickles: a small header and the payload. The
+    header is validated first (configuration key, then source mtime+size,
+    then a full content hash only if mtime or size changed) so a stale
+    cache is rejected without reading the payload. A cache validated by
+    its content hash gets the new mtime+size written back, so the file is
+    hashed once per touch rather than on every load. The payload carries
+    its own digest, so a truncated or corrupted file is detected and
+    rebuilt.
+
+    Cache files are named after the source file plus a hash of its
+    absolute path, so sources with the same name in different
+    directories can share a cache_dir.
+
+    Cache files are trusted local artifacts (pickle); point cache_dir only
+    at directories owned by the service.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: str, config: Dict[str, Any]):
+        """
+        Initialize index cache
+
+        Args:
+            cache_dir: Directory to store cache files in
+            config: Processor/scorer configuration the index depends on
+        """
+        self.cache_dir = cache_dir
+        self.config = config
+        self.config_key = hashlib.sha256(
+            json.dumps(config, sort_keys=True, ensure_ascii=False, default=sorted).encode('utf-8')
+        ).hexdigest()[:16]
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """Get SHA-256 hex digest of a file's content"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def cache_path(self, source_path: str) -> str:
+        """Get cache file path for a source FAQ file"""
+        name = os.path.basename(source_path)
+        location = hashlib.sha256(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{name}.{location}.{self.config_key}.idx")
+
+    def load(self, source_path: str) -> Optional[Any]:
+        """
+        Load cached payload for a source file
+
+        Returns:
+            Cached payload, or None if missing, stale or corrupt
+        """
+        path = self.cache_path(source_path)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                header = pickle.load(f)
+                if not self._header_matches(header, source_path):
+                    return None
+                payload_bytes = f.read()
+
+            if hashlib.sha256(payload_bytes).hexdigest() != header['payload_sha256']:
+                return None
+            payload = pickle.loads(payload_bytes)
+        except Exception:
+            return None
+
+        stat = os.stat(source_path)
+        if (header['source_size'], header['source_mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            # Validated by the content hash: record the new mtime+size
+            header['source_size'] = stat.st_size
+            header['source_mtime_ns'] = stat.st_mtime_ns
+            try:
+                self._write(source_path, header, payload_bytes)
+            except Exception as e:
+                print(f"⚠️  Warning: could not refresh index cache header: {e}")
+        return payload
+
+    def _header_matches(self, header: Dict, source_path: str) -> bool:
+        """Check whether a cache header is valid for the current source file"""
+        if not isinstance(header, dict):
+            return False
+        if header.get('format') != self.FORMAT_VERSION or header.get('config_key') != self.config_key:
+            return False
+
+        stat = os.stat(source_path)
+        if header.get('source_size') == stat.st_size and header.get('source_mtime_ns') == stat.st_mtime_ns:
+            return True
+
+        # File was touched or resized: fall back to the content hash
+        return header.get('source_sha256') == self.file_digest(source_path)
+
+    def save(self, source_path: str, payload: Any) -> bool:
+        """
+        Atomically write payload to the cache
+
+        Returns:
+            True if written, False on failure (the cache is optional)
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            stat = os.stat(source_path)
+            payload_bytes = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+            header = {
+                'format': self.FORMAT_VERSION,
+                'config_key': self.config_key,
+                'source_size': stat.st_size,
+                'source_mtime_ns': stat.st_mtime_ns,
+                'source_sha256': self.file_digest(source_path),
+                'payload_sha256': hashlib.sha256(payload_bytes).hexdigest()
+            }
+            self._write(source_path, header, payload_bytes)
+            return True
+        except Exception as e:
+            print(f"⚠️  Warning: could not write index cache: {e}")
+            return False
+
+    def _write(self, source_path: str, header: Dict, payload_bytes: bytes) -> None:
+        """Atomically replace the cache file with header and payload"""
+        buffer = io.BytesIO()
+        pickle.dump(header, buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        buffer.write(payload_bytes)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(buffer.getvalue())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.cache_path(source_path))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,147 @@
+"""MinHash signatures with banded LSH for approximate Jaccard retrieval"""
+
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class MinHashLSH:
+    """
+    Locality-sensitive index over token sets
+
+    Each token set gets a MinHash signature of bands * rows values; two
+    sets collide in a band with probability J^rows, where J is their
+    Jaccard similarity. Sets are bucketed per band, and a query returns
+    every set sharing at least one bucket with it.
+    """
+
+    # Mersenne prime 2^31 - 1: (a * x + b) stays below 2^62 in uint64
+    PRIME = (1 << 31) - 1
+
+    # Token hashes permuted at once by signature_matrix (bounds its temporaries)
+    BATCH_HASHES = 1 << 16
+
+    def __init__(self, bands: int = 32, rows: int = 2, seed: int = 1):
+        """
+        Initialize LSH index
+
+        Args:
+            bands: Number of LSH bands
+            rows: Signature values per band
+            seed: Seed of the hash permutations
+        """
+        if bands <= 0 or rows <= 0:
+            raise ValueError("bands and rows must be positive")
+
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self.PRIME, size=self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self.PRIME, size=self.num_perm).astype(np.uint64)
+        self._token_hashes: Dict[str, int] = {}
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[int, np.ndarray] = {}
+
+    def config(self) -> Dict[str, int]:
+        """Get LSH parameters"""
+        return {'bands': self.bands, 'rows': self.rows, 'seed': self.seed}
+
+    def _token_hash(self, token: str) -> int:
+        """Stable 31-bit hash of a token (str hash() is randomized per process)"""
+        value = self._token_hashes.get(token)
+        if value is None:
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little') % self.PRIME
+            self._token_hashes[token] = value
+        return value
+
+    def signature(self, tokens: Iterable[str]) -> Optional[np.ndarray]:
+        """
+        Compute MinHash signature of a token set
+
+        Returns:
+            Array of num_perm uint64 values, or None for an empty set
+        """
+        hashes = np.fromiter((self._token_hash(token) for token in set(tokens)), dtype=np.uint64)
+        if hashes.size == 0:
+            return None
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(self.PRIME)
+        return permuted.min(axis=1)
+
+    def signature_matrix(self, token_sets: List[Iterable[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute MinHash signatures of many token sets in batches
+
+        Returns:
+            Tuple of (one signature() row per set, empty-set flags); rows of
+            empty sets are left zero
+        """
+        hashes: List[int] = []
+        lengths = []
+        known = self._token_hashes
+        for tokens in token_sets:
+            unique = set(tokens)
+            for token in unique.difference(known):
+                self._token_hash(token)
+            lengths.append(len(unique))
+            hashes.extend(map(known.__getitem__, unique))
+
+        flat = np.array(hashes, dtype=np.uint64)
+        lengths = np.array(lengths, dtype=np.int64)
+        ends = np.cumsum(lengths)
+        empty = lengths == 0
+        signatures = np.zeros((len(lengths), self.num_perm), dtype=np.uint64)
+
+        first = 0
+        while first < len(lengths):
+            # Sets whose hashes fit in one batch (at least one set)
+            start = int(ends[first] - lengths[first])
+            last = max(first + 1, int(np.searchsorted(ends, start + self.BATCH_HASHES, side='right')))
+            rows = np.arange(first, last)[~empty[first:last]]
+            if rows.size:
+                batch = flat[start:int(ends[last - 1])]
+                permuted = (self._a[:, None] * batch[None, :] + self._b[:, None]) % np.uint64(self.PRIME)
+                signatures[rows] = np.minimum.reduceat(permuted, ends[rows] - lengths[rows] - start, axis=1).T
+            first = last
+        return signatures, empty
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        """Bucket key of each band"""
+        rows = self.rows
+        for band in range(self.bands):
+            yield signature[band * rows:(band + 1) * rows].tobytes()
+
+    def add(self, key: int, tokens: Iterable[str]) -> None:
+        """Insert a token set under an integer key"""
+        self.insert(key, self.signature(tokens))
+
+    def insert(self, key: int, signature: Optional[np.ndarray]) -> None:
+        """Insert a precomputed signature (None for an empty set is skipped)"""
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, tokens: Iterable[str]) -> Set[int]:
+        """Get keys of all sets sharing at least one band bucket with tokens"""
+        signature = self.signature(tokens)
+        if signature is None:
+            return set()
+
+        result: Set[int] = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            result.update(self.buckets[band].get(band_key, ()))
+        return result
+
+    def estimate_jaccard(self, key: int, tokens: Iterable[str]) -> float:
+        """Estimate Jaccard similarity between an indexed set and tokens"""
+        stored = self.signatures.get(key)
+        signature = self.signature(tokens)
+        if stored is None or signature is None:
+            return 0.0
+        return float(np.mean(stored == signature))
@@ -0,0 +1,260 @@
+"""Ingest-time near-duplicate detection and compaction of FAQ databases"""
+
+import json
+from typing import List, Dict, Tuple, Set, Optional
+
+import numpy as np
+
+from .bangla_processor import BanglaProcessor
+from .minhash_lsh import MinHashLSH
+
+
+class NearDuplicateDetector:
+    """
+    Find near-identical questions within each topic
+
+    Questions are shingled into overlapping character k-grams of their
+    normalized tokens, so spelling and suffix variants still share most
+    shingles. A MinHash LSH similarity join yields candidate pairs
+    without comparing every pair; candidates are kept only if the exact
+    Jaccard similarity of their shingle sets reaches threshold. With 16
+    bands of 4 rows, pairs at 0.8 similarity collide with probability
+    above 0.999.
+
+    Similar pairs are only linked into candidate groups; every merged FAQ
+    is then verified against its group's canonical FAQ, so a chain
+    A ~ B ~ C where A and C differ does not merge C into A.
+    """
+
+    THRESHOLD = 0.8
+    SHINGLE_SIZE = 4
+    BANDS = 16
+    ROWS = 4
+
+    def __init__(
+        self,
+        threshold: float = THRESHOLD,
+        shingle_size: int = SHINGLE_SIZE,
+        bands: int = BANDS,
+        rows: int = ROWS
+    ):
+        """
+        Initialize detector
+
+        Args:
+            threshold: Minimum shingle Jaccard similarity of duplicates
+            shingle_size: Characters per shingle
+            bands: LSH bands of the similarity join
+            rows: MinHash values per band
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if shingle_size < 1:
+            raise ValueError("shingle_size must be positive")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+
+    def shingles(self, tokens: List[str]) -> Set[str]:
+        """Character shingles of a question's tokens (BanglaProcessor.tokenize)"""
+        text = ' '.join(tokens)
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text} if text else set()
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def find(self, faqs: List[Dict], tokens: Optional[List[List[str]]] = None) -> List[List[int]]:
+        """
+        Group near-duplicate FAQs of the same topic
+
+        Args:
+            faqs: FAQ database
+            tokens: Optional question tokens per FAQ (tokenized here if None)
+
+        Returns:
+            Clusters of database positions with at least two members, each
+            in database order; the first is the canonical FAQ, and every
+            other member reaches threshold similarity with it
+        """
+        if tokens is None:
+            tokens = _question_tokens(faqs)
+        shingle_sets = [self.shingles(question) for question in tokens]
+        parent = list(range(len(faqs)))
+
+        def root(pos: int) -> int:
+            while parent[pos] != pos:
+                parent[pos] = parent[parent[pos]]
+                pos = parent[pos]
+            return pos
+
+        topics: Dict[Optional[str], List[int]] = {}
+        for pos, faq in enumerate(faqs):
+            topics.setdefault(faq.get('topic'), []).append(pos)
+
+        lsh = MinHashLSH(bands=self.bands, rows=self.rows)
+        for positions in topics.values():
+            for a, b in self._candidate_pairs(lsh, [shingle_sets[pos] for pos in positions]):
+                a, b = positions[a], positions[b]
+                root_a, root_b = root(a), root(b)
+                if root_a != root_b and self._similar(shingle_sets[a], shingle_sets[b]):
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        groups: Dict[int, List[int]] = {}
+        for pos in range(len(faqs)):
+            groups.setdefault(root(pos), []).append(pos)
+
+        clusters = []
+        for members in groups.values():
+            # Complete linkage to the canonical FAQ: the earliest remaining
+            # member takes every remaining member similar to it
+            while len(members) > 1:
+                canonical = shingle_sets[members[0]]
+                cluster, rest = [members[0]], []
+                for pos in members[1:]:
+                    (cluster if self._similar(canonical, shingle_sets[pos]) else rest).append(pos)
+                if len(cluster) > 1:
+                    clusters.append(cluster)
+                members = rest
+        clusters.sort()
+        return clusters
+
+    def _similar(self, a: Set[str], b: Set[str]) -> bool:
+        """Check whether two shingle sets reach threshold Jaccard similarity"""
+        return len(a & b) >= self.threshold * len(a | b)
+
+    def _candidate_pairs(self, lsh: MinHashLSH, shingle_sets: List[Set[str]]) -> Set[Tuple[int, int]]:
+        """
+        Banded self-join: pairs of sets sharing a bucket in any band
+
+        Each band's values are folded into one uint64 key and sorted, so
+        buckets are runs of equal keys; folding collisions only add
+        candidates, which are verified exactly.
+        """
+        signatures, empty = lsh.signature_matrix(shingle_sets)
+        rows = np.flatnonzero(~empty)
+        pairs: Set[Tuple[int, int]] = set()
+        for band in range(self.bands):
+            keys = np.zeros(len(rows), dtype=np.uint64)
+            for column in range(band * self.rows, (band + 1) * self.rows):
+                keys = keys * np.uint64(MinHashLSH.PRIME) + signatures[rows, column]
+            order = np.argsort(keys, kind='stable')
+            ordered = keys[order]
+            starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+            sizes = np.diff(np.r_[starts, len(ordered)])
+            for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+                members = sorted(rows[order[start:start + size]].tolist())
+                pairs.update(
+                    (members[i], members[j]) for i in range(size) for j in range(i + 1, size)
+                )
+        return pairs
+
+
+def _question_tokens(faqs: List[Dict]) -> List[List[str]]:
+    """Question tokens of every FAQ, as FAQIndex tokenizes them"""
+    return [BanglaProcessor.tokenize(faq.get('question', '').lower()) for faq in faqs]
+
+
+def _index_size(faqs: List[Dict], tokens: List[List[str]]) -> Dict[str, int]:
+    """Entries of the structures FAQIndex builds for faqs"""
+    vocabulary, keywords = set(), set()
+    postings = keyword_postings = 0
+    for faq, question in zip(faqs, tokens):
+        distinct = set(question)
+        faq_keywords = {keyword.lower() for keyword in faq.get('keywords', [])}
+        vocabulary |= distinct
+        keywords |= faq_keywords
+        postings += len(distinct)
+        keyword_postings += len(faq_keywords)
+    return {
+        'vocabulary': len(vocabulary),
+        'postings': postings,
+        'keywords': len(keywords),
+        'keyword_postings': keyword_postings,
+        'corpus_bytes': len(json.dumps(faqs, ensure_ascii=False).encode('utf-8')),
+    }
+
+
+def compact_faqs(
+    faqs: List[Dict],
+    detector: Optional[NearDuplicateDetector] = None
+) -> Tuple[List[Dict], Dict]:
+    """
+    Merge near-duplicate FAQs into their canonical (first) FAQ
+
+    The canonical FAQ keeps its question and answer, gains the keywords
+    of its duplicates (in order, without repeats) and lists their ids in
+    'aliases'. Other FAQs are returned unchanged, in database order.
+
+    Args:
+        faqs: FAQ database
+        detector: Detector to use (default thresholds if None)
+
+    Returns:
+        Tuple of (compacted FAQs, report) where report gives the number
+        of merged FAQs and, as {'before', 'after'}, the FAQ count, corpus
+        bytes and index entries
+    """
+    detector = detector or NearDuplicateDetector()
+    tokens = _question_tokens(faqs)
+    clusters = detector.find(faqs, tokens)
+
+    merged: Dict[int, Dict] = {}
+    dropped: Set[int] = set()
+    for members in clusters:
+        canonical = dict(faqs[members[0]])
+        keywords = list(canonical.get('keywords', []))
+        aliases = list(canonical.get('aliases', []))
+        for pos in members[1:]:
+            duplicate = faqs[pos]
+            keywords.extend(k for k in duplicate.get('keywords', []) if k not in keywords)
+            aliases.extend(a for a in [duplicate.get('id')] + duplicate.get('aliases', []) if a is not None)
+            dropped.add(pos)
+        canonical['keywords'] = keywords
+        canonical['aliases'] = aliases
+        merged[members[0]] = canonical
+
+    kept = [pos for pos in range(len(faqs)) if pos not in dropped]
+    compacted = [merged.get(pos, faqs[pos]) for pos in kept]
+    before = _index_size(faqs, tokens)
+    after = _index_size(compacted, [tokens[pos] for pos in kept])
+    report = {
+        'clusters': len(clusters),
+        'merged': len(dropped),
+        'faqs': {'before': len(faqs), 'after': len(compacted)},
+        **{key: {'before': before[key], 'after': after[key]} for key in before},
+    }
+    return compacted, report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compact an FAQ database offline and print the size report"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge near-duplicate FAQs within each topic")
+    parser.add_argument('--faqs', default='data/bangla_faqs.json', help='FAQ JSON database')
+    parser.add_argument('--out', required=True, help='Compacted FAQ JSON output')
+    parser.add_argument('--threshold', type=float, default=NearDuplicateDetector.THRESHOLD,
+                        help='Minimum shingle Jaccard similarity of duplicates')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.faqs, 'r', encoding='utf-8') as f:
+            faqs = json.load(f)
+        compacted, report = compact_faqs(faqs, NearDuplicateDetector(args.threshold))
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(compacted, f, ensure_ascii=False, indent=2)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    print(f"✅ {report['merged']} near-duplicate FAQs merged into {report['clusters']} canonical FAQs")
+    for key in ('faqs', 'corpus_bytes', 'vocabulary', 'postings', 'keywords', 'keyword_postings'):
+        before, after = report[key]['before'], report[key]['after']
+        shrink = 1 - after / before if before else 0.0
+        print(f"   {key:<17} {before:>10} -> {after:>10}  (-{shrink:.1%})")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
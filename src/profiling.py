@@ -0,0 +1,203 @@
+"""On-demand cProfile, stack sampling and tracemalloc snapshots of a running process"""
+
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional, List, Dict
+
+
+class Profiler:
+    """
+    Start and stop profiling of the query path without a restart
+
+    While running, cProfile records the thread that called start() (the
+    thread answering queries) and a sampler thread collects its call
+    stacks every SAMPLE_INTERVAL seconds. stop() writes, into output_dir:
+
+        <pid>-<n>.pstats    cProfile statistics (python -m pstats, snakeviz)
+        <pid>-<n>.folded    collapsed stacks (flamegraph.pl, speedscope)
+        <pid>-<n>.memdiff   tracemalloc growth since start(), by source line
+
+    Profiling is triggered by the ENV_VAR environment variable (from
+    startup, value = output directory), by SIGNAL (toggle) or by calling
+    start/stop/snapshot directly, e.g. from the server's admin endpoint.
+    """
+
+    ENV_VAR = 'BANGLA_FAQ_PROFILE'
+    SIGNAL = signal.SIGUSR2
+
+    # Seconds between stack samples
+    SAMPLE_INTERVAL = 0.005
+
+    # Frames kept per allocation traceback and lines reported per memory diff
+    TRACE_FRAMES = 10
+    TOP_ALLOCATIONS = 25
+
+    def __init__(self, output_dir: Optional[str] = None):
+        """
+        Initialize stopped profiler
+
+        Args:
+            output_dir: Directory for the dumps (default: $BANGLA_FAQ_PROFILE
+                or <tmp>/bangla_faq_profile)
+        """
+        self.output_dir = (output_dir or os.environ.get(self.ENV_VAR)
+                           or os.path.join(tempfile.gettempdir(), 'bangla_faq_profile'))
+        self.profile: Optional[cProfile.Profile] = None
+        self.stacks = Counter()
+        self.dumps = 0
+        self._target_thread: Optional[int] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._sampling = threading.Event()
+        self._started_tracing = False
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @classmethod
+    def from_environment(cls) -> 'Profiler':
+        """Create a profiler, already running if ENV_VAR is set"""
+        profiler = cls()
+        if os.environ.get(cls.ENV_VAR):
+            profiler.start()
+        return profiler
+
+    @property
+    def running(self) -> bool:
+        return self.profile is not None
+
+    def start(self) -> bool:
+        """
+        Start profiling the calling thread
+
+        Returns:
+            False if already running
+        """
+        if self.running:
+            return False
+        self._start_snapshot = self._snapshot()
+        self.stacks = Counter()
+        self._target_thread = threading.get_ident()
+        self._sampling.set()
+        self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self._sampler.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return True
+
+    def stop(self) -> Dict[str, str]:
+        """
+        Stop profiling (and memory tracing started here) and write the dumps
+
+        Returns:
+            Dict of dump kind (pstats, folded, memdiff) -> path; empty if not running
+        """
+        if not self.running:
+            self._stop_tracing()
+            return {}
+        self.profile.disable()
+        self._sampling.clear()
+        self._sampler.join()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.dumps += 1
+        base = os.path.join(self.output_dir, f"{os.getpid()}-{self.dumps}")
+        paths = {'pstats': base + '.pstats', 'folded': base + '.folded', 'memdiff': base + '.memdiff'}
+
+        pstats.Stats(self.profile).dump_stats(paths['pstats'])
+        with open(paths['folded'], 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(paths['memdiff'], 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self._diff(self._start_snapshot, self._snapshot())) + '\n')
+
+        self._stop_tracing()
+        self.profile = None
+        return paths
+
+    def _stop_tracing(self) -> None:
+        """Stop tracemalloc if this profiler started it (tracing slows allocations)"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._start_snapshot = self._last_snapshot = None
+
+    def toggle(self) -> Dict[str, str]:
+        """Start if stopped, else stop and return the dump paths"""
+        if self.running:
+            return self.stop()
+        self.start()
+        return {}
+
+    def snapshot(self) -> List[str]:
+        """
+        Take a tracemalloc snapshot and diff it with the previous one
+
+        The first call only starts tracing; later calls list the source
+        lines whose allocations grew most since the previous call. Tracing
+        slows every allocation: end it with stop().
+
+        Returns:
+            Lines like "src/x.py:12: size=1024 KiB (+512 KiB), count=..."
+        """
+        previous = self._last_snapshot
+        self._last_snapshot = self._snapshot()
+        if previous is None:
+            return []
+        return self._diff(previous, self._last_snapshot)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        """Snapshot of traced allocations, starting tracing if needed"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.TRACE_FRAMES)
+            self._started_tracing = True
+        return tracemalloc.take_snapshot().filter_traces((
+            # The profiler's own bookkeeping and import machinery
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def _diff(self, old: tracemalloc.Snapshot, new: tracemalloc.Snapshot) -> List[str]:
+        """Largest allocation changes between two snapshots"""
+        return [str(stat) for stat in new.compare_to(old, 'lineno')[:self.TOP_ALLOCATIONS]]
+
+    def _sample(self) -> None:
+        """Sampler thread: count the target thread's call stacks"""
+        while self._sampling.is_set():
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.SAMPLE_INTERVAL)
+
+    def install_signal_handler(self) -> None:
+        """Toggle profiling on SIGNAL (handlers run in the main thread)"""
+        def toggle(signum, frame):
+            paths = self.toggle()
+            if paths:
+                print(f"✅ Profile written to {paths['pstats']}", file=sys.stderr, flush=True)
+
+        signal.signal(self.SIGNAL, toggle)
+
+    def get_stats(self) -> Dict:
+        """Get profiler state"""
+        return {
+            'running': self.running,
+            'output_dir': self.output_dir,
+            'dumps': self.dumps,
+            'stack_samples': sum(self.stacks.values()),
+            'tracing_memory': tracemalloc.is_tracing(),
+        }
@@ -0,0 +1,283 @@
+"""Precomputed "related questions" graph over all FAQs"""
+
+from typing import List, Dict, Tuple, Optional, Iterable, Set
+
+import numpy as np
+
+from .faq_index import FAQIndex
+from .faq_retriever import FAQRetriever
+
+
+class RelatedQuestionsGraph:
+    """
+    k-nearest-neighbor graph of FAQs under the retriever's similarity
+
+    The neighbors of FAQ i are the FAQs ranked by FAQRetriever when FAQ
+    i's question is the query (FAQRetriever's weighted question Jaccard
+    plus keyword bonus, ties in database order), without i itself and
+    without zero-score FAQs. Rows are computed in blocks: shared-token
+    counts for a block come from counting the concatenated posting lists
+    of its token ids (a sparse A @ A.T product), so only FAQ pairs sharing
+    a token or keyword are scored and no Python loop runs over them.
+
+    Neighbors are stored in CSR form (offsets plus uint32 positions and
+    float32 scores), so a lookup is two array slices.
+    """
+
+    # Bump whenever the stored structures change, to invalidate on-disk caches
+    VERSION = 1
+
+    # Candidate (row, FAQ) cells gathered per block
+    BLOCK_CELLS = 1 << 20
+    # Blocks of at most DENSE_FACTOR * BLOCK_CELLS rows x FAQs are scored densely
+    DENSE_FACTOR = 4
+
+    def __init__(self, k: int = 5):
+        """
+        Initialize empty graph (see build)
+
+        Args:
+            k: Neighbors kept per FAQ
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+        self.k = k
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.neighbors = np.zeros(0, dtype=np.uint32)
+        self.scores = np.zeros(0, dtype=np.float32)
+        self.id_positions: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, index: FAQIndex, k: int = 5) -> 'RelatedQuestionsGraph':
+        """Compute the neighbors of every FAQ in an index"""
+        graph = cls(k)
+        rows = graph._compute_rows(index, range(index.size()))
+        graph._store(index, [rows[pos] for pos in range(index.size())])
+        return graph
+
+    def update(self, index: FAQIndex, changed: Iterable[int]) -> int:
+        """
+        Refresh the graph after FAQs were edited or appended
+
+        FAQs keep their positions; new FAQs are appended to the index.
+        Only rows that can be affected are recomputed: the changed FAQs,
+        FAQs sharing a question token with or containing a keyword of a
+        changed FAQ, and FAQs that listed a changed FAQ as neighbor.
+        Removing FAQs shifts positions and needs a full build.
+
+        Args:
+            index: Index over the updated FAQ list
+            changed: Positions of edited or appended FAQs
+
+        Returns:
+            Number of rows recomputed
+        """
+        old_size = len(self.offsets) - 1
+        if index.size() < old_size:
+            raise ValueError("FAQs were removed; rebuild the graph instead")
+
+        changed = set(changed) | set(range(old_size, index.size()))
+        affected: Set[int] = set(changed)
+        changed_array = np.fromiter(changed, dtype=np.int64)
+        listed = np.flatnonzero(np.isin(self.neighbors, changed_array))
+        affected.update((np.searchsorted(self.offsets, listed, side='right') - 1).tolist())
+
+        questions = [faq.get('question', '').lower() for faq in index.faqs]
+        for pos in changed:
+            for token_id in index.question_ids[pos]:
+                affected.update(index.postings.get(token_id, ()))
+            for keyword in index.keywords[pos]:
+                affected.update(i for i, question in enumerate(questions) if keyword in question)
+
+        rows = {pos: self.related_positions(pos) for pos in range(old_size) if pos not in affected}
+        rows.update(self._compute_rows(index, sorted(affected)))
+        self._store(index, [rows[pos] for pos in range(index.size())])
+        return len(affected)
+
+    def _compute_rows(self, index: FAQIndex, positions: Iterable[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Compute (neighbor positions, scores) for the given rows
+
+        Only candidates can score above zero: the FAQs sharing a question
+        token with the row (its posting lists) or having a keyword inside
+        its question. Rows are gathered until a block holds BLOCK_CELLS
+        candidates. A block whose candidates cover a good part of its
+        rows x FAQs is scored densely; otherwise only the candidate cells
+        are, so time and scratch memory grow with the number of candidates
+        rather than with n per row.
+        """
+        positions = list(positions)
+        n = index.size()
+        matcher = _KeywordMatcher(index)
+        rows: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        start = 0
+        while start < len(positions):
+            keys, hits = [], []
+            cells = 0
+            end = start
+            while end < len(positions) and (end == start or cells < self.BLOCK_CELLS):
+                pos, offset = positions[end], (end - start) * n
+                for token_id in index.question_ids[pos]:
+                    posting = np.frombuffer(index.postings[token_id], dtype=np.uint32)
+                    keys.append(posting.astype(np.int64) + offset)
+                    cells += len(posting)
+                for hit in matcher.hits(index.faqs[pos].get('question', '').lower()):
+                    hits.append(hit + offset)
+                    cells += len(hit)
+                end += 1
+            block_rows = np.asarray(positions[start:end], dtype=np.int64)
+            start = end
+
+            keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+            hits = np.concatenate(hits) if hits else np.zeros(0, dtype=np.int64)
+            if len(block_rows) * n <= self.DENSE_FACTOR * self.BLOCK_CELLS:
+                row_of, column, values = self._score_dense(index, block_rows, keys, hits)
+            else:
+                row_of, column, values = self._score_sparse(index, block_rows, keys, hits)
+
+            # Order by row, descending score, then position (the retriever's
+            # stable order) and keep the first k cells of every row
+            order = np.lexsort((column, -values, row_of))
+            row_of, column, values = row_of[order], column[order], values[order]
+            rank = np.arange(len(row_of)) - np.searchsorted(row_of, row_of)
+            keep = rank < self.k
+            row_of, column, values = row_of[keep], column[keep], values[keep]
+
+            bounds = np.searchsorted(row_of, np.arange(len(block_rows) + 1))
+            for local, pos in enumerate(block_rows.tolist()):
+                lo, hi = bounds[local], bounds[local + 1]
+                rows[pos] = (column[lo:hi], values[lo:hi])
+        return rows
+
+    def _score_dense(
+        self,
+        index: FAQIndex,
+        block_rows: np.ndarray,
+        keys: np.ndarray,
+        hits: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score block rows against every FAQ; (row, column, score) of each row's best cells"""
+        n = index.size()
+        count = len(block_rows)
+        sizes = index.question_sizes
+        shared = np.bincount(keys, minlength=count * n).reshape(count, n)
+        union = sizes[block_rows][:, None] + sizes[None, :] - shared
+        scores = np.zeros((count, n), dtype=np.float64)
+        np.divide(shared, union, out=scores, where=union > 0)
+        scores *= FAQRetriever.QUESTION_WEIGHT
+        # Fancy assignment: cells hit by several keywords get the bonus once
+        scores.reshape(-1)[hits] += FAQRetriever.KEYWORD_BONUS
+        scores[np.arange(count), block_rows] = 0.0
+
+        # Cells at or above each row's k-th best score
+        if n > self.k:
+            kth = np.partition(scores, n - self.k, axis=1)[:, n - self.k]
+            mask = (scores >= kth[:, None]) & (scores > 0)
+        else:
+            mask = scores > 0
+        row_of, column = np.nonzero(mask)
+        return row_of, column, scores[row_of, column]
+
+    def _score_sparse(
+        self,
+        index: FAQIndex,
+        block_rows: np.ndarray,
+        keys: np.ndarray,
+        hits: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score block rows against their candidates only; (row, column, score) of nonzero cells"""
+        sizes = index.question_sizes
+        token_cells, shared = np.unique(keys, return_counts=True)
+        hits = np.unique(hits)
+        cell = np.union1d(token_cells, hits)
+        overlap = np.zeros(len(cell), dtype=np.int64)
+        overlap[np.searchsorted(cell, token_cells)] = shared
+
+        row_of, column = np.divmod(cell, index.size())
+        union = sizes[block_rows][row_of] + sizes[column] - overlap
+        values = np.zeros(len(cell), dtype=np.float64)
+        np.divide(overlap, union, out=values, where=union > 0)
+        values *= FAQRetriever.QUESTION_WEIGHT
+        values[np.isin(cell, hits, assume_unique=True)] += FAQRetriever.KEYWORD_BONUS
+
+        keep = (values > 0) & (column != block_rows[row_of])
+        return row_of[keep], column[keep], values[keep]
+
+    def _store(self, index: FAQIndex, rows: List[Tuple[np.ndarray, np.ndarray]]) -> None:
+        """Pack per-row results into CSR arrays"""
+        lengths = np.array([len(neighbors) for neighbors, _ in rows], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.neighbors = (np.concatenate([neighbors for neighbors, _ in rows]).astype(np.uint32)
+                          if rows else np.zeros(0, dtype=np.uint32))
+        self.scores = (np.concatenate([scores for _, scores in rows]).astype(np.float32)
+                       if rows else np.zeros(0, dtype=np.float32))
+        self.id_positions = {faq.get('id'): pos for pos, faq in enumerate(index.faqs)}
+
+    def related_positions(self, pos: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get (neighbor positions, scores) of the FAQ at a database position"""
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        return self.neighbors[start:end], self.scores[start:end]
+
+    def related(self, faq_id: str, top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Get related FAQs of an FAQ id
+
+        Returns:
+            List of (database position, score), best first (empty for unknown ids)
+        """
+        pos = self.id_positions.get(faq_id)
+        if pos is None:
+            return []
+        neighbors, scores = self.related_positions(pos)
+        return list(zip(neighbors[:top_k].tolist(), scores[:top_k].tolist()))
+
+    def nbytes(self) -> int:
+        """Size of the neighbor arrays"""
+        return self.offsets.nbytes + self.neighbors.nbytes + self.scores.nbytes
+
+
+class _KeywordMatcher:
+    """Find FAQs with a keyword inside a text by probing its substrings"""
+
+    def __init__(self, index: FAQIndex):
+        self.keyword_positions = {
+            keyword: np.asarray(positions, dtype=np.int64)
+            for keyword, positions in index.keyword_postings.items()
+        }
+        self.lengths = sorted({len(keyword) for keyword in self.keyword_positions if keyword})
+        self.starts = {keyword[0] for keyword in self.keyword_positions if keyword}
+
+    def hits(self, text: str) -> List[np.ndarray]:
+        """Position arrays of the keywords occurring inside text (may repeat FAQs)"""
+        found = [self.keyword_positions['']] if '' in self.keyword_positions else []
+        for start in range(len(text)):
+            if text[start] not in self.starts:
+                continue
+            for length in self.lengths:
+                if start + length > len(text):
+                    break
+                positions = self.keyword_positions.get(text[start:start + length])
+                if positions is not None:
+                    found.append(positions)
+        return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Precompute the related-questions graph into the index cache"""
+    import argparse
+    from .chatbot import BanglaFAQChatbot
+
+    parser = argparse.ArgumentParser(description="Precompute related questions of every FAQ")
+    parser.add_argument('--faqs', default='data/bangla_faqs.json', help='FAQ JSON database')
+    parser.add_argument('--cache-dir', default='data/.index_cache', help='Index cache directory')
+    args = parser.parse_args(argv)
+
+    chatbot = BanglaFAQChatbot(args.faqs, cache_dir=args.cache_dir)
+    graph = chatbot.load_related_graph()
+    print(f"✅ {len(graph.offsets) - 1} FAQs, {len(graph.neighbors)} links, {graph.nbytes()} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,6 +1,16 @@
 """Response generation from retrieved FAQs with fallback handling"""
 
-from typing import Dict, Tuple, Optional, List
+import re
+from typing import Dict, Tuple, Optional, List, NamedTuple, Iterable, Iterator
+
+
+class StructuredResponse(NamedTuple):
+    """Unformatted answer for API consumers"""
+    answer: str
+    metadata: Dict
+    score: float
+    is_fallback: bool = False
+    degraded: bool = False
 
 
 class ResponseGenerator:
@@ -17,6 +27,13 @@ class ResponseGenerator:
 
     GENERIC_FALLBACK = 'দুঃখিত, এই প্রশ্নের উত্তর আমার কাছে এখন নেই। অনুগ্রহ করে অন্য কিছু জিজ্ঞাসা করুন।'
 
+    DIVIDER = '━' * 40
+
+    DETAILED_HEADER = "সম্ভাব্য উত্তরগুলি:\n\n"
+
+    # Sentence boundary: Bangla dari (।) or Latin terminators followed by space
+    SENTENCE_END = re.compile(r'(?<=[।?!.])\s+')
+
     @staticmethod
     def generate_response(
         faq_match: Tuple[Dict, float],
@@ -87,16 +104,73 @@ class ResponseGenerator:
         if is_fallback:
             return response_text
         
-        formatted = f"উত্তর:\n{response_text}\n"
-        formatted += f"\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        formatted += f"বিষয়: {topic} | স্তর: {difficulty} | আত্মবিশ্বাস: {confidence:.0%}"
+        return ResponseGenerator.context_template(response_text, topic, difficulty) + f"{confidence:.0%}"
+
+    @staticmethod
+    def context_template(response_text: str, topic: str, difficulty: str) -> str:
+        """
+        Build the static part of a context response
         
-        return formatted
+        The confidence percentage is the only per-query part of the
+        output, so everything before it can be computed once per FAQ.
+        
+        Returns:
+            Formatted response up to (excluding) the confidence value
+        """
+        return (
+            f"উত্তর:\n{response_text}\n"
+            f"\n{ResponseGenerator.DIVIDER}\n"
+            f"বিষয়: {topic} | স্তর: {difficulty} | আত্মবিশ্বাস: "
+        )
+
+    @staticmethod
+    def detailed_item_template(faq: Dict) -> Tuple[str, str]:
+        """
+        Build the static parts of one entry in a detailed response
+        
+        Returns:
+            Tuple of (text before the confidence, text after the confidence)
+        """
+        head = (
+            f"প্রশ্ন: {faq.get('question', '')}\n"
+            f"   উত্তর: {faq.get('answer', '')}\n"
+            f"   আত্মবিশ্বাস: "
+        )
+        tail = f" | স্তর: {faq.get('difficulty', '')}\n\n"
+        return head, tail
+
+    @staticmethod
+    def to_structured(
+        faq_match: Optional[Tuple[Dict, float]],
+        topic: Optional[str] = None
+    ) -> StructuredResponse:
+        """
+        Build a structured response without any text formatting
+        
+        Args:
+            faq_match: Tuple of (FAQ dict, relevance score), or None for fallback
+            topic: Topic used for the fallback message
+            
+        Returns:
+            StructuredResponse with answer, metadata and score
+        """
+        if faq_match is None:
+            return StructuredResponse(
+                answer=ResponseGenerator.get_fallback_response(topic),
+                metadata={'topic': topic} if topic else {},
+                score=0.0,
+                is_fallback=True
+            )
+        
+        faq, score = faq_match
+        metadata = {key: value for key, value in faq.items() if key != 'answer'}
+        return StructuredResponse(faq.get('answer', ''), metadata, score)
 
     @staticmethod
     def generate_detailed_response(
         results: List[Tuple[Dict, float]],
-        top_k: int = 3
+        top_k: int = 3,
+        templates: Optional['ResponseTemplateCache'] = None
     ) -> str:
         """
         Generate detailed response showing multiple results
@@ -104,6 +178,7 @@ class ResponseGenerator:
         Args:
             results: List of (FAQ, score) tuples
             top_k: Number of results to include
+            templates: Optional precomputed template cache
             
         Returns:
             Detailed response with multiple options
@@ -111,11 +186,163 @@ class ResponseGenerator:
         if not results:
             return ResponseGenerator.GENERIC_FALLBACK
         
-        response = "সম্ভাব্য উত্তরগুলি:\n\n"
+        parts = [ResponseGenerator.DETAILED_HEADER]
         
         for idx, (faq, score) in enumerate(results[:top_k], 1):
-            response += f"{idx}. প্রশ্ন: {faq.get('question', '')}\n"
-            response += f"   উত্তর: {faq.get('answer', '')}\n"
-            response += f"   আত্মবিশ্বাস: {score:.0%} | স্তর: {faq.get('difficulty', '')}\n\n"
+            if templates is not None:
+                head, tail = templates.detailed_item(faq)
+            else:
+                head, tail = ResponseGenerator.detailed_item_template(faq)
+            parts.append(f"{idx}. {head}{score:.0%}{tail}")
         
-        return response
+        return ''.join(parts)
+
+    @staticmethod
+    def speech_text(response: str) -> str:
+        """
+        Strip formatting and metadata from a response before speaking it
+        
+        Removes the "উত্তর:" label of format_response_with_context and the
+        metadata suffixes added by it and by generate_response, so a spoken
+        FAQ answer is exactly the FAQ's answer text.
+        """
+        text = response
+        if text.startswith("উত্তর:\n"):
+            text = text[len("উত্তর:\n"):]
+        
+        for suffix_start in (f"\n\n{ResponseGenerator.DIVIDER}\n", "\n\n[প্রাসঙ্গিকতা স্তর:"):
+            cut = text.find(suffix_start)
+            if cut != -1:
+                text = text[:cut]
+        
+        return text.strip()
+
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        """
+        Split text into sentence chunks
+        
+        Joining the chunks gives back the original text exactly.
+        """
+        chunks = []
+        start = 0
+        for match in ResponseGenerator.SENTENCE_END.finditer(text):
+            chunks.append(text[start:match.end()])
+            start = match.end()
+        if start < len(text):
+            chunks.append(text[start:])
+        return chunks
+
+    @staticmethod
+    def iter_detailed_response(
+        results: Iterable[Tuple[Dict, float]],
+        top_k: int = 3,
+        templates: Optional['ResponseTemplateCache'] = None,
+        sentence_chunks: bool = False
+    ) -> Iterator[str]:
+        """
+        Stream a detailed response chunk by chunk
+        
+        Each result is formatted and yielded as soon as the results
+        iterable produces it. The concatenated chunks are identical to
+        generate_detailed_response for the same results.
+        
+        Args:
+            results: Iterable of (FAQ, score) tuples in rank order
+            top_k: Number of results to include
+            templates: Optional precomputed template cache
+            sentence_chunks: Yield long answers one sentence at a time
+            
+        Yields:
+            Response text chunks
+        """
+        idx = 0
+        for faq, score in results:
+            if idx >= top_k:
+                break
+            idx += 1
+            
+            if idx == 1:
+                yield ResponseGenerator.DETAILED_HEADER
+            
+            if templates is not None:
+                head, tail = templates.detailed_item(faq)
+            else:
+                head, tail = ResponseGenerator.detailed_item_template(faq)
+            
+            if not sentence_chunks:
+                yield f"{idx}. {head}{score:.0%}{tail}"
+                continue
+            
+            yield f"{idx}. প্রশ্ন: {faq.get('question', '')}\n   উত্তর: "
+            for sentence in ResponseGenerator.split_sentences(faq.get('answer', '')):
+                yield sentence
+            yield f"\n   আত্মবিশ্বাস: {score:.0%}{tail}"
+        
+        if idx == 0:
+            yield ResponseGenerator.GENERIC_FALLBACK
+
+
+class ResponseTemplateCache:
+    """
+    Precomputed response templates for a static FAQ database
+    
+    FAQ answers never change after loading, so the formatted body of
+    every response is built once and only the confidence percentage is
+    filled in per query.
+    """
+
+    def __init__(self, faqs: Optional[List[Dict]] = None):
+        """
+        Initialize template cache
+        
+        Args:
+            faqs: Optional list of FAQs to precompute templates for
+        """
+        self._context = {}
+        self._detailed = {}
+        
+        for faq in faqs or []:
+            self._context[self._key(faq, faq.get('topic', ''), faq.get('difficulty', ''))] = \
+                ResponseGenerator.context_template(
+                    faq.get('answer', ''), faq.get('topic', ''), faq.get('difficulty', '')
+                )
+            self._detailed[faq.get('id')] = ResponseGenerator.detailed_item_template(faq)
+
+    @staticmethod
+    def _key(faq: Dict, topic: str, difficulty: str) -> Tuple:
+        """Cache key for a (FAQ, topic, difficulty) combination"""
+        return faq.get('id'), topic, difficulty
+
+    def format_context(self, faq: Dict, topic: str, difficulty: str, confidence: float) -> str:
+        """
+        Format a context response from the cached template
+        
+        Equivalent to ResponseGenerator.format_response_with_context for the
+        FAQ's answer, but only the confidence is formatted per call.
+        """
+        key = self._key(faq, topic, difficulty)
+        template = self._context.get(key)
+        
+        if template is None or faq.get('id') is None:
+            template = ResponseGenerator.context_template(faq.get('answer', ''), topic, difficulty)
+            if faq.get('id') is not None:
+                self._context[key] = template
+        
+        return template + f"{confidence:.0%}"
+
+    def detailed_item(self, faq: Dict) -> Tuple[str, str]:
+        """Get the (head, tail) template of a detailed response entry"""
+        faq_id = faq.get('id')
+        if faq_id is None:
+            return ResponseGenerator.detailed_item_template(faq)
+        
+        item = self._detailed.get(faq_id)
+        if item is None:
+            item = ResponseGenerator.detailed_item_template(faq)
+            self._detailed[faq_id] = item
+        return item
+
+    def size(self) -> int:
+        """Get number of cached templates"""
+        return len(self._context) + len(self._detailed)
@@ -0,0 +1,601 @@
+"""Pre-fork HTTP server answering FAQ queries from a shared-memory index"""
+
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from collections import Counter
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Optional, List, Dict, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from src.autocomplete import Autocompleter
+from src.bangla_processor import BanglaProcessor
+from src.chatbot import BanglaFAQChatbot
+from src.faq_retriever import FAQRetriever
+from src.heavy_hitters import HeavyHitterTracker
+from src.metadata_filter import MetadataFilter
+from src.profiling import Profiler
+from src.response_generator import ResponseGenerator
+from src.shared_index import SharedIndex
+from src.topic_router import TopicRouter
+
+
+def read_memory(pid: str = 'self') -> Dict[str, int]:
+    """
+    Read a process's memory breakdown from /proc/<pid>/smaps_rollup
+
+    Returns:
+        Dict with rss_kb, pss_kb, shared_kb and private_kb (empty if unavailable)
+    """
+    fields = Counter()
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+
+    return {
+        'rss_kb': fields['Rss'],
+        'pss_kb': fields['Pss'],
+        'shared_kb': fields['Shared_Clean'] + fields['Shared_Dirty'],
+        'private_kb': fields['Private_Clean'] + fields['Private_Dirty']
+    }
+
+
+class SharedIndexService:
+    """
+    Answer queries the way BanglaFAQChatbot does, from a SharedIndex
+
+    Topic validation, automatic routing, the difficulty filter, the
+    confidence threshold and the formatted response all match
+    BanglaFAQChatbot.generate_answer.
+    """
+
+    def __init__(
+        self,
+        shared: SharedIndex,
+        router: TopicRouter,
+        generation: int = 0,
+        autocompleter: Optional[Autocompleter] = None,
+        profiler: Optional[Profiler] = None,
+        query_stats: Optional[HeavyHitterTracker] = None
+    ):
+        """
+        Initialize service
+
+        Args:
+            shared: Shared FAQ index
+            router: Topic router for queries without a topic
+            generation: Index generation (incremented on every reload)
+            autocompleter: Optional prefix index for /suggest
+            profiler: Optional profiler controlled via /admin/profile
+            query_stats: Optional tracker recording answered queries
+                (keyed like BanglaFAQChatbot's query statistics)
+        """
+        self.shared = shared
+        self.router = router
+        self.generation = generation
+        self.autocompleter = autocompleter
+        self.profiler = profiler
+        self.query_stats = query_stats
+        self.stats = Counter()
+
+    def answer(
+        self,
+        query: str,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        top_k: int = 1
+    ) -> Dict:
+        """
+        Answer a query
+
+        Args:
+            query: User's question
+            topic: Topic, or None to route the query automatically
+            difficulty: Optional difficulty filter
+            top_k: Number of results to return
+
+        Returns:
+            JSON-serializable dict with response, is_fallback and results
+        """
+        self.stats['queries'] += 1
+        if self.query_stats is not None:
+            self.query_stats.record(json.dumps([query, topic, difficulty], ensure_ascii=False))
+        results = self.search(
+            query, topic, difficulty, top_k, min_score=BanglaFAQChatbot.CONFIDENCE_THRESHOLD
+        )
+
+        if not results:
+            self.stats['fallbacks'] += 1
+            return {
+                'query': query,
+                'response': ResponseGenerator.get_fallback_response(topic),
+                'is_fallback': True,
+                'results': []
+            }
+
+        faq, score = results[0]
+        response = ResponseGenerator.format_response_with_context(
+            faq.get('answer', ''), topic or faq.get('topic', ''), faq.get('difficulty', ''), score
+        )
+        return {
+            'query': query,
+            'response': response,
+            'is_fallback': False,
+            'results': [{'faq': faq, 'score': score} for faq, score in results]
+        }
+
+    def search(
+        self,
+        query: str,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        top_k: int = 1,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[Dict, float]]:
+        """
+        Rank FAQs of the topic (routed if None) and difficulty
+
+        Returns:
+            List of (FAQ, score), as FAQRetriever.retrieve over the same candidates
+        """
+        if topic is not None and not MetadataFilter.is_valid_topic(topic):
+            return []
+        routed = [topic] if topic is not None else self.router.route(BanglaProcessor.tokenize(query.lower()))
+        if not MetadataFilter.is_valid_difficulty(difficulty or ''):
+            difficulty = None
+
+        mask = self.shared.candidate_mask(routed, difficulty)
+        if mask is not None and not mask.any():
+            return []
+        ranked = self.shared.rank(query, mask, top_k, min_score=min_score)
+        return [(self.shared.faq(pos), score) for pos, score in ranked]
+
+    def suggest(self, prefix: str, topic: Optional[str] = None, limit: int = 5) -> Dict:
+        """
+        Complete a partially typed question
+
+        Returns:
+            JSON-serializable dict with the prefix and its suggestions
+        """
+        self.stats['suggestions'] += 1
+        suggestions = self.autocompleter.complete(prefix, topic, limit) if self.autocompleter else []
+        return {'prefix': prefix, 'suggestions': suggestions}
+
+    def profile(self, action: str) -> Dict:
+        """
+        Control this worker's profiler
+
+        Args:
+            action: 'start', 'stop' (writes the dumps), 'snapshot'
+                (tracemalloc growth since the last snapshot) or 'status'
+
+        Returns:
+            Result with the worker pid and profiler state
+        """
+        if self.profiler is None:
+            raise RuntimeError("profiling not enabled")
+        result = {'pid': os.getpid()}
+        if action == 'start':
+            result['started'] = self.profiler.start()
+        elif action == 'stop':
+            result['dumps'] = self.profiler.stop()
+        elif action == 'snapshot':
+            result['growth'] = self.profiler.snapshot()
+        elif action != 'status':
+            raise ValueError(f"unknown profile action: {action}")
+        result['profiler'] = self.profiler.get_stats()
+        return result
+
+    def get_stats(self) -> Dict:
+        """Get worker statistics including its memory breakdown"""
+        return {
+            'pid': os.getpid(),
+            'generation': self.generation,
+            'requests': dict(self.stats),
+            'routing': self.router.get_stats(),
+            'index': {'name': self.shared.name, 'bytes': self.shared.nbytes, 'faqs': self.shared.size()},
+            'autocomplete_bytes': self.autocompleter.nbytes() if self.autocompleter else 0,
+            'memory': read_memory()
+        }
+
+
+class FAQRequestHandler(BaseHTTPRequestHandler):
+    """HTTP endpoints: /answer, /search, /suggest, /health, /stats and /admin/profile"""
+
+    server_version = 'BanglaFAQ/1.0'
+
+    def do_GET(self):
+        """Dispatch GET requests"""
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+
+        if url.path == '/answer':
+            query = params.get('q', '').strip()
+            if not query:
+                self._send_json(400, {'error': "missing query parameter 'q'"})
+                return
+            try:
+                top_k = max(1, int(params.get('top_k', 1)))
+            except ValueError:
+                self._send_json(400, {'error': "invalid 'top_k'"})
+                return
+            self._send_json(200, service.answer(
+                query, params.get('topic') or None, params.get('difficulty') or None, top_k
+            ))
+        elif url.path == '/search':
+            # Raw ranking for a scatter-gather coordinator (see shard_coordinator)
+            query = params.get('q', '').strip()
+            try:
+                top_k = max(1, int(params.get('top_k', 1)))
+                min_score = float(params['min_score']) if params.get('min_score') else None
+            except ValueError:
+                self._send_json(400, {'error': "invalid 'top_k' or 'min_score'"})
+                return
+            service.stats['searches'] += 1
+            results = service.search(
+                query, params.get('topic') or None, params.get('difficulty') or None, top_k, min_score
+            ) if query else []
+            self._send_json(200, {
+                'generation': service.generation,
+                'results': [{'faq': faq, 'score': score} for faq, score in results]
+            })
+        elif url.path == '/suggest':
+            try:
+                limit = min(max(1, int(params.get('limit', 5))), 50)
+            except ValueError:
+                self._send_json(400, {'error': "invalid 'limit'"})
+                return
+            self._send_json(200, service.suggest(params.get('q', ''), params.get('topic') or None, limit))
+        elif url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'pid': os.getpid(), 'generation': service.generation})
+        elif url.path == '/stats':
+            self._send_json(200, service.get_stats())
+        elif url.path == '/admin/profile':
+            # Profiles reveal code paths and allocations: local clients only
+            if self.client_address[0] not in ('127.0.0.1', '::1'):
+                self._send_json(403, {'error': 'admin endpoints are only served to localhost'})
+                return
+            try:
+                self._send_json(200, service.profile(params.get('action', 'status')))
+            except (ValueError, RuntimeError) as e:
+                self._send_json(400, {'error': str(e)})
+        else:
+            self._send_json(404, {'error': f"unknown path: {url.path}"})
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        """Write a JSON response"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep workers quiet (stats are available at /stats)"""
+        pass
+
+
+class PreforkServer:
+    """
+    Master process forking HTTP workers that share one read-only index
+
+    The master loads the FAQ database once, packs it into a SharedIndex
+    and drops the Python-object index before forking, so workers hold only
+    their own small heaps while every one of them maps the same index
+    pages. Workers accept from one shared listening socket.
+
+    Signals to the master:
+        SIGHUP:  rolling reload (new index, workers replaced one at a time)
+        SIGUSR1: print the per-worker memory breakdown
+        SIGUSR2: toggle profiling in every worker (see Profiler)
+        SIGTERM/SIGINT: stop all workers and release the index
+    """
+
+    POLL_INTERVAL = 0.2
+    POPULAR_QUERIES = 1000
+
+    def __init__(
+        self,
+        faq_path: str,
+        host: str = '127.0.0.1',
+        port: int = 8080,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        query_stats_path: Optional[str] = None
+    ):
+        """
+        Initialize server
+
+        Args:
+            faq_path: Path to FAQ JSON database
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            workers: Number of worker processes (default: CPU count)
+            cache_dir: Optional directory for the persistent index cache
+            query_stats_path: Optional query statistics file (as written by
+                BanglaFAQChatbot); workers record into '<path>.worker<slot>'
+                and suggestions are ranked by the merged counts, refreshed
+                on every reload
+        """
+        if not os.path.exists(faq_path):
+            raise FileNotFoundError(f"FAQ database not found: {faq_path}")
+
+        self.faq_path = faq_path
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.query_stats_path = query_stats_path
+        self.shared: Optional[SharedIndex] = None
+        self.router: Optional[TopicRouter] = None
+        self.autocompleter: Optional[Autocompleter] = None
+        self.generation = 0
+        self.sock: Optional[socket.socket] = None
+        self.children: Dict[int, int] = {}
+        self._stopping = False
+        self._reload_requested = False
+        self._report_requested = False
+
+    def _load(self) -> Tuple[SharedIndex, TopicRouter, Autocompleter]:
+        """Build the shared index, topic router and prefix index from the FAQ database"""
+        retriever = FAQRetriever(self.faq_path, cache_dir=self.cache_dir)
+        shared = SharedIndex.build(retriever.index)
+        router = TopicRouter.from_index(retriever.index)
+        autocompleter = Autocompleter(retriever.index, self._faq_popularity(retriever))
+        return shared, router, autocompleter
+
+    def _worker_stats_path(self, slot: int) -> Optional[str]:
+        """Query statistics file of a worker slot (kept across restarts)"""
+        return f"{self.query_stats_path}.worker{slot}" if self.query_stats_path else None
+
+    def _faq_popularity(self, retriever: FAQRetriever) -> Dict[str, int]:
+        """
+        FAQ id -> answer count from the recorded query statistics
+
+        The shared file and every worker's file are merged; each popular
+        query is credited to the FAQ it is answered with.
+        """
+        if not self.query_stats_path:
+            return {}
+        counts = Counter()
+        paths = [self.query_stats_path] + [self._worker_stats_path(slot) for slot in range(self.workers)]
+        for path in paths:
+            if os.path.exists(path):
+                tracker = HeavyHitterTracker(path, top_k=self.POPULAR_QUERIES)
+                counts.update(dict(tracker.heavy_hitters()))
+
+        popularity = Counter()
+        for key, count in counts.most_common(self.POPULAR_QUERIES):
+            try:
+                query, topic, difficulty = json.loads(key)
+            except (ValueError, TypeError):
+                continue
+            candidates = retriever.get_topic_faqs([topic]) if topic else retriever.get_all_faqs()
+            if difficulty:
+                candidates = MetadataFilter.filter_by_difficulty(candidates, difficulty)
+            if not candidates:
+                continue
+            results = retriever.retrieve(
+                query, candidates, top_k=1, min_score=BanglaFAQChatbot.CONFIDENCE_THRESHOLD
+            )
+            if results:
+                popularity[results[0][0].get('id')] += count
+        return dict(popularity)
+
+    def bind(self) -> Tuple[str, int]:
+        """Create the listening socket shared by all workers"""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(128)
+        # Workers race for connections: a loser's accept() must time out
+        # (not block) so it keeps noticing SIGTERM
+        self.sock.settimeout(self.POLL_INTERVAL)
+        self.port = self.sock.getsockname()[1]
+        return self.host, self.port
+
+    def _spawn(self, slot: int) -> int:
+        """Fork a worker for a slot"""
+        # Keep the collector from touching (and un-sharing) inherited objects
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(slot)
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} failed: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.children[pid] = slot
+        return pid
+
+    def _run_worker(self, slot: int) -> None:
+        """Worker process: serve requests until SIGTERM"""
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        for signum in (signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, signal.SIG_IGN)
+        # Requests are handled in this thread, which the profiler follows
+        profiler = Profiler.from_environment()
+        profiler.install_signal_handler()
+
+        httpd = HTTPServer((self.host, self.port), FAQRequestHandler, bind_and_activate=False)
+        httpd.socket.close()
+        httpd.socket = self.sock
+        httpd.timeout = self.POLL_INTERVAL
+        query_stats = None
+        if self.query_stats_path:
+            query_stats = HeavyHitterTracker(self._worker_stats_path(slot), top_k=self.POPULAR_QUERIES)
+        httpd.service = SharedIndexService(
+            self.shared, self.router, self.generation, self.autocompleter, profiler, query_stats
+        )
+
+        while not stopping:
+            httpd.handle_request()
+        profiler.stop()
+        if query_stats is not None:
+            query_stats.save()
+
+    def _install_signals(self) -> None:
+        """Install master signal handlers"""
+        def stop(signum, frame):
+            self._stopping = True
+
+        def reload(signum, frame):
+            self._reload_requested = True
+
+        def report(signum, frame):
+            self._report_requested = True
+
+        def profile(signum, frame):
+            for pid in list(self.children):
+                try:
+                    os.kill(pid, Profiler.SIGNAL)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGHUP, reload)
+        signal.signal(signal.SIGUSR1, report)
+        signal.signal(Profiler.SIGNAL, profile)
+
+    def start(self) -> None:
+        """Load the index, bind and fork the workers"""
+        self.shared, self.router, self.autocompleter = self._load()
+        self.bind()
+        for slot in range(self.workers):
+            self._spawn(slot)
+        print(
+            f"✅ Serving {self.shared.size()} FAQs on http://{self.host}:{self.port} "
+            f"with {self.workers} workers (shared index: {self.shared.nbytes // 1024} KB)",
+            flush=True
+        )
+
+    def serve_forever(self) -> None:
+        """Start (if needed) and supervise workers until stopped"""
+        self._install_signals()
+        if self.sock is None:
+            self.start()
+
+        try:
+            while not self._stopping:
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self.reload()
+                if self._report_requested:
+                    self._report_requested = False
+                    print(json.dumps(self.memory_report()), flush=True)
+                self._reap()
+                time.sleep(self.POLL_INTERVAL)
+        finally:
+            self.stop()
+
+    def _reap(self) -> None:
+        """Restart workers that exited"""
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self.children.pop(pid, None)
+            if slot is None:
+                continue
+            print(f"⚠️  Worker {pid} exited (status {status}), restarting", flush=True)
+            self._spawn(slot)
+
+    def _terminate(self, pid: int) -> None:
+        """Stop one worker and wait for it"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+        self.children.pop(pid, None)
+
+    def reload(self) -> None:
+        """
+        Rolling reload: rebuild the index and replace workers one at a time
+
+        A replacement is forked (mapping the new index) before each old
+        worker is stopped, so the socket is always being served. The
+        master unlinks the old index first: old workers keep their own
+        mappings until they exit, while replacements do not inherit it.
+        """
+        try:
+            shared, router, autocompleter = self._load()
+        except Exception as e:
+            print(f"❌ Reload failed, keeping current index: {e}", flush=True)
+            return
+
+        self.shared.unlink()
+        self.shared, self.router, self.autocompleter = shared, router, autocompleter
+        self.generation += 1
+
+        for pid, slot in list(self.children.items()):
+            self._spawn(slot)
+            self._terminate(pid)
+
+        print(f"✅ Reloaded {self.shared.size()} FAQs (generation {self.generation})", flush=True)
+
+    def memory_report(self) -> Dict[int, Dict[str, int]]:
+        """Memory breakdown of the master and every worker, keyed by pid"""
+        report = {os.getpid(): read_memory()}
+        for pid in self.children:
+            report[pid] = read_memory(str(pid))
+        return report
+
+    def stop(self) -> None:
+        """Stop all workers and release the socket and shared index"""
+        for pid in list(self.children):
+            self._terminate(pid)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        if self.shared is not None:
+            self.shared.unlink()
+            self.shared = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Pre-fork HTTP server for the Bangla FAQ chatbot")
+    parser.add_argument('--faqs', default=os.path.join('data', 'bangla_faqs.json'), help='FAQ JSON database')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080, help='Port (0 picks a free port)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=None, help='Index cache directory')
+    parser.add_argument('--query-stats', default=None, help='Query statistics file ranking suggestions')
+    args = parser.parse_args(argv)
+
+    try:
+        server = PreforkServer(
+            args.faqs, args.host, args.port, args.workers, args.cache_dir, args.query_stats
+        )
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
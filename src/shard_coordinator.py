@@ -0,0 +1,228 @@
+"""Scatter-gather coordinator querying FAQ shard servers in parallel"""
+
+import json
+import os
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Tuple, Optional
+from urllib.parse import urlencode
+
+
+def split_faqs(faq_database_path: str, shards: int, out_dir: str) -> List[str]:
+    """
+    Split an FAQ database into contiguous shards
+
+    Contiguous ranges keep database order across shards, so merging
+    shard results by (score, shard, rank within shard) reproduces the
+    tie order of a single server over the whole database.
+
+    Args:
+        faq_database_path: Path to FAQ JSON file
+        shards: Number of shards
+        out_dir: Directory for the shard files
+
+    Returns:
+        Paths of the shard files, in shard order
+    """
+    with open(faq_database_path, 'r', encoding='utf-8') as f:
+        faqs = json.load(f)
+    if shards < 1 or shards > len(faqs):
+        raise ValueError(f"shards must be between 1 and {len(faqs)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(faq_database_path))[0]
+    paths = []
+    for shard in range(shards):
+        start = shard * len(faqs) // shards
+        end = (shard + 1) * len(faqs) // shards
+        path = os.path.join(out_dir, f"{base}.shard{shard}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(faqs[start:end], f, ensure_ascii=False, indent=2)
+        paths.append(path)
+    return paths
+
+
+class ShardCoordinator:
+    """
+    Fan a query out to shard servers and merge their top-k
+
+    Every shard is a list of replica base URLs serving the same shard
+    file with ``python -m src.server``; the coordinator calls their
+    /search endpoint. A query goes to the first replica of each shard;
+    shards still unanswered after HEDGE_DELAY get a hedged request to
+    their next replica, and a failed request fails over to the next
+    replica at once. Whichever replica answers first wins. Shards with
+    no answer by the deadline are left out, so a slow or dead shard
+    degrades recall instead of latency.
+
+    With an explicit topic the merged ranking equals a single server
+    over the whole database. With topic None each shard routes the
+    query with a router trained on its own FAQs, which can differ from
+    routing over the whole corpus.
+    """
+
+    # Seconds before an unanswered shard is asked again on another replica
+    HEDGE_DELAY = 0.05
+
+    # Request threads per replica URL
+    THREADS_PER_REPLICA = 8
+
+    def __init__(
+        self,
+        shards: List[List[str]],
+        timeout: float = 1.0,
+        hedge_delay: Optional[float] = None
+    ):
+        """
+        Initialize coordinator
+
+        Args:
+            shards: Replica base URLs (e.g. http://host:port) per shard, in shard order
+            timeout: Deadline in seconds for gathering all shards
+            hedge_delay: Override of HEDGE_DELAY (None keeps the default)
+        """
+        if not shards or not all(shards):
+            raise ValueError("every shard needs at least one replica")
+        self.shards = [[url.rstrip('/') for url in replicas] for replicas in shards]
+        self.timeout = timeout
+        self.hedge_delay = self.HEDGE_DELAY if hedge_delay is None else hedge_delay
+        self.stats = Counter()
+        # Requests to a stalled replica hold a thread until their deadline,
+        # so leave room for several queries' worth of them per replica
+        self.pool = ThreadPoolExecutor(
+            max_workers=self.THREADS_PER_REPLICA * sum(len(replicas) for replicas in self.shards),
+            thread_name_prefix='shard-request'
+        )
+
+    def _fetch(self, url: str, params: Dict, timeout: float) -> List[Tuple[Dict, float]]:
+        """Call one replica's /search endpoint"""
+        with urllib.request.urlopen(f"{url}/search?{urlencode(params)}", timeout=timeout) as response:
+            payload = json.loads(response.read().decode('utf-8'))
+        return [(result['faq'], result['score']) for result in payload['results']]
+
+    def search(
+        self,
+        query: str,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        top_k: int = 1,
+        min_score: Optional[float] = None
+    ) -> Tuple[List[Tuple[Dict, float]], List[int]]:
+        """
+        Get the best FAQs over all shards
+
+        Args:
+            query: User's question
+            topic: Topic, or None to let each shard route the query
+            difficulty: Optional difficulty filter
+            top_k: Number of results
+            min_score: Return nothing if the best result scores below this
+
+        Returns:
+            Tuple of (results, missing shards) where results is a list of
+            (FAQ, score), best first
+        """
+        self.stats['queries'] += 1
+        params = {'q': query, 'top_k': top_k}
+        if topic:
+            params['topic'] = topic
+        if difficulty:
+            params['difficulty'] = difficulty
+
+        start = time.monotonic()
+        deadline = start + self.timeout
+        hedge_at = start + self.hedge_delay
+        answers: Dict[int, List[Tuple[Dict, float]]] = {}
+        pending = {}
+        next_replica = [0] * len(self.shards)
+
+        def send(shard: int) -> bool:
+            replica = next_replica[shard]
+            if replica >= len(self.shards[shard]):
+                return False
+            next_replica[shard] += 1
+            remaining = max(0.001, deadline - time.monotonic())
+            future = self.pool.submit(self._fetch, self.shards[shard][replica], params, remaining)
+            pending[future] = shard
+            self.stats['requests'] += 1
+            return True
+
+        for shard in range(len(self.shards)):
+            send(shard)
+        hedged = False
+
+        while pending and len(answers) < len(self.shards):
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            until = deadline if hedged else min(deadline, hedge_at)
+            finished, _ = wait(list(pending), timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+            for future in finished:
+                shard = pending.pop(future)
+                if shard in answers:
+                    continue
+                try:
+                    answers[shard] = future.result()
+                except Exception:
+                    self.stats['errors'] += 1
+                    if shard not in pending.values() and send(shard):
+                        self.stats['failovers'] += 1
+
+            if not hedged and time.monotonic() >= hedge_at:
+                hedged = True
+                for shard in range(len(self.shards)):
+                    if shard not in answers and send(shard):
+                        self.stats['hedged'] += 1
+
+        for future in pending:
+            future.cancel()
+        missing = [shard for shard in range(len(self.shards)) if shard not in answers]
+        if missing:
+            self.stats['partial'] += 1
+            self.stats['missing_shards'] += len(missing)
+
+        # Stable merge: score, then shard order, then rank within the shard
+        merged = [
+            (-score, shard, rank, faq)
+            for shard, results in answers.items()
+            for rank, (faq, score) in enumerate(results)
+        ]
+        merged.sort(key=lambda item: item[:3])
+        results = [(faq, -negative) for negative, _, _, faq in merged[:top_k]]
+        if min_score is not None and results and results[0][1] < min_score:
+            results = []
+        return results, missing
+
+    def get_stats(self) -> Dict:
+        """Get request, hedge, failover and partial-result counts"""
+        return {'shards': len(self.shards), **self.stats}
+
+    def close(self) -> None:
+        """Stop the request threads"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Split an FAQ database into shard files for shard servers"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Split an FAQ database into contiguous shards")
+    parser.add_argument('--faqs', default='data/bangla_faqs.json', help='FAQ JSON database')
+    parser.add_argument('--shards', type=int, default=2, help='Number of shards')
+    parser.add_argument('--out-dir', default='data/shards', help='Directory for the shard files')
+    args = parser.parse_args(argv)
+
+    try:
+        paths = split_faqs(args.faqs, args.shards, args.out_dir)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    for path in paths:
+        print(f"✅ {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,321 @@
+"""Read-only FAQ index packed into one shared memory block"""
+
+import json
+from multiprocessing import shared_memory, resource_tracker
+from typing import List, Dict, Tuple, Optional, Iterable, Sequence
+
+import numpy as np
+
+from .bangla_processor import BanglaProcessor
+from .faq_index import FAQIndex
+from .faq_retriever import FAQRetriever
+
+
+class SharedIndex:
+    """
+    FAQ database and scoring structures stored as flat NumPy arrays
+
+    Everything lives in a single multiprocessing.shared_memory block: a
+    JSON header describing the layout, UTF-8 string pools with offset
+    arrays (FAQ records, question tokens, keywords) and CSR posting lists.
+    Processes forked after build() (or attaching by name) read the arrays
+    in place, so N workers share one copy of the index instead of N.
+
+    rank() returns exactly the scores and order of FAQRetriever's
+    exhaustive ranking.
+    """
+
+    MAGIC = b'BFAQSHM1'
+    ALIGN = 8
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        """
+        Wrap a shared memory block (use build() or attach())
+
+        Args:
+            shm: Shared memory block holding a packed index
+            owner: Whether this process created (and will unlink) the block
+        """
+        self.shm = shm
+        self.owner = owner
+
+        buf = shm.buf
+        if bytes(buf[:len(self.MAGIC)]) != self.MAGIC:
+            raise ValueError(f"Not a shared FAQ index: {shm.name}")
+        header_len = int.from_bytes(bytes(buf[8:16]), 'little')
+        self.meta = json.loads(bytes(buf[16:16 + header_len]).decode('utf-8'))
+        data_start = self._aligned(16 + header_len)
+
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, (dtype, offset, length) in self.meta['arrays'].items():
+            self.arrays[name] = np.ndarray(
+                (length,), dtype=np.dtype(dtype), buffer=buf, offset=data_start + offset
+            )
+
+        self.topics: List[str] = self.meta['topics']
+        self.difficulties: List[str] = self.meta['difficulties']
+        self._topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+        self._difficulty_ids = {difficulty: i for i, difficulty in enumerate(self.difficulties)}
+
+    @property
+    def name(self) -> str:
+        """Shared memory block name"""
+        return self.shm.name
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the shared memory block"""
+        return self.shm.size
+
+    @staticmethod
+    def _string_pool(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode strings into (offsets, UTF-8 pool) arrays"""
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+        pool = np.frombuffer(b''.join(encoded), dtype=np.uint8) if encoded else np.zeros(0, dtype=np.uint8)
+        return offsets, pool
+
+    @staticmethod
+    def _csr(postings: List[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Pack posting lists into (pointer, positions) arrays"""
+        pointer = np.zeros(len(postings) + 1, dtype=np.int64)
+        if postings:
+            pointer[1:] = np.cumsum([len(positions) for positions in postings])
+        positions = np.fromiter(
+            (pos for positions in postings for pos in positions), dtype=np.int32, count=int(pointer[-1])
+        )
+        return pointer, positions
+
+    @classmethod
+    def build(cls, index: FAQIndex, name: Optional[str] = None) -> 'SharedIndex':
+        """
+        Pack an FAQIndex into a new shared memory block
+
+        Args:
+            index: Built FAQ index
+            name: Optional shared memory name
+
+        Returns:
+            Owning SharedIndex (call unlink() when done)
+        """
+        faqs = index.faqs
+        topics = sorted({faq.get('topic', '') for faq in faqs})
+        difficulties = sorted({faq.get('difficulty', '') for faq in faqs})
+        topic_ids = {topic: i for i, topic in enumerate(topics)}
+        difficulty_ids = {difficulty: i for i, difficulty in enumerate(difficulties)}
+
+        # Sort by UTF-8 bytes so lookups can binary search the raw pool
+        vocabulary = index.vocabulary
+        tokens = sorted(vocabulary.tokens, key=lambda token: token.encode('utf-8'))
+        keywords = sorted(index.keyword_postings, key=lambda keyword: keyword.encode('utf-8'))
+
+        arrays = {}
+        arrays['faq_offsets'], arrays['faq_pool'] = cls._string_pool(
+            [json.dumps(faq, ensure_ascii=False) for faq in faqs]
+        )
+        arrays['token_offsets'], arrays['token_pool'] = cls._string_pool(tokens)
+        arrays['token_ptr'], arrays['postings'] = cls._csr(
+            [index.postings[vocabulary.ids[token]] for token in tokens]
+        )
+        arrays['keyword_offsets'], arrays['keyword_pool'] = cls._string_pool(keywords)
+        arrays['keyword_ptr'], arrays['keyword_postings'] = cls._csr(
+            [index.keyword_postings[keyword] for keyword in keywords]
+        )
+        arrays['question_sizes'] = index.question_sizes.astype(np.int32)
+        arrays['topic_ids'] = np.array([topic_ids[faq.get('topic', '')] for faq in faqs], dtype=np.int16)
+        arrays['difficulty_ids'] = np.array(
+            [difficulty_ids[faq.get('difficulty', '')] for faq in faqs], dtype=np.int16
+        )
+
+        # Layout: magic, header length, JSON header, then aligned arrays
+        # (array offsets in the header are relative to the data section)
+        layout = {}
+        offset = 0
+        for key, array in arrays.items():
+            layout[key] = [array.dtype.str, offset, int(array.shape[0])]
+            offset += cls._aligned(array.nbytes)
+
+        meta = {'count': len(faqs), 'topics': topics, 'difficulties': difficulties, 'arrays': layout}
+        header = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        data_start = cls._aligned(16 + len(header))
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(1, data_start + offset))
+        shm.buf[:8] = cls.MAGIC
+        shm.buf[8:16] = len(header).to_bytes(8, 'little')
+        shm.buf[16:16 + len(header)] = header
+        for key, array in arrays.items():
+            start = data_start + layout[key][1]
+            shm.buf[start:start + array.nbytes] = array.tobytes()
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def _aligned(cls, size: int) -> int:
+        """Round size up to the array alignment"""
+        return -(-size // cls.ALIGN) * cls.ALIGN
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedIndex':
+        """Attach to an existing shared index by name (read-only use)"""
+        shm = shared_memory.SharedMemory(name=name)
+        # Only the creator may unlink the block; stop this process's tracker from doing it
+        try:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return cls(shm, owner=False)
+
+    def close(self) -> None:
+        """Release this process's mapping"""
+        self.arrays.clear()
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Close and destroy the shared memory block (owner only)"""
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def size(self) -> int:
+        """Get number of FAQs"""
+        return self.meta['count']
+
+    def faq(self, pos: int) -> Dict:
+        """Decode the FAQ record at a position"""
+        offsets = self.arrays['faq_offsets']
+        start, end = int(offsets[pos]), int(offsets[pos + 1])
+        return json.loads(self.arrays['faq_pool'][start:end].tobytes().decode('utf-8'))
+
+    def _find(self, pool_name: str, value: bytes) -> int:
+        """Binary search a sorted string pool; -1 if absent"""
+        offsets = self.arrays[pool_name + '_offsets']
+        pool = self.arrays[pool_name + '_pool']
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            mid = (low + high) // 2
+            current = pool[offsets[mid]:offsets[mid + 1]].tobytes()
+            if current < value:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(offsets) - 1 and pool[offsets[low]:offsets[low + 1]].tobytes() == value:
+            return low
+        return -1
+
+    def _postings(self, kind: str, key_id: int) -> np.ndarray:
+        """Posting list of a token ('token') or keyword ('keyword') id"""
+        if kind == 'token':
+            pointer, positions = self.arrays['token_ptr'], self.arrays['postings']
+        else:
+            pointer, positions = self.arrays['keyword_ptr'], self.arrays['keyword_postings']
+        return positions[pointer[key_id]:pointer[key_id + 1]]
+
+    def keyword_hits(self, query_lower: str) -> np.ndarray:
+        """Positions of FAQs with a keyword occurring inside the query"""
+        offsets = self.arrays['keyword_offsets']
+        pool = self.arrays['keyword_pool']
+        keyword_count = len(offsets) - 1
+        substring_count = len(query_lower) * (len(query_lower) + 1) // 2 + 1
+        matched = []
+
+        if substring_count < keyword_count:
+            # Look up every substring of the query in the sorted keyword pool
+            candidates = {query_lower[i:j] for i in range(len(query_lower)) for j in range(i + 1, len(query_lower) + 1)}
+            candidates.add('')
+            for candidate in candidates:
+                keyword_id = self._find('keyword', candidate.encode('utf-8'))
+                if keyword_id >= 0:
+                    matched.append(keyword_id)
+        else:
+            # UTF-8 is self-synchronizing: byte containment equals str containment
+            query_bytes = query_lower.encode('utf-8')
+            for keyword_id in range(keyword_count):
+                if pool[offsets[keyword_id]:offsets[keyword_id + 1]].tobytes() in query_bytes:
+                    matched.append(keyword_id)
+
+        if not matched:
+            return np.zeros(0, dtype=np.int32)
+        return np.unique(np.concatenate([self._postings('keyword', k) for k in matched]))
+
+    def candidate_mask(
+        self,
+        topics: Optional[Iterable[str]] = None,
+        difficulty: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """Boolean mask of FAQs in the given topics/difficulty (None = all)"""
+        mask = None
+        if topics is not None:
+            ids = [self._topic_ids[topic] for topic in topics if topic in self._topic_ids]
+            mask = np.isin(self.arrays['topic_ids'], ids)
+        if difficulty is not None:
+            difficulty_mask = self.arrays['difficulty_ids'] == self._difficulty_ids.get(difficulty, -1)
+            mask = difficulty_mask if mask is None else mask & difficulty_mask
+        return mask
+
+    def rank(
+        self,
+        query: str,
+        mask: Optional[np.ndarray] = None,
+        top_k: int = 1,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank FAQs for a query
+
+        Args:
+            query: User query
+            mask: Optional boolean candidate mask (see candidate_mask)
+            top_k: Number of results
+            min_score: Return [] if the best result scores below this value
+
+        Returns:
+            List of (position, score) in rank order
+        """
+        query_lower = query.lower()
+        query_tokens = set(BanglaProcessor.tokenize(query_lower))
+        query_size = len(query_tokens)
+
+        token_ids = [self._find('token', token.encode('utf-8')) for token in query_tokens]
+        lists = [self._postings('token', token_id) for token_id in token_ids if token_id >= 0]
+        if lists:
+            touched, shared = np.unique(np.concatenate(lists), return_counts=True)
+        else:
+            touched, shared = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+
+        hits = self.keyword_hits(query_lower)
+        docs = np.union1d(touched, hits).astype(np.int64)
+        if mask is not None:
+            docs = docs[mask[docs]]
+
+        overlap = np.zeros(len(docs), dtype=np.int64)
+        if len(touched):
+            where = np.searchsorted(touched, docs)
+            found = (where < len(touched)) & (touched[np.minimum(where, len(touched) - 1)] == docs)
+            overlap[found] = shared[where[found]]
+
+        sizes = self.arrays['question_sizes'][docs].astype(np.int64)
+        similarity = np.zeros(len(docs), dtype=np.float64)
+        if query_size:
+            nonempty = sizes > 0
+            similarity[nonempty] = overlap[nonempty] / (query_size + sizes[nonempty] - overlap[nonempty])
+        bonus = np.where(np.isin(docs, hits), FAQRetriever.KEYWORD_BONUS, 0.0)
+        scores = (similarity * FAQRetriever.QUESTION_WEIGHT) + bonus
+
+        order = np.lexsort((docs, -scores))[:top_k]
+        ranked = [(int(docs[i]), float(scores[i])) for i in order]
+
+        # Remaining candidates share nothing with the query and score 0.0
+        if len(ranked) < top_k:
+            seen = set(int(doc) for doc in docs)
+            candidates = range(self.size()) if mask is None else np.flatnonzero(mask)
+            for pos in candidates:
+                if len(ranked) >= top_k:
+                    break
+                if int(pos) not in seen:
+                    ranked.append((int(pos), 0.0))
+
+        if min_score is not None and (not ranked or ranked[0][1] < min_score):
+            return []
+        return ranked
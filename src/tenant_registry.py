@@ -0,0 +1,261 @@
+"""Many FAQ databases served from one process under a shared memory budget"""
+
+import os
+import sys
+import threading
+import types
+from collections import OrderedDict, Counter
+from typing import Optional, Dict, List, Tuple, Union
+
+import numpy as np
+
+from src.chatbot import BanglaFAQChatbot
+from src.response_generator import StructuredResponse
+from src.vocabulary import TokenPool
+
+
+# Objects without references to walk
+_LEAF_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def estimate_bytes(obj: object, pool: Optional[TokenPool] = None) -> int:
+    """
+    Approximate memory reachable from an object
+
+    Walks containers and instance attributes, counting every object once.
+    Functions, classes, modules, threads and strings owned by pool (which
+    are shared and accounted separately) are not counted.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        kind = type(item)
+        if kind in _LEAF_TYPES:
+            if kind is not str or pool is None or not pool.owns(item):
+                total += sys.getsizeof(item)
+            continue
+        if kind is dict:
+            total += sys.getsizeof(item)
+            stack.extend(item.keys())
+            stack.extend(item.values())
+            continue
+        if isinstance(item, (type, types.ModuleType, types.FunctionType, types.MethodType,
+                             types.BuiltinFunctionType, threading.Thread, TokenPool)):
+            continue
+        if isinstance(item, np.ndarray):
+            # Views do not own their buffer; count the base array instead
+            total += sys.getsizeof(item) if item.base is None else 0
+            if item.base is not None:
+                stack.append(item.base)
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+    return total
+
+
+class TenantRegistry:
+    """
+    Lazily loaded chatbots for many FAQ databases in one process
+
+    Tenants are registered by id and FAQ path; a tenant's chatbot is
+    built on its first query. All tenants intern their question tokens
+    and keywords into one TokenPool, so words common to several databases
+    are stored once. When the loaded tenants exceed memory_budget, the
+    least recently queried ones are evicted; with cache_dir set, an
+    evicted tenant is rebuilt from its on-disk index cache when queried
+    again instead of re-tokenizing its database.
+
+    Tenant sizes are estimated once, after loading, from the objects
+    reachable from the chatbot (answer caches are bounded by
+    BanglaFAQChatbot.ANSWER_CACHE_SIZE and not re-measured). After an
+    eviction the pool is rebuilt from the tenants still loaded, so it only
+    holds tokens that are in use.
+
+    Chatbots are built outside the registry lock, so queries to loaded
+    tenants are not held up by a slow load; a per-tenant load lock makes
+    concurrent first queries to one tenant wait for a single build.
+    """
+
+    DEFAULT_BUDGET = 512 * 1024 * 1024
+
+    def __init__(self, cache_dir: Optional[str] = None, memory_budget: int = DEFAULT_BUDGET):
+        """
+        Initialize empty registry
+
+        Args:
+            cache_dir: Optional directory for the index caches (one subdirectory per tenant)
+            memory_budget: Bytes allowed for loaded tenants and the shared token pool
+        """
+        if memory_budget <= 0:
+            raise ValueError("memory_budget must be positive")
+        self.cache_dir = cache_dir
+        self.memory_budget = memory_budget
+        self.token_pool = TokenPool()
+        self.paths: Dict[str, str] = {}
+        self.loaded: OrderedDict = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.stats = Counter()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, tenant_id: str, faq_database_path: str) -> None:
+        """
+        Add a tenant (loaded on its first query)
+
+        Re-registering a tenant with a new path drops its loaded chatbot.
+        """
+        if not os.path.exists(faq_database_path):
+            raise FileNotFoundError(f"FAQ database not found: {faq_database_path}")
+        with self._lock:
+            if self.paths.get(tenant_id) not in (None, faq_database_path):
+                self._evict(tenant_id)
+            self.paths[tenant_id] = faq_database_path
+
+    def unregister(self, tenant_id: str) -> None:
+        """Remove a tenant and free its chatbot"""
+        with self._lock:
+            self._evict(tenant_id)
+            self.paths.pop(tenant_id, None)
+            self._load_locks.pop(tenant_id, None)
+
+    def tenants(self) -> List[str]:
+        """Get registered tenant ids"""
+        return list(self.paths)
+
+    def get(self, tenant_id: str) -> BanglaFAQChatbot:
+        """
+        Get a tenant's chatbot, loading it (and evicting cold tenants) if needed
+
+        Raises:
+            KeyError: If the tenant is not registered
+        """
+        with self._lock:
+            chatbot = self._lookup(tenant_id)
+            if chatbot is not None:
+                return chatbot
+            load_lock = self._load_locks.setdefault(tenant_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another query may have loaded the tenant meanwhile
+                chatbot = self._lookup(tenant_id)
+                if chatbot is not None:
+                    return chatbot
+                path = self.paths.get(tenant_id)
+                pool = self.token_pool
+
+            cache_dir = os.path.join(self.cache_dir, tenant_id) if self.cache_dir else None
+            chatbot = BanglaFAQChatbot(path, cache_dir=cache_dir, token_pool=pool)
+            size = estimate_bytes(chatbot, pool)
+
+            with self._lock:
+                if self.paths.get(tenant_id) != path:
+                    # Re-registered while loading: answer this query, keep nothing
+                    return chatbot
+                if pool is not self.token_pool:
+                    # The pool was rebuilt by an eviction while loading
+                    chatbot.retriever.index.intern_tokens(self.token_pool)
+                    chatbot.retriever.token_pool = self.token_pool
+                self.loaded[tenant_id] = chatbot
+                self.sizes[tenant_id] = size
+                self.stats['loads'] += 1
+                if chatbot.retriever.get_stats().get('index_cache_hits'):
+                    self.stats['cache_reloads'] += 1
+                self._enforce_budget(keep=tenant_id)
+                return chatbot
+
+    def _lookup(self, tenant_id: str) -> Optional[BanglaFAQChatbot]:
+        """Get a loaded chatbot, marking it recently used (caller holds the lock)"""
+        chatbot = self.loaded.get(tenant_id)
+        if chatbot is not None:
+            self.loaded.move_to_end(tenant_id)
+            self.stats['hits'] += 1
+            return chatbot
+        if tenant_id not in self.paths:
+            raise KeyError(f"unknown tenant: {tenant_id}")
+        return None
+
+    def _enforce_budget(self, keep: str) -> None:
+        """Evict least recently used tenants (never keep) until within budget"""
+        while self.memory_bytes() > self.memory_budget:
+            victim = next((tenant for tenant in self.loaded if tenant != keep), None)
+            if victim is None:
+                print(f"⚠️  Tenant {keep} alone exceeds the memory budget")
+                return
+            self._evict(victim)
+            self.stats['evictions'] += 1
+            self._rebuild_pool()
+
+    def _rebuild_pool(self) -> None:
+        """Replace the token pool by one holding only the loaded tenants' tokens"""
+        pool = TokenPool()
+        for chatbot in self.loaded.values():
+            # Tokens are already shared objects, so re-interning keeps them shared
+            chatbot.retriever.index.intern_tokens(pool)
+            chatbot.retriever.token_pool = pool
+        self.stats['pruned_tokens'] += len(self.token_pool) - len(pool)
+        self.token_pool = pool
+
+    def _evict(self, tenant_id: str) -> None:
+        """Drop a loaded chatbot"""
+        chatbot = self.loaded.pop(tenant_id, None)
+        self.sizes.pop(tenant_id, None)
+        if chatbot is not None:
+            chatbot.close()
+
+    def memory_bytes(self) -> int:
+        """Estimated memory of the loaded tenants plus the shared token pool"""
+        return sum(self.sizes.values()) + self.token_pool.nbytes()
+
+    def generate_answer(
+        self,
+        tenant_id: str,
+        query: str,
+        topic: Optional[str],
+        difficulty: Optional[str] = None,
+        structured: bool = False
+    ) -> Tuple[Union[str, StructuredResponse], bool]:
+        """Answer a query from one tenant's FAQs (see BanglaFAQChatbot.generate_answer)"""
+        return self.get(tenant_id).generate_answer(query, topic, difficulty, structured)
+
+    def answer_question(
+        self,
+        tenant_id: str,
+        query: str,
+        topic: Optional[str],
+        difficulty: Optional[str] = None,
+        top_k: int = 1
+    ) -> Tuple[Optional[List], bool]:
+        """Retrieve from one tenant's FAQs (see BanglaFAQChatbot.answer_question)"""
+        return self.get(tenant_id).answer_question(query, topic, difficulty, top_k=top_k)
+
+    def close(self) -> None:
+        """Close every loaded chatbot"""
+        with self._lock:
+            for tenant_id in list(self.loaded):
+                self._evict(tenant_id)
+
+    def get_stats(self) -> Dict:
+        """Get load, hit and eviction counts with per-tenant sizes"""
+        with self._lock:
+            return {
+                'tenants': len(self.paths),
+                'loaded': list(self.loaded),
+                'tenant_bytes': dict(self.sizes),
+                'pool_tokens': len(self.token_pool),
+                'pool_bytes': self.token_pool.nbytes(),
+                'memory_bytes': self.memory_bytes(),
+                'memory_budget': self.memory_budget,
+                **self.stats
+            }
@@ -0,0 +1,139 @@
+"""Lightweight topic routing for queries without a selected topic"""
+
+import math
+from collections import Counter
+from typing import List, Dict, Tuple, Optional, Iterable
+
+from .bangla_processor import BanglaProcessor
+from .faq_index import FAQIndex
+
+
+class TopicRouter:
+    """
+    Multinomial Naive Bayes topic classifier trained from the FAQ corpus
+
+    Per-token log-likelihoods for every topic are precomputed at training
+    time, so predicting a query is one dict lookup per token plus a
+    softmax over the (few) topics.
+    """
+
+    def __init__(self, alpha: float = 1.0, min_confidence: float = 0.8, max_topics: int = 2):
+        """
+        Initialize router
+
+        Args:
+            alpha: Additive (Laplace) smoothing
+            min_confidence: Probability mass the routed topics must cover
+            max_topics: Maximum number of topics to route a query to
+        """
+        self.alpha = alpha
+        self.min_confidence = min_confidence
+        self.max_topics = max_topics
+        self.topics: List[str] = []
+        self._log_prior: Tuple[float, ...] = ()
+        self._log_likelihood: Dict[str, Tuple[float, ...]] = {}
+        self.stats = Counter()
+
+    @classmethod
+    def from_index(cls, index: FAQIndex, **kwargs) -> 'TopicRouter':
+        """Train a router from the question tokens and keywords of an index"""
+        router = cls(**kwargs)
+        documents = (
+            (
+                faq.get('topic'),
+                index.question_tokens(pos)
+                + [token for keyword in keywords for token in BanglaProcessor.tokenize(keyword)]
+            )
+            for pos, (faq, keywords) in enumerate(zip(index.faqs, index.keywords))
+        )
+        router.fit(documents)
+        return router
+
+    def fit(self, documents: Iterable[Tuple[str, List[str]]]) -> None:
+        """
+        Train from (topic, tokens) pairs
+
+        Args:
+            documents: Iterable of (topic, token list) pairs
+        """
+        doc_counts: Counter = Counter()
+        token_counts: Dict[str, Counter] = {}
+        for topic, tokens in documents:
+            if not topic:
+                continue
+            doc_counts[topic] += 1
+            token_counts.setdefault(topic, Counter()).update(tokens)
+
+        self.topics = sorted(doc_counts)
+        total_docs = sum(doc_counts.values())
+        vocabulary = set()
+        for counts in token_counts.values():
+            vocabulary.update(counts)
+        denominators = [
+            sum(token_counts[topic].values()) + self.alpha * len(vocabulary)
+            for topic in self.topics
+        ]
+
+        self._log_prior = tuple(math.log(doc_counts[topic] / total_docs) for topic in self.topics)
+        self._log_likelihood = {
+            token: tuple(
+                math.log((token_counts[topic][token] + self.alpha) / d)
+                for topic, d in zip(self.topics, denominators)
+            )
+            for token in vocabulary
+        }
+
+    def predict(self, tokens: Iterable[str]) -> List[Tuple[str, float]]:
+        """
+        Predict topic probabilities for query tokens
+
+        Returns:
+            List of (topic, probability) sorted by probability (descending);
+            empty if no query token was seen in training
+        """
+        scores = list(self._log_prior)
+        known = False
+        for token in set(tokens):
+            likelihood = self._log_likelihood.get(token)
+            if likelihood is None:
+                continue
+            known = True
+            for i, value in enumerate(likelihood):
+                scores[i] += value
+
+        if not known:
+            return []
+
+        peak = max(scores)
+        weights = [math.exp(score - peak) for score in scores]
+        total = sum(weights)
+        return sorted(
+            ((topic, weight / total) for topic, weight in zip(self.topics, weights)),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+    def route(self, tokens: Iterable[str]) -> Optional[List[str]]:
+        """
+        Pick the partitions to search for a query
+
+        Returns:
+            Up to max_topics topics covering min_confidence of the probability
+            mass, or None when the router is not confident (search everything)
+        """
+        predictions = self.predict(tokens)
+        covered = 0.0
+        routed = []
+        for topic, probability in predictions[:self.max_topics]:
+            routed.append(topic)
+            covered += probability
+            if covered >= self.min_confidence:
+                self.stats['routed'] += 1
+                return routed
+
+        self.stats['fallbacks'] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get routing counters"""
+        return dict(self.stats)
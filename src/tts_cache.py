@@ -0,0 +1,288 @@
+"""On-disk cache of synthesized speech for static FAQ answers"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Tuple, List, Dict
+
+from src.voice_backends import TTSBackend, DEFAULT_TTS_BACKEND, create_tts_backend
+
+
+class AudioCache:
+    """
+    Size-bounded store of synthesized audio
+
+    Entries are keyed by (text hash, engine, language, rate) and stored as
+    one file each. File modification times double as last-access times:
+    hits refresh them and the least recently used files are evicted once
+    the total size exceeds max_bytes.
+
+    The directory is scanned once, at startup; afterwards entry sizes and
+    recency are tracked in memory, so puts and evictions never walk the
+    directory. Files written by other processes are picked up when hit
+    (or by the next AudioCache opened on the directory).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize audio cache
+
+        Args:
+            cache_dir: Directory to store audio files in
+            max_bytes: Maximum total size of cached audio
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        # path -> size, least recently used first
+        self._sizes: OrderedDict = OrderedDict(
+            (path, size) for _, size, path in sorted(self._entries())
+        )
+        self._total = sum(self._sizes.values())
+
+    @staticmethod
+    def key(text: str, engine: str, language: str, rate: int) -> str:
+        """Cache key of a synthesis request"""
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{engine}\0{language}\0{rate}\0{text_hash}".encode('utf-8')).hexdigest()
+
+    def path(self, key: str, audio_format: str) -> str:
+        """File path of a cache entry"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{audio_format}")
+
+    def _entry_path(self, text: str, backend: TTSBackend) -> str:
+        """File path of the entry for text rendered by backend"""
+        return self.path(self.key(text, backend.name, backend.language, backend.rate), backend.audio_format)
+
+    def get(self, text: str, backend: TTSBackend) -> Optional[bytes]:
+        """Get cached audio for text rendered by backend, or None"""
+        path = self._entry_path(text, backend)
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(path)
+                self.misses += 1
+            return None
+        with self._lock:
+            self._track(path, len(audio))
+            self.hits += 1
+        return audio
+
+    def put(self, text: str, backend: TTSBackend, audio: bytes, evict: bool = True) -> str:
+        """
+        Atomically store audio for text rendered by backend
+
+        Returns:
+            Path of the cache entry
+        """
+        path = self._entry_path(text, backend)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._track(path, len(audio))
+        if evict:
+            self.enforce_limit()
+        return path
+
+    def _track(self, path: str, size: int) -> None:
+        """Record an entry as most recently used (caller holds the lock)"""
+        self._total += size - self._sizes.pop(path, 0)
+        self._sizes[path] = size
+
+    def _forget(self, path: str) -> None:
+        """Drop an entry from the running totals (caller holds the lock)"""
+        self._total -= self._sizes.pop(path, 0)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """Scan the directory for (mtime, size, path) of all cache entries"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_bytes(self) -> int:
+        """Get total size of cached audio"""
+        return self._total
+
+    def enforce_limit(self) -> int:
+        """
+        Evict least recently used entries until the cache fits max_bytes
+
+        Returns:
+            Number of evicted entries
+        """
+        with self._lock:
+            evicted = 0
+            while self._total > self.max_bytes and self._sizes:
+                path = next(iter(self._sizes))
+                self._forget(path)
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Already gone (e.g. evicted by another process)
+                    continue
+                evicted += 1
+            return evicted
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics"""
+        return {
+            'entries': len(self._sizes),
+            'bytes': self._total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class CachedTTSBackend(TTSBackend):
+    """TTS backend wrapper serving repeated texts from an AudioCache"""
+
+    def __init__(self, backend: TTSBackend, cache: AudioCache):
+        """
+        Initialize cached backend
+
+        Args:
+            backend: Backend used on cache misses
+            cache: Audio cache
+        """
+        super().__init__(backend.language, backend.rate)
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+        self.audio_format = backend.audio_format
+
+    def lookup(self, text: str) -> Optional[bytes]:
+        """Get cached audio without synthesizing"""
+        return self.cache.get(text, self.backend)
+
+    def synthesize(self, text: str) -> bytes:
+        """Serve audio from cache, synthesizing and storing it on a miss"""
+        audio = self.lookup(text)
+        if audio is None:
+            audio = self.backend.synthesize(text)
+            self.cache.put(text, self.backend, audio)
+        return audio
+
+
+def _render_one(args: Tuple[str, str, int, str, int, str]) -> Tuple[str, int]:
+    """Worker process: synthesize one answer into the cache"""
+    engine, language, rate, cache_dir, max_bytes, text = args
+    backend = _worker_backend(engine, language, rate)
+    cache = AudioCache(cache_dir, max_bytes)
+    if cache.get(text, backend) is not None:
+        return 'cached', 0
+    audio = backend.synthesize(text)
+    cache.put(text, backend, audio, evict=False)
+    return 'rendered', len(audio)
+
+
+_WORKER_BACKENDS: Dict[Tuple[str, str, int], TTSBackend] = {}
+
+
+def _worker_backend(engine: str, language: str, rate: int) -> TTSBackend:
+    """Create (once per worker process) the backend for pre-rendering"""
+    config = (engine, language, rate)
+    if config not in _WORKER_BACKENDS:
+        _WORKER_BACKENDS[config] = create_tts_backend(engine, language, rate)
+    return _WORKER_BACKENDS[config]
+
+
+def prerender_faq_answers(
+    faq_path: str,
+    cache_dir: str,
+    engine: str = DEFAULT_TTS_BACKEND,
+    language: str = 'bn',
+    rate: int = 150,
+    workers: Optional[int] = None,
+    max_bytes: int = 512 * 1024 * 1024
+) -> Dict[str, int]:
+    """
+    Synthesize every FAQ answer into the audio cache in parallel processes
+
+    Args:
+        faq_path: Path to FAQ JSON database
+        cache_dir: Audio cache directory
+        engine: TTS backend name (default: the one VoiceHandler speaks with)
+        language: Language code
+        rate: Speaking rate
+        workers: Number of worker processes (default: CPU count)
+        max_bytes: Maximum cache size, enforced after rendering
+
+    Returns:
+        Counts of rendered, already cached and failed answers, and evictions
+    """
+    with open(faq_path, 'r', encoding='utf-8') as f:
+        faqs = json.load(f)
+
+    texts = sorted({faq['answer'].strip() for faq in faqs if faq.get('answer', '').strip()})
+    summary = {'answers': len(texts), 'rendered': 0, 'cached': 0, 'failed': 0, 'bytes': 0}
+
+    jobs = [(engine, language, rate, cache_dir, max_bytes, text) for text in texts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_one, job) for job in jobs]
+        for future in as_completed(futures):
+            try:
+                status, size = future.result()
+            except Exception as e:
+                print(f"❌ Error rendering answer: {e}")
+                summary['failed'] += 1
+                continue
+            summary[status] += 1
+            summary['bytes'] += size
+
+    summary['evicted'] = AudioCache(cache_dir, max_bytes).enforce_limit()
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for pre-rendering FAQ answers"""
+    parser = argparse.ArgumentParser(description="Pre-render TTS audio for all FAQ answers")
+    parser.add_argument('--faqs', default=os.path.join('data', 'bangla_faqs.json'), help='FAQ JSON database')
+    parser.add_argument('--cache-dir', default=os.path.join('data', '.audio_cache'), help='Audio cache directory')
+    parser.add_argument('--engine', default=DEFAULT_TTS_BACKEND, help='TTS backend (pyttsx3, gtts, text)')
+    parser.add_argument('--language', default='bn')
+    parser.add_argument('--rate', type=int, default=150)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes')
+    parser.add_argument('--max-mb', type=int, default=512, help='Cache size limit in MB')
+    args = parser.parse_args(argv)
+
+    summary = prerender_faq_answers(
+        args.faqs, args.cache_dir, args.engine, args.language, args.rate,
+        args.workers, args.max_mb * 1024 * 1024
+    )
+    print(json.dumps(summary, ensure_ascii=False))
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
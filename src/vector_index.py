@@ -0,0 +1,352 @@
+"""Compressed FAQ embedding storage: scalar int8 and product quantization"""
+
+import os
+import tempfile
+from typing import List, Dict, Tuple, Optional, Sequence
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+class SentenceEmbedder:
+    """Unit-length question embeddings from a sentence-transformers model"""
+
+    DEFAULT_MODEL = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        """
+        Load embedding model
+
+        Args:
+            model_name: sentence-transformers model name or path
+        """
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("sentence-transformers not installed")
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        """Embed texts into a float32 (n, d) matrix of unit vectors"""
+        vectors = self.model.encode(
+            list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension 8-bit scalar quantization (4x smaller than float32)
+
+    Each dimension is mapped affinely onto 0..255 between its minimum and
+    maximum. Query scores are asymmetric: the float query is multiplied
+    with the codes directly (q . x ~= q . low + (q * scale) . codes),
+    vectors are never decoded.
+    """
+
+    name = 'int8'
+
+    # Codes converted to float per matrix product (bounds temporary memory)
+    BLOCK_ROWS = 65536
+
+    def __init__(self):
+        """Initialize untrained quantizer"""
+        self.low: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit the per-dimension ranges"""
+        self.low = vectors.min(axis=0).astype(np.float32)
+        spread = vectors.max(axis=0).astype(np.float32) - self.low
+        self.scale = np.where(spread > 0, spread / 255.0, 1.0).astype(np.float32)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantize (n, d) float vectors into (n, d) uint8 codes"""
+        codes = np.rint((vectors - self.low) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate float vectors"""
+        return codes.astype(np.float32) * self.scale + self.low
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products of a float query with every code"""
+        weights = (query * self.scale).astype(np.float32)
+        offset = float(query @ self.low)
+        result = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), self.BLOCK_ROWS):
+            block = codes[start:start + self.BLOCK_ROWS]
+            result[start:start + len(block)] = block.astype(np.float32) @ weights
+        return result + offset
+
+    def nbytes(self) -> int:
+        """Size of the trained parameters"""
+        return self.low.nbytes + self.scale.nbytes
+
+
+class ProductQuantizer:
+    """
+    Product quantization: one byte per subspace of the vector
+
+    The d dimensions are split into `subspaces` groups; each group is
+    replaced by the id of its nearest of 256 k-means centroids, so a
+    384-dimensional float32 vector (1536 bytes) is stored in 16-64 bytes.
+    With fewer than 256 training vectors only as many centroids are
+    trained and stored (codes stay below that count). Query scores use
+    asymmetric distance computation: a per-query lookup table of
+    query-subvector . centroid products, summed over the codes.
+    """
+
+    name = 'pq'
+
+    CENTROIDS = 256
+    TRAIN_SAMPLE = 65536
+
+    # Vectors encoded at once (bounds the vectors x centroids distance matrix)
+    BLOCK_ROWS = 65536
+
+    def __init__(self, subspaces: int = 16, iterations: int = 20, seed: int = 0):
+        """
+        Initialize untrained quantizer
+
+        Args:
+            subspaces: Number of subvectors (bytes per vector)
+            iterations: k-means iterations per subspace
+            seed: Random seed for sampling and initialization
+        """
+        if subspaces < 1:
+            raise ValueError("subspaces must be positive")
+        self.subspaces = subspaces
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None  # (subspaces, k, sub_dim), k <= CENTROIDS
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        """View (n, d) vectors as (n, subspaces, sub_dim)"""
+        return vectors.reshape(len(vectors), self.subspaces, -1)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit k-means codebooks for every subspace"""
+        n, dim = vectors.shape
+        if dim % self.subspaces:
+            raise ValueError(f"Dimension {dim} is not divisible by {self.subspaces} subspaces")
+
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(n, min(n, self.TRAIN_SAMPLE), replace=False)].astype(np.float32)
+        parts = self._split(sample)
+        k = min(self.CENTROIDS, len(sample))
+
+        # Only trained centroids are kept: encode and the ADC tables never see untrained rows
+        codebooks = np.empty((self.subspaces, k, dim // self.subspaces), dtype=np.float32)
+        for j in range(self.subspaces):
+            codebooks[j] = self._kmeans(parts[:, j], k, rng)
+        self.centroids = codebooks
+
+    def _kmeans(self, points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+        """Lloyd's k-means; empty clusters are re-seeded with random points"""
+        centers = points[rng.choice(len(points), k, replace=False)].copy()
+        for _ in range(self.iterations):
+            labels = self._nearest(points, centers)
+            counts = np.bincount(labels, minlength=k)
+            sums = np.stack([np.bincount(labels, weights=points[:, d], minlength=k)
+                             for d in range(points.shape[1])], axis=1)
+            empty = counts == 0
+            centers[~empty] = (sums[~empty] / counts[~empty, None]).astype(np.float32)
+            if empty.any():
+                centers[empty] = points[rng.choice(len(points), int(empty.sum()))]
+        return centers
+
+    @staticmethod
+    def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Index of the nearest center of every point (squared L2)"""
+        distances = (centers ** 2).sum(axis=1)[None, :] - 2.0 * (points @ centers.T)
+        return distances.argmin(axis=1)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantize (n, d) float vectors into (n, subspaces) uint8 codes"""
+        codes = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        for start in range(0, len(vectors), self.BLOCK_ROWS):
+            parts = self._split(np.asarray(vectors[start:start + self.BLOCK_ROWS], dtype=np.float32))
+            for j in range(self.subspaces):
+                codes[start:start + len(parts), j] = self._nearest(parts[:, j], self.centroids[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate float vectors"""
+        parts = self.centroids[np.arange(self.subspaces)[None, :], codes]
+        return parts.reshape(len(codes), -1)
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products of a float query with every code (ADC)"""
+        table = np.einsum('jkd,jd->jk', self.centroids, query.reshape(self.subspaces, -1).astype(np.float32))
+        result = np.zeros(len(codes), dtype=np.float32)
+        for j in range(self.subspaces):
+            result += table[j][codes[:, j]]
+        return result
+
+    def nbytes(self) -> int:
+        """Size of the codebooks"""
+        return self.centroids.nbytes
+
+
+class QuantizedVectorIndex:
+    """
+    Inner-product search over quantized FAQ embeddings
+
+    A standalone building block for embedding-based search (see USAGE.md
+    and benchmarks/bench_quantization.py); the keyword/Jaccard
+    FAQRetriever does not use embeddings.
+
+    Only the codes and quantizer parameters are held in memory. When a
+    rerank path is given, the float32 vectors are written there and
+    memory-mapped: the best `rerank` approximate candidates of a query
+    are re-scored exactly from the mapped rows, so only those pages are
+    read. Vector positions are FAQ database positions.
+    """
+
+    QUANTIZATIONS = ('none', 'int8', 'pq')
+
+    def __init__(self, quantizer=None):
+        """
+        Initialize empty index (see build)
+
+        Args:
+            quantizer: ScalarQuantizer, ProductQuantizer, or None for float32
+        """
+        self.quantizer = quantizer
+        self.codes: Optional[np.ndarray] = None
+        self.exact: Optional[np.ndarray] = None
+        self.dim = 0
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        quantization: str = 'int8',
+        rerank_path: Optional[str] = None,
+        subspaces: int = 16
+    ) -> 'QuantizedVectorIndex':
+        """
+        Quantize embeddings
+
+        Args:
+            vectors: (n, d) float embeddings (unit length for cosine similarity)
+            quantization: One of QUANTIZATIONS
+            rerank_path: Optional .npy file for the memory-mapped float32 vectors
+            subspaces: Bytes per vector for 'pq'
+
+        Returns:
+            Built index
+        """
+        if quantization not in cls.QUANTIZATIONS:
+            raise ValueError(f"Invalid quantization: {quantization}")
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        if quantization == 'none':
+            index = cls(None)
+            index.codes = vectors
+        else:
+            quantizer = ScalarQuantizer() if quantization == 'int8' else ProductQuantizer(subspaces)
+            quantizer.train(vectors)
+            index = cls(quantizer)
+            index.codes = quantizer.encode(vectors)
+        index.dim = vectors.shape[1]
+
+        if rerank_path:
+            index.exact = cls._write_vectors(rerank_path, vectors)
+        return index
+
+    @staticmethod
+    def _write_vectors(path: str, vectors: np.ndarray) -> np.ndarray:
+        """Atomically save float32 vectors and map them read-only"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, vectors)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return np.load(path, mmap_mode='r')
+
+    def size(self) -> int:
+        """Number of stored vectors"""
+        return 0 if self.codes is None else len(self.codes)
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Scores of every vector from the in-memory representation"""
+        query = np.asarray(query, dtype=np.float32)
+        if self.quantizer is None:
+            return self.codes @ query
+        return self.quantizer.scores(query, self.codes)
+
+    def search(self, query: np.ndarray, k: int = 10, rerank: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Find the vectors with the highest inner product
+
+        Args:
+            query: (d,) float query embedding
+            k: Number of results
+            rerank: Approximate candidates re-scored exactly from the
+                mapped float vectors (needs a rerank path; None: no re-rank)
+
+        Returns:
+            List of (position, score), best first (ties in position order)
+        """
+        scores = self.approximate_scores(query)
+        wanted = min(max(k, rerank or 0), len(scores))
+        if wanted <= 0:
+            return []
+        candidates = np.sort(np.argpartition(-scores, wanted - 1)[:wanted])
+
+        if rerank and self.exact is not None:
+            values = np.asarray(self.exact[candidates] @ np.asarray(query, dtype=np.float32))
+        else:
+            values = scores[candidates]
+        order = np.argsort(-values, kind='stable')[:k]
+        return [(int(candidates[i]), float(values[i])) for i in order.tolist()]
+
+    def memory_bytes(self) -> int:
+        """In-memory size: codes plus quantizer parameters (mapped vectors excluded)"""
+        params = self.quantizer.nbytes() if self.quantizer is not None else 0
+        return (self.codes.nbytes if self.codes is not None else 0) + params
+
+    def get_stats(self) -> Dict:
+        """Storage statistics against unquantized float32"""
+        return {
+            'quantization': self.quantizer.name if self.quantizer is not None else 'none',
+            'vectors': self.size(),
+            'memory_bytes': self.memory_bytes(),
+            'float32_bytes': self.size() * self.dim * 4,
+            'rerank_file_bytes': self.exact.nbytes if self.exact is not None else 0
+        }
+
+
+def recall_at_k(index: QuantizedVectorIndex, vectors: np.ndarray, queries: np.ndarray,
+                k: int = 10, rerank: Optional[int] = None) -> float:
+    """
+    Mean fraction of the exact top-k found by an index
+
+    Args:
+        index: Index to evaluate
+        vectors: Unquantized vectors the index was built from
+        queries: (q, d) query embeddings
+        k: Result count
+        rerank: Re-rank depth passed to search
+
+    Returns:
+        Recall@k in [0, 1]
+    """
+    total = 0.0
+    for query in queries:
+        exact = vectors @ query
+        expected = set(np.argsort(-exact, kind='stable')[:k].tolist())
+        found = {pos for pos, _ in index.search(query, k, rerank)}
+        total += len(found & expected) / len(expected) if expected else 1.0
+    return total / len(queries) if len(queries) else 0.0
@@ -0,0 +1,120 @@
+"""Token vocabulary mapping question tokens to dense integer ids"""
+
+import sys
+from array import array
+from typing import List, Dict, Iterable, Tuple, Sequence, Optional
+
+
+class Vocabulary:
+    """
+    Interns tokens to dense integer ids
+
+    Token sets are stored as sorted array('I') of ids: 4 bytes per token
+    instead of a set of str objects, and two sets are intersected by
+    merging the sorted arrays instead of hashing strings.
+    """
+
+    TYPECODE = 'I'
+
+    def __init__(self):
+        """Initialize empty vocabulary"""
+        self.tokens: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.ids
+
+    def add(self, token: str) -> int:
+        """Get the id of a token, assigning the next id to new tokens"""
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            self.ids[token] = token_id
+            self.tokens.append(token)
+        return token_id
+
+    def add_all(self, tokens: Iterable[str]) -> array:
+        """Intern tokens and return their distinct ids as a sorted array"""
+        return array(self.TYPECODE, sorted({self.add(token) for token in tokens}))
+
+    def encode(self, tokens: Iterable[str], extra: Optional[Dict[str, int]] = None) -> Tuple[array, int]:
+        """
+        Map tokens to ids without growing the vocabulary
+
+        Unknown tokens cannot match any indexed token, so they are dropped
+        from the ids (they still count towards the set size). When sets
+        outside the index are compared with each other, pass the same
+        extra dict to each call: unknown tokens then get temporary ids
+        past the vocabulary that are consistent across those calls.
+
+        Returns:
+            Tuple of (sorted array of ids, number of distinct tokens)
+        """
+        distinct = set(tokens)
+        ids = []
+        for token in distinct:
+            token_id = self.ids.get(token)
+            if token_id is None and extra is not None:
+                token_id = extra.setdefault(token, len(self.tokens) + len(extra))
+            if token_id is not None:
+                ids.append(token_id)
+        ids.sort()
+        return array(self.TYPECODE, ids), len(distinct)
+
+    def intern(self, pool: 'TokenPool') -> None:
+        """Replace token strings with the pool's shared objects (ids are unchanged)"""
+        self.tokens = [pool.intern(token) for token in self.tokens]
+        self.ids = {token: token_id for token_id, token in enumerate(self.tokens)}
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Map ids back to tokens"""
+        return [self.tokens[token_id] for token_id in ids]
+
+    @staticmethod
+    def intersection_size(a: Sequence[int], b: Sequence[int]) -> int:
+        """Count common ids of two sorted id arrays by merging them"""
+        i = j = shared = 0
+        len_a, len_b = len(a), len(b)
+        while i < len_a and j < len_b:
+            x, y = a[i], b[j]
+            if x == y:
+                shared += 1
+                i += 1
+                j += 1
+            elif x < y:
+                i += 1
+            else:
+                j += 1
+        return shared
+
+
+class TokenPool:
+    """
+    Intern table shared by the indexes of several FAQ databases
+
+    Databases in one language repeat most of their words; indexes interned
+    into one pool reference a single str object per distinct token instead
+    of one copy per database.
+    """
+
+    def __init__(self):
+        """Initialize empty pool"""
+        self.tokens: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def intern(self, token: str) -> str:
+        """Get the pooled object equal to token, adding it if new"""
+        return self.tokens.setdefault(token, token)
+
+    def owns(self, obj: object) -> bool:
+        """Check whether an object is one of the pooled strings"""
+        return type(obj) is str and self.tokens.get(obj) is obj
+
+    def nbytes(self) -> int:
+        """Approximate memory of the pooled strings and the table"""
+        return sys.getsizeof(self.tokens) + sum(sys.getsizeof(token) for token in self.tokens)
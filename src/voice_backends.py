@@ -0,0 +1,259 @@
+"""Pluggable speech backends: TTS engines, recognizers and audio players"""
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import List, Optional, Iterable
+
+try:
+    import pyttsx3
+    PYTTSX3_AVAILABLE = True
+except ImportError:
+    PYTTSX3_AVAILABLE = False
+
+try:
+    from gtts import gTTS
+    GTTS_AVAILABLE = True
+except ImportError:
+    GTTS_AVAILABLE = False
+
+try:
+    import speech_recognition as sr
+    SR_AVAILABLE = True
+except ImportError:
+    SR_AVAILABLE = False
+
+
+class TTSBackend:
+    """Base class for text-to-speech engines producing audio bytes"""
+
+    name = 'base'
+    audio_format = 'wav'
+
+    def __init__(self, language: str = 'bn', rate: int = 150):
+        """
+        Initialize TTS backend
+
+        Args:
+            language: Language code
+            rate: Speaking rate (words per minute, where supported)
+        """
+        self.language = language
+        self.rate = rate
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize text into audio bytes"""
+        raise NotImplementedError
+
+
+class Pyttsx3Backend(TTSBackend):
+    """Offline TTS through pyttsx3 (rendered to a per-request temp file)"""
+
+    name = 'pyttsx3'
+    audio_format = 'wav'
+
+    def __init__(self, language: str = 'bn', rate: int = 150):
+        """Initialize pyttsx3 engine"""
+        super().__init__(language, rate)
+        if not PYTTSX3_AVAILABLE:
+            raise RuntimeError("pyttsx3 not installed")
+        self.engine = pyttsx3.init()
+        self.engine.setProperty('rate', rate)
+        # pyttsx3 engines are not thread-safe
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize text into WAV bytes"""
+        fd, path = tempfile.mkstemp(suffix='.wav', prefix='tts_')
+        os.close(fd)
+        try:
+            with self._lock:
+                self.engine.save_to_file(text, path)
+                self.engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+class GTTSBackend(TTSBackend):
+    """Google Text-to-Speech rendered into an in-memory MP3 buffer"""
+
+    name = 'gtts'
+    audio_format = 'mp3'
+
+    def __init__(self, language: str = 'bn', rate: int = 150):
+        """Initialize gTTS backend"""
+        super().__init__(language, rate)
+        if not GTTS_AVAILABLE:
+            raise RuntimeError("gTTS not installed")
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize text into MP3 bytes"""
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.language, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class TextTTSBackend(TTSBackend):
+    """Offline stand-in that 'synthesizes' the UTF-8 text itself"""
+
+    name = 'text'
+    audio_format = 'txt'
+
+    def synthesize(self, text: str) -> bytes:
+        """Return text as bytes"""
+        return text.encode('utf-8')
+
+
+TTS_BACKENDS = {
+    'pyttsx3': Pyttsx3Backend,
+    'gtts': GTTSBackend,
+    'text': TextTTSBackend,
+}
+
+# Engine VoiceHandler speaks with by default (audio cached for another engine is never hit)
+DEFAULT_TTS_BACKEND = 'pyttsx3'
+
+
+def create_tts_backend(name: str, language: str = 'bn', rate: int = 150) -> TTSBackend:
+    """
+    Create a TTS backend by name
+
+    Args:
+        name: One of TTS_BACKENDS
+        language: Language code
+        rate: Speaking rate
+
+    Returns:
+        TTS backend instance
+    """
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name}")
+    return TTS_BACKENDS[name](language, rate)
+
+
+class RecognizerBackend:
+    """Base class for speech recognizers"""
+
+    def listen(self, timeout: float = 10) -> str:
+        """Listen for one utterance and return recognized text ('' on failure)"""
+        raise NotImplementedError
+
+
+class SpeechRecognitionBackend(RecognizerBackend):
+    """Microphone recognition through SpeechRecognition + Google API"""
+
+    def __init__(self, language: str = 'bn-IN'):
+        """Initialize speech recognizer"""
+        if not SR_AVAILABLE:
+            raise RuntimeError("SpeechRecognition not installed")
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def listen(self, timeout: float = 10) -> str:
+        """Record from microphone and recognize Bengali speech"""
+        try:
+            with sr.Microphone() as source:
+                print("🎤 শুনছি... (Listening...)")
+                audio = self.recognizer.listen(source, timeout=timeout)
+
+            try:
+                text = self.recognizer.recognize_google(audio, language=self.language)
+                print(f"✅ চিনেছি: {text}")
+                return text
+            except sr.UnknownValueError:
+                print("❌ বুঝতে পারলাম না। (Could not understand)")
+                return ""
+            except sr.RequestError as e:
+                print(f"❌ API Error: {e}")
+                return ""
+
+        except Exception as e:
+            print(f"❌ Error recording: {e}")
+            return ""
+
+
+class ScriptedRecognizer(RecognizerBackend):
+    """Offline stand-in returning pre-scripted utterances"""
+
+    def __init__(self, utterances: Iterable[str]):
+        """
+        Initialize scripted recognizer
+
+        Args:
+            utterances: Texts returned by successive listen() calls
+        """
+        self._utterances = list(utterances)
+        self._lock = threading.Lock()
+
+    def listen(self, timeout: float = 10) -> str:
+        """Return the next scripted utterance ('' when exhausted)"""
+        with self._lock:
+            return self._utterances.pop(0) if self._utterances else ""
+
+
+class AudioPlayer:
+    """Base class for audio output"""
+
+    def play(self, audio: bytes, audio_format: str) -> None:
+        """Play audio bytes (blocks until playback is done)"""
+        raise NotImplementedError
+
+
+class SubprocessPlayer(AudioPlayer):
+    """Play audio through a command-line player using per-request temp files"""
+
+    PLAYERS = (
+        ['afplay'],
+        ['mpg123', '-q'],
+        ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'quiet'],
+        ['aplay', '-q'],
+    )
+
+    def __init__(self, command: Optional[List[str]] = None):
+        """
+        Initialize player
+
+        Args:
+            command: Player command; detected from PLAYERS when omitted
+        """
+        self.command = command or self.detect_command()
+
+    @classmethod
+    def detect_command(cls) -> Optional[List[str]]:
+        """Find the first available command-line player"""
+        for command in cls.PLAYERS:
+            if shutil.which(command[0]):
+                return list(command)
+        return None
+
+    def play(self, audio: bytes, audio_format: str) -> None:
+        """Write audio to a private temp file and play it"""
+        if not self.command:
+            raise RuntimeError("No audio player found")
+
+        fd, path = tempfile.mkstemp(suffix=f'.{audio_format}', prefix='response_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            subprocess.run(self.command + [path], check=False)
+        finally:
+            os.remove(path)
+
+
+class RecordingPlayer(AudioPlayer):
+    """Offline stand-in that records played audio instead of playing it"""
+
+    def __init__(self):
+        """Initialize recording player"""
+        self.played: List[bytes] = []
+        self._lock = threading.Lock()
+
+    def play(self, audio: bytes, audio_format: str) -> None:
+        """Record audio bytes"""
+        with self._lock:
+            self.played.append(audio)
@@ -1,68 +1,182 @@
 """Voice handler for STT (Speech-to-Text) and TTS (Text-to-Speech) support"""
 
-try:
-    import pyttsx3
-    PYTTSX3_AVAILABLE = True
-except ImportError:
-    PYTTSX3_AVAILABLE = False
+from concurrent.futures import Future
+from typing import Optional, List, Callable
 
-try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
-
-try:
-    import speech_recognition as sr
-    SR_AVAILABLE = True
-except ImportError:
-    SR_AVAILABLE = False
+from src.audio_pipeline import AudioPipeline
+from src.response_generator import ResponseGenerator
+from src.tts_cache import AudioCache, CachedTTSBackend
+from src.voice_pipeline import VoiceTurnPipeline
+from src.voice_backends import (
+    PYTTSX3_AVAILABLE, GTTS_AVAILABLE, SR_AVAILABLE,
+    TTSBackend, RecognizerBackend, AudioPlayer,
+    Pyttsx3Backend, GTTSBackend, SpeechRecognitionBackend, SubprocessPlayer
+)
 
 
 class VoiceHandler:
     """
     Handle speech-to-text and text-to-speech for Bangla
     
+    Synthesis, playback and recognition run on an AudioPipeline, so the
+    *_async methods return immediately with a Future and several voice
+    sessions can share one handler. Backends are pluggable, which lets the
+    handler run offline with stand-ins from src.voice_backends.
+    
     Note: This is a bonus feature. Install dependencies with:
     pip install pyttsx3 gtts SpeechRecognition
     """
     
-    def __init__(self, language: str = 'bn'):
+    def __init__(
+        self,
+        language: str = 'bn',
+        tts_backend: Optional[TTSBackend] = None,
+        recognizer: Optional[RecognizerBackend] = None,
+        player: Optional[AudioPlayer] = None,
+        synth_workers: int = 2,
+        queue_size: int = 8,
+        audio_cache: Optional[AudioCache] = None
+    ):
         """
         Initialize voice handler
         
         Args:
             language: Language code ('bn' for Bengali, 'en' for English)
+            tts_backend: TTS backend (defaults to pyttsx3 when installed)
+            recognizer: Speech recognizer (defaults to SpeechRecognition)
+            player: Audio output (defaults to a command-line player)
+            synth_workers: Number of synthesis worker threads
+            queue_size: Maximum queued jobs per pipeline stage
+            audio_cache: Optional cache of pre-synthesized audio
         """
         self.language = language
-        self.tts_engine = self._init_tts()
-        self.recognizer = self._init_recognizer()
+        self.audio_cache = audio_cache
+        self.tts_engine = self._with_cache(tts_backend or self._init_tts())
+        self.recognizer = recognizer or self._init_recognizer()
+        self.player = player or SubprocessPlayer()
+        self._gtts_engine = None
+        self.pipeline = AudioPipeline(
+            tts=self.tts_engine,
+            player=self.player,
+            recognizer=self.recognizer,
+            synth_workers=synth_workers,
+            queue_size=queue_size
+        )
 
-    def _init_tts(self):
-        \"\"\"Initialize TTS engine\"\"\"
+    def _init_tts(self) -> Optional[TTSBackend]:
+        """Initialize TTS engine"""
         if not PYTTSX3_AVAILABLE:
-            print(\"⚠️  Warning: pyttsx3 not installed. TTS not available.\")
+            print("⚠️  Warning: pyttsx3 not installed. TTS not available.")
             return None
         try:
-            engine = pyttsx3.init()
-            engine.setProperty('rate', 150)
-            return engine
+            return Pyttsx3Backend(self.language, rate=150)
         except Exception as e:
-            print(f\"⚠️  Error initializing TTS: {e}\")
+            print(f"⚠️  Error initializing TTS: {e}")
             return None
 
-    def _init_recognizer(self):
+    def _init_gtts(self) -> Optional[TTSBackend]:
+        """Initialize Google TTS backend on first use"""
+        if self._gtts_engine is None and GTTS_AVAILABLE:
+            self._gtts_engine = self._with_cache(GTTSBackend(self.language))
+        return self._gtts_engine
+
+    def _with_cache(self, engine: Optional[TTSBackend]) -> Optional[TTSBackend]:
+        """Serve an engine's repeated texts from the audio cache, if configured"""
+        if engine is None or self.audio_cache is None:
+            return engine
+        return CachedTTSBackend(engine, self.audio_cache)
+
+    def _init_recognizer(self) -> Optional[RecognizerBackend]:
         """Initialize speech recognizer"""
         if not SR_AVAILABLE:
             print("⚠️  Warning: SpeechRecognition not installed. STT not available.")
             return None
         
         try:
-            return sr.Recognizer()
+            return SpeechRecognitionBackend()
         except Exception as e:
             print(f"⚠️  Error initializing STT: {e}")
             return None
 
+    def speak_async(self, text: str, use_gtts: bool = False) -> Optional[Future]:
+        """
+        Queue text for speech without blocking
+        
+        Response formatting and metadata are stripped first. Texts found in
+        the audio cache skip synthesis and go straight to playback.
+        
+        Args:
+            text: Text to speak (Bengali or English)
+            use_gtts: Use Google TTS instead of the default engine
+            
+        Returns:
+            Future resolving to True when playback finished, or None if no
+            TTS engine is available
+        """
+        engine = self._select_engine(use_gtts)
+        if engine is None:
+            return None
+        
+        return self._queue_speech(ResponseGenerator.speech_text(text), engine)
+
+    def _select_engine(self, use_gtts: bool) -> Optional[TTSBackend]:
+        """Get the TTS engine for a request, printing a warning if missing"""
+        engine = self._init_gtts() if use_gtts else self.tts_engine
+        if engine is None:
+            print("❌ gTTS not available" if use_gtts else "❌ pyttsx3 not available")
+        return engine
+
+    def _queue_speech(
+        self,
+        text: str,
+        engine: TTSBackend,
+        on_start: Optional[Callable[[], None]] = None
+    ) -> Future:
+        """Queue text for playback, skipping synthesis on audio cache hits"""
+        if isinstance(engine, CachedTTSBackend):
+            audio = engine.lookup(text)
+            if audio is not None:
+                ready = Future()
+                ready.set_result(audio)
+                return self.pipeline.play(ready, engine.audio_format, on_start)
+        
+        return self.pipeline.play(self.pipeline.synthesize(text, engine), engine.audio_format, on_start)
+
+    def speak_chunks(
+        self,
+        text: str,
+        use_gtts: bool = False,
+        on_start: Optional[Callable[[], None]] = None
+    ) -> List[Future]:
+        """
+        Queue a response for streamed speech, one sentence at a time
+        
+        Every sentence is synthesized as a separate job, so playback of the
+        first sentence starts while the rest are still being synthesized.
+        A response whose full text is in the audio cache is played whole.
+        
+        Args:
+            text: Response text (formatting and metadata are stripped)
+            use_gtts: Use Google TTS instead of the default engine
+            on_start: Called right before each chunk starts playing
+            
+        Returns:
+            Playback futures, one per chunk (empty if TTS is unavailable)
+        """
+        engine = self._select_engine(use_gtts)
+        if engine is None:
+            return []
+        
+        text = ResponseGenerator.speech_text(text)
+        audio = engine.lookup(text) if isinstance(engine, CachedTTSBackend) else None
+        if audio is not None:
+            ready = Future()
+            ready.set_result(audio)
+            return [self.pipeline.play(ready, engine.audio_format, on_start)]
+        
+        chunks = [chunk.strip() for chunk in ResponseGenerator.split_sentences(text)]
+        return [self._queue_speech(chunk, engine, on_start) for chunk in chunks if chunk]
+
     def speak(self, text: str, use_gtts: bool = False) -> bool:
         """
         Convert text to speech
@@ -74,107 +188,86 @@ class VoiceHandler:
         Returns:
             True if successful, False otherwise
         """
-        if use_gtts:
-            return self._speak_gtts(text)
-        else:
-            return self._speak_pyttsx3(text)
-
-    def _speak_pyttsx3(self, text: str) -> bool:
-        """Speak using pyttsx3"""
-        if not self.tts_engine or not PYTTSX3_AVAILABLE:
-            print("❌ pyttsx3 not available")
+        future = self.speak_async(text, use_gtts)
+        if future is None:
             return False
         
         try:
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-            return True
+            return future.result()
         except Exception as e:
             print(f"❌ Error speaking: {e}")
             return False
 
-    def _speak_gtts(self, text: str) -> bool:
-        \"\"\"Speak using Google Text-to-Speech\"\"\"
-        if not GTTS_AVAILABLE:
-            print(\"❌ gTTS not available\")
-            return False
-        try:
-            tts = gTTS(text=text, lang=self.language, slow=False)
-            tts.save(\"/tmp/response.mp3\")
-            import os
-            os.system(\"afplay /tmp/response.mp3\")
-            return True
-        except Exception as e:
-            print(f\"❌ Error with gTTS: {e}\")
-            return False
+    def recognize_async(self, timeout: float = 10) -> Optional[Future]:
+        """
+        Start recognizing speech without blocking
+        
+        Returns:
+            Future resolving to recognized text, or None if STT is unavailable
+        """
+        if not self.recognizer:
+            print("❌ Speech Recognition not available")
+            return None
+        return self.pipeline.recognize(timeout)
 
-    def recognize(self) -> str:
+    def recognize(self, timeout: float = 10) -> str:
         """
         Recognize speech from microphone
         
         Returns:
             Recognized text or empty string if failed
         """
-        if not self.recognizer or not SR_AVAILABLE:
-            print("❌ Speech Recognition not available")
+        future = self.recognize_async(timeout)
+        if future is None:
             return ""
         
         try:
-            with sr.Microphone() as source:
-                print("🎤 শুনছি... (Listening...)")
-                audio = self.recognizer.listen(source, timeout=10)
-            
-            # Try to recognize Bengali speech
-            try:
-                text = self.recognizer.recognize_google(audio, language='bn-IN')
-                print(f"✅ চিনেছি: {text}")
-                return text
-            except sr.UnknownValueError:
-                print("❌ বুঝতে পারলাম না। (Could not understand)")
-                return ""
-            except sr.RequestError as e:
-                print(f"❌ API Error: {e}")
-                return ""
-                
+            return future.result()
         except Exception as e:
             print(f"❌ Error recording: {e}")
             return ""
 
-    def interactive_mode(self):
-        """Run interactive voice chat mode"""
+    def close(self) -> None:
+        """Stop background audio workers"""
+        self.pipeline.close()
+
+    def interactive_mode(self, chatbot=None, topic: Optional[str] = None, difficulty: Optional[str] = None):
+        """
+        Run interactive voice chat mode
+        
+        Args:
+            chatbot: BanglaFAQChatbot to answer with (loads the bundled
+                database when omitted)
+            topic: Optional topic (None detects it from each question)
+            difficulty: Optional difficulty filter
+        """
         print("""
 ╔════════════════════════════════════════════════════════╗
 ║          ভয়েস মোড (Voice Mode) - বোনাস            ║
 ╚════════════════════════════════════════════════════════╝
         """)
         
-        while True:
-            try:
-                # Get voice input
-                user_input = self.recognize()
-                if not user_input:
-                    continue
-                
-                # This would integrate with the chatbot
-                print(f"\nআপনার প্রশ্ন: {user_input}\n")
-                
-                # Simulate response
-                response = f"আপনার প্রশ্ন প্রক্রিয়া করছি: {user_input}"
-                
-                # Speak response
-                self.speak(response, use_gtts=True)
-                
-                # Ask to continue
-                continue_response = input("\nআরও কিছু বলতে চান? (আছে/নেই): ").strip()
-                if continue_response.lower() in ['নেই', 'no', 'n']:
-                    break
-                    
-            except KeyboardInterrupt:
-                print("\n\nবন্ধ করা হচ্ছে... (Exiting)")
-                break
-            except Exception as e:
-                print(f"Error: {e}")
-                break
+        if chatbot is None:
+            import os
+            from src.chatbot import BanglaFAQChatbot
+            faq_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'bangla_faqs.json')
+            chatbot = BanglaFAQChatbot(faq_path)
+        
+        pipeline = VoiceTurnPipeline(self, chatbot, topic=topic, difficulty=difficulty)
+        print("থামাতে বলুন: \"বন্ধ\" (Say \"stop\" to exit)")
+        
+        try:
+            turns = pipeline.run()
+        except KeyboardInterrupt:
+            pipeline.stop()
+            print("\n\nবন্ধ করা হচ্ছে... (Exiting)")
+            return
+        
+        summary = VoiceTurnPipeline.summarize(turns)
+        print(
+            f"\n{summary['turns']} turns | listen {summary['listen_ms']:.0f} ms | "
+            f"answer {summary['answer_ms']:.0f} ms | first audio {summary['first_audio_ms']:.0f} ms"
+        )
 
     @staticmethod
     def check_dependencies() -> dict:
@@ -0,0 +1,218 @@
+"""End-to-end voice turns: recognition -> chatbot answer -> streamed speech"""
+
+import queue
+import threading
+import time
+from typing import Optional, List, Dict, Iterable
+
+
+class VoiceTurnPipeline:
+    """
+    Run voice turns with overlapping stages
+
+    A listener thread recognizes utterances and hands them over a bounded
+    queue to the answer stage, so the next question is listened for while
+    the current one is being answered. No new listen starts while an
+    answer is queued for speech or playing (until its last sentence has
+    finished), so the microphone does not pick up the bot's own speech,
+    also when answers play back to back; a listen already in progress
+    when an answer is queued is not cut off.
+    Each answer is split into sentences that are
+    synthesized as separate jobs on the VoiceHandler's audio pipeline;
+    playback of the first sentence starts before the rest of the answer
+    has been synthesized.
+
+    Per-turn latency of every stage is recorded in milliseconds:
+    listen_ms, answer_ms, first_audio_ms (utterance recognized -> first
+    sentence starts playing) and total_ms (utterance recognized -> last
+    sentence played).
+    """
+
+    STOP_PHRASES = ('বন্ধ', 'থামো', 'stop', 'exit')
+    POLL_INTERVAL = 0.1
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        voice,
+        chatbot,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        use_gtts: bool = False,
+        max_pending: int = 2,
+        listen_timeout: float = 10,
+        max_silence: int = 3,
+        stop_phrases: Iterable[str] = STOP_PHRASES
+    ):
+        """
+        Initialize voice turn pipeline
+
+        Args:
+            voice: VoiceHandler providing recognizer, TTS and playback
+            chatbot: BanglaFAQChatbot answering recognized questions
+            topic: Topic for answers (None routes each question automatically)
+            difficulty: Optional difficulty filter
+            use_gtts: Use Google TTS instead of the default engine
+            max_pending: Recognized utterances that may wait for an answer
+            listen_timeout: Seconds to wait for each utterance
+            max_silence: Consecutive empty recognitions that end the session
+            stop_phrases: Utterances that end the session
+        """
+        self.voice = voice
+        self.chatbot = chatbot
+        self.topic = topic
+        self.difficulty = difficulty
+        self.use_gtts = use_gtts
+        self.max_pending = max_pending
+        self.listen_timeout = listen_timeout
+        self.max_silence = max_silence
+        self.stop_phrases = {phrase.lower() for phrase in stop_phrases}
+        self._stop = threading.Event()
+        # Cleared while any answer is queued for speech or playing
+        self._quiet = threading.Event()
+        self._quiet.set()
+        self._playing = 0
+        self._lock = threading.Lock()
+
+    def stop(self) -> None:
+        """Ask the pipeline to finish after the current turn"""
+        self._stop.set()
+
+    def _listen_loop(self, utterances: queue.Queue, max_turns: Optional[int]) -> None:
+        """Listener stage: recognize utterances until stopped"""
+        turns = 0
+        silence = 0
+        try:
+            while self._wait_for_quiet():
+                start = time.perf_counter()
+                text = self.voice.recognize(self.listen_timeout).strip()
+                heard_at = time.perf_counter()
+
+                if not text:
+                    silence += 1
+                    if silence >= self.max_silence:
+                        break
+                    continue
+                silence = 0
+
+                if text.lower() in self.stop_phrases:
+                    break
+
+                utterances.put((text, (heard_at - start) * 1000, heard_at))
+                turns += 1
+                if max_turns is not None and turns >= max_turns:
+                    break
+        finally:
+            utterances.put(self._DONE)
+
+    def _wait_for_quiet(self) -> bool:
+        """Block while an answer is queued or playing; False once stopped"""
+        while not self._quiet.wait(self.POLL_INTERVAL):
+            if self._stop.is_set():
+                return False
+        return not self._stop.is_set()
+
+    def _playback_started(self) -> None:
+        """Pause listening until a queued answer has been played"""
+        with self._lock:
+            self._playing += 1
+            self._quiet.clear()
+
+    def _playback_finished(self) -> None:
+        """Resume listening once no answer is queued or playing"""
+        with self._lock:
+            self._playing -= 1
+            if self._playing <= 0:
+                self._playing = 0
+                self._quiet.set()
+
+    def _answer_turn(self, text: str, listen_ms: float, heard_at: float) -> Dict:
+        """Answer stage: retrieve the answer and queue its sentences for speech"""
+        turn = {'query': text, 'listen_ms': listen_ms}
+
+        start = time.perf_counter()
+        response, is_fallback = self.chatbot.generate_answer(text, self.topic, self.difficulty)
+        turn['answer_ms'] = (time.perf_counter() - start) * 1000
+        turn['response'] = response
+        turn['is_fallback'] = is_fallback
+
+        def on_start():
+            if 'first_audio_ms' not in turn:
+                turn['first_audio_ms'] = (time.perf_counter() - heard_at) * 1000
+
+        def on_done(_future):
+            # Chunks play in order, so the last callback marks the end of the turn
+            turn['total_ms'] = (time.perf_counter() - heard_at) * 1000
+
+        # Retrieval overlapped listening; the answer's audio must not
+        self._playback_started()
+        turn['_playback'] = self.voice.speak_chunks(response, self.use_gtts, on_start)
+        turn['chunks'] = len(turn['_playback'])
+        for future in turn['_playback']:
+            future.add_done_callback(on_done)
+        if turn['_playback']:
+            turn['_playback'][-1].add_done_callback(lambda _future: self._playback_finished())
+        else:
+            self._playback_finished()
+        return turn
+
+    def _finish_turn(self, turn: Dict) -> Dict:
+        """Wait for a turn's playback to finish"""
+        played = True
+        for future in turn.pop('_playback'):
+            try:
+                played = future.result() and played
+            except Exception as e:
+                print(f"❌ Error speaking: {e}")
+                played = False
+        turn['played'] = played
+        return turn
+
+    def run(self, max_turns: Optional[int] = None) -> List[Dict]:
+        """
+        Run voice turns until a stop phrase, silence or max_turns
+
+        Args:
+            max_turns: Optional maximum number of answered turns
+
+        Returns:
+            Per-turn results with stage latencies
+        """
+        self._stop.clear()
+        self._playing = 0
+        self._quiet.set()
+        utterances = queue.Queue(maxsize=max(1, self.max_pending))
+        listener = threading.Thread(
+            target=self._listen_loop, args=(utterances, max_turns), name='voice-listener', daemon=True
+        )
+        listener.start()
+
+        turns = []
+        try:
+            while True:
+                item = utterances.get()
+                if item is self._DONE:
+                    break
+                text, listen_ms, heard_at = item
+                print(f"\nআপনার প্রশ্ন: {text}\n")
+                turns.append(self._answer_turn(text, listen_ms, heard_at))
+        finally:
+            self._stop.set()
+            # Unblock a listener waiting for queue space, then wait for it
+            while listener.is_alive():
+                try:
+                    utterances.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+        return [self._finish_turn(turn) for turn in turns]
+
+    @staticmethod
+    def summarize(turns: List[Dict]) -> Dict[str, float]:
+        """Mean latency per stage over turns"""
+        summary = {'turns': len(turns)}
+        for stage in ('listen_ms', 'answer_ms', 'first_audio_ms', 'total_ms'):
+            values = [turn[stage] for turn in turns if stage in turn]
+            summary[stage] = sum(values) / len(values) if values else 0.0
+        return summary
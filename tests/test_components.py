@@ -1,12 +1,74 @@
 """Unit tests for Bangla FAQ Chatbot components"""
 
 import unittest
+import contextlib
+import io
 import os
 import json
+import pickle
+import pstats
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from unittest import mock
+import numpy as np
 from src.bangla_processor import BanglaProcessor
 from src.metadata_filter import MetadataFilter
 from src.faq_retriever import FAQRetriever
+from src.vocabulary import Vocabulary
+from src.bloom_filter import BloomFilter
+from src.heavy_hitters import HeavyHitterTracker
+from src.faq_index import FAQIndex
+from src.index_cache import IndexCache
+from src.related_graph import RelatedQuestionsGraph
+from src.autocomplete import Autocompleter
+from src.vector_index import QuantizedVectorIndex, recall_at_k
+from src.profiling import Profiler
+from src.tenant_registry import TenantRegistry
+from src.conversation import SessionStore
+from src.near_duplicates import NearDuplicateDetector, compact_faqs
+from src.minhash_lsh import MinHashLSH
+from src.batch_runner import BatchRunner, parse_query_line
 from src.chatbot import BanglaFAQChatbot
+from src.topic_router import TopicRouter
+from src.response_generator import ResponseGenerator, ResponseTemplateCache, StructuredResponse
+from src.voice_handler import VoiceHandler
+from src.voice_backends import TextTTSBackend, ScriptedRecognizer, RecordingPlayer
+from src.tts_cache import AudioCache, prerender_faq_answers
+from src.voice_pipeline import VoiceTurnPipeline
+from src.shared_index import SharedIndex
+from src.server import SharedIndexService, PreforkServer
+from src.shard_coordinator import ShardCoordinator, split_faqs
+
+
+def write_synthetic_faqs(directory, count=300, seed=7):
+    """Write a fixed-seed synthetic FAQ database and return its path"""
+    rng = random.Random(seed)
+    words = [f"শব্দ{i}" for i in range(80)]
+    topics = list(MetadataFilter.VALID_TOPICS)
+    difficulties = list(MetadataFilter.VALID_DIFFICULTY)
+    faqs = []
+    for i in range(count):
+        question = ' '.join(rng.choice(words[:rng.randint(5, 80)]) for _ in range(rng.randint(1, 8)))
+        faqs.append({
+            'id': f'syn_{i:05d}',
+            'topic': rng.choice(topics),
+            'difficulty': rng.choice(difficulties),
+            'question': question,
+            'answer': f'উত্তর {i}। বিস্তারিত ব্যাখ্যা {i}।',
+            'keywords': rng.sample(words, rng.randint(0, 2))
+        })
+    path = os.path.join(directory, 'synthetic_faqs.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(faqs, f, ensure_ascii=False)
+    return path
 
 
 class TestBanglaProcessor(unittest.TestCase):
@@ -71,6 +133,48 @@ class TestMetadataFilter(unittest.TestCase):
         self.assertFalse(MetadataFilter.is_valid_difficulty('অবৈধ'))
 
 
+class TestResponseGenerator(unittest.TestCase):
+    """Test response formatting"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.faq = {
+            'id': 'test_1',
+            'topic': 'শিক্ষা',
+            'difficulty': 'সহজ',
+            'question': 'প্রশ্ন ১',
+            'answer': 'উত্তর ১ {x}'
+        }
+    
+    def test_template_matches_direct_format(self):
+        """Test cached templates produce the same text"""
+        templates = ResponseTemplateCache([self.faq])
+        expected = ResponseGenerator.format_response_with_context(
+            self.faq['answer'], 'শিক্ষা', 'সহজ', 0.456
+        )
+        self.assertEqual(templates.format_context(self.faq, 'শিক্ষা', 'সহজ', 0.456), expected)
+        self.assertTrue(expected.endswith('আত্মবিশ্বাস: 46%'))
+    
+    def test_detailed_response(self):
+        """Test detailed response with and without templates"""
+        results = [(self.faq, 0.5)]
+        plain = ResponseGenerator.generate_detailed_response(results)
+        cached = ResponseGenerator.generate_detailed_response(
+            results, templates=ResponseTemplateCache([self.faq])
+        )
+        self.assertEqual(plain, cached)
+        self.assertIn("1. প্রশ্ন: প্রশ্ন ১\n", plain)
+        self.assertIn("আত্মবিশ্বাস: 50% | স্তর: সহজ", plain)
+    
+    def test_structured_response(self):
+        """Test structured responses skip formatting"""
+        response = ResponseGenerator.to_structured((self.faq, 0.5))
+        self.assertIsInstance(response, StructuredResponse)
+        self.assertEqual(response.answer, self.faq['answer'])
+        self.assertNotIn('answer', response.metadata)
+        self.assertTrue(ResponseGenerator.to_structured(None, 'শিক্ষা').is_fallback)
+
+
 class TestFAQRetriever(unittest.TestCase):
     """Test FAQ retrieval"""
     
@@ -92,6 +196,1061 @@ class TestFAQRetriever(unittest.TestCase):
             retriever = FAQRetriever(self.faq_path)
             results = retriever.retrieve("পড়াশোনা", top_k=1)
             self.assertIsInstance(results, list)
+    
+    def test_indexed_scores_match_formula(self):
+        """Test precomputed features give the original scores"""
+        if os.path.exists(self.faq_path):
+            retriever = FAQRetriever(self.faq_path)
+            query = "স্বাস্থ্যকর খাবার কী কী"
+            for faq, score in retriever.retrieve(query, top_k=retriever.get_faq_count()):
+                sim = retriever._calculate_similarity(query, faq.get('question', ''))
+                bonus = min(sum(0.3 for kw in faq.get('keywords', []) if kw.lower() in query.lower()), 0.3)
+                self.assertEqual(score, (sim * 0.7) + bonus)
+    
+    def test_iter_retrieve_matches_retrieve(self):
+        """Test streaming retrieval yields the exhaustive ranking"""
+        if os.path.exists(self.faq_path):
+            retriever = FAQRetriever(self.faq_path)
+            for query in ["পড়াশোনা", "AI প্রযুক্তি কী", "ক্রিকেট খেলা", "xyz"]:
+                for top_k in (1, 3, 100):
+                    streamed = list(retriever.iter_retrieve(query, top_k=top_k))
+                    self.assertEqual(streamed, retriever.retrieve(query, top_k=top_k))
+    
+    def test_pruned_matches_exact(self):
+        """Test dynamic pruning returns the exhaustive ranking"""
+        with tempfile.TemporaryDirectory() as tmp:
+            retriever = FAQRetriever(write_synthetic_faqs(tmp))
+            rng = random.Random(3)
+            topic_faqs = MetadataFilter.filter_by_topic(retriever.get_all_faqs(), 'শিক্ষা')
+            for _ in range(200):
+                query = ' '.join(f"শব্দ{rng.randint(0, 90)}" for _ in range(rng.randint(0, 5)))
+                for candidates in (None, topic_faqs):
+                    for top_k, min_score in ((1, None), (3, 0.1), (1000, None)):
+                        self.assertEqual(
+                            retriever.retrieve(query, candidates, top_k, mode='pruned', min_score=min_score),
+                            retriever.retrieve(query, candidates, top_k, mode='exact', min_score=min_score)
+                        )
+            stats = retriever.get_stats()
+            self.assertGreater(stats['skipped_faqs'], 0)
+            self.assertGreater(stats['skipped_postings'], 0)
+    
+    def test_unindexed_candidates(self):
+        """Test FAQs outside the index share out-of-vocabulary tokens with the query"""
+        with tempfile.TemporaryDirectory() as tmp:
+            retriever = FAQRetriever(write_synthetic_faqs(tmp, count=50))
+            self.assertEqual(Vocabulary.intersection_size([1, 3, 5, 9], [0, 3, 4, 9, 12]), 2)
+            outside = {'question': 'অজানা শব্দ1', 'keywords': []}
+            candidates = [outside] + retriever.get_all_faqs()[:10]
+            results = retriever.retrieve('অজানা শব্দ1 নতুন', candidates, top_k=3)
+            self.assertIs(results[0][0], outside)
+            self.assertEqual(
+                results[0][1], retriever._calculate_similarity('অজানা শব্দ1 নতুন', outside['question']) * 0.7
+            )
+            self.assertEqual(list(retriever.iter_retrieve('অজানা শব্দ1 নতুন', candidates, top_k=3)), results)
+    
+    def test_lsh_mode(self):
+        """Test LSH candidates are re-scored exactly"""
+        with tempfile.TemporaryDirectory() as tmp:
+            retriever = FAQRetriever(write_synthetic_faqs(tmp), mode='lsh', lsh_bands=16, lsh_rows=2)
+            self.assertIsNotNone(retriever.index.lsh)
+            for faq in retriever.get_all_faqs()[:50]:
+                approx = retriever.retrieve(faq['question'], top_k=1)
+                exact = retriever.retrieve(faq['question'], top_k=1, mode='exact')
+                self.assertEqual(approx[0][1], exact[0][1])
+            self.assertLess(
+                retriever.get_stats()['lsh_candidates'],
+                50 * retriever.get_faq_count()
+            )
+
+    
+    def test_parallel_build_identical(self):
+        """Test a process-pool index build pickles to the same bytes as a serial build"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(write_synthetic_faqs(tmp, count=500), 'r', encoding='utf-8') as f:
+                faqs = json.load(f)
+            faqs[3]['question'] = ''
+            original, FAQIndex.PARALLEL_MIN_FAQS = FAQIndex.PARALLEL_MIN_FAQS, 1
+            try:
+                serial = FAQIndex(faqs)
+                parallel = FAQIndex(faqs, workers=3)
+                serial.build_lsh(8, 2)
+                parallel.build_lsh(8, 2, workers=3)
+            finally:
+                FAQIndex.PARALLEL_MIN_FAQS = original
+            self.assertEqual(pickle.dumps(parallel), pickle.dumps(serial))
+            self.assertEqual(parallel.overlap_counts([0, 5]).tolist(), serial.overlap_counts([0, 5]).tolist())
+
+
+class TestNearDuplicates(unittest.TestCase):
+    """Test ingest-time near-duplicate merging"""
+    
+    def setUp(self):
+        self.faqs = [
+            {'id': 'a', 'topic': 'শিক্ষা', 'question': 'ভর্তির আবেদন ফি কত টাকা?', 'answer': 'ক', 'keywords': ['ভর্তি']},
+            {'id': 'b', 'topic': 'শিক্ষা', 'question': 'পরীক্ষার ফলাফল কবে প্রকাশ হবে?', 'answer': 'খ', 'keywords': []},
+            {'id': 'c', 'topic': 'শিক্ষা', 'question': 'ভর্তির আবেদন ফি কত টাকা', 'answer': 'গ', 'keywords': ['ফি', 'ভর্তি']},
+            {'id': 'd', 'topic': 'ভ্রমণ', 'question': 'ভর্তির আবেদন ফি কত টাকা?', 'answer': 'ঘ', 'keywords': []},
+        ]
+    
+    def test_compact_merges_within_topic(self):
+        """Test duplicates merge into the first FAQ with aliases and merged keywords"""
+        compacted, report = compact_faqs(self.faqs)
+        self.assertEqual([faq['id'] for faq in compacted], ['a', 'b', 'd'])
+        self.assertEqual(compacted[0]['aliases'], ['c'])
+        self.assertEqual(compacted[0]['keywords'], ['ভর্তি', 'ফি'])
+        self.assertEqual(compacted[0]['answer'], 'ক')
+        self.assertNotIn('aliases', self.faqs[0])
+        self.assertEqual((report['merged'], report['faqs']), (1, {'before': 4, 'after': 3}))
+        self.assertLess(report['postings']['after'], report['postings']['before'])
+        
+        lsh = MinHashLSH(bands=4, rows=2)
+        token_sets = [{'ক', 'খ'}, set(), {'গ'}]
+        signatures, empty = lsh.signature_matrix(token_sets)
+        self.assertEqual(empty.tolist(), [False, True, False])
+        self.assertTrue(np.array_equal(signatures[2], lsh.signature({'গ'})))
+    
+    def test_retriever_compacts_on_load(self):
+        """Test dedup_threshold compacts the database and resolves alias ids"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'faqs.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.faqs, f, ensure_ascii=False)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                retriever = FAQRetriever(path, dedup_threshold=0.8, cache_dir=tmp)
+                cached = FAQRetriever(path, dedup_threshold=0.8, cache_dir=tmp)
+        self.assertEqual(output.getvalue(), '')
+        self.assertEqual(retriever.get_faq_count(), 3)
+        self.assertEqual(retriever.get_faq_by_id('c')['id'], 'a')
+        self.assertEqual(retriever.get_stats()['near_duplicates_merged'], 1)
+        self.assertEqual(cached.get_stats()['index_cache_hits'], 1)
+        self.assertEqual(cached.get_stats()['near_duplicates_merged'], 1)
+        self.assertEqual(cached.compaction_report, retriever.compaction_report)
+    
+    def test_chained_duplicates_verified_against_canonical(self):
+        """Test A ~ B ~ C with A and C dissimilar merges only B into A"""
+        words = "ভর্তির আবেদন ফি কত টাকা লাগবে এবং কোথায় জমা দিতে হবে".split()
+        faqs = [
+            {'id': name, 'topic': 'শিক্ষা', 'question': ' '.join(words[i:i + 9]), 'answer': name}
+            for i, name in enumerate('abc')
+        ]
+        detector = NearDuplicateDetector(threshold=0.7)
+        self.assertEqual(detector.find(faqs), [[0, 1]])
+        compacted, report = compact_faqs(faqs, detector)
+        self.assertEqual([faq['id'] for faq in compacted], ['a', 'c'])
+        self.assertEqual(compacted[0]['aliases'], ['b'])
+        self.assertEqual(report['merged'], 1)
+
+
+class TestTopicRouter(unittest.TestCase):
+    """Test automatic topic routing"""
+    
+    def test_route(self):
+        """Test confident routing and fallback"""
+        router = TopicRouter()
+        router.fit([
+            ('শিক্ষা', ['স্কুল', 'পরীক্ষা', 'ভর্তি']),
+            ('স্বাস্থ্য', ['ডাক্তার', 'ওষুধ', 'জ্বর']),
+        ])
+        self.assertEqual(router.route(['ডাক্তার', 'জ্বর']), ['স্বাস্থ্য'])
+        self.assertEqual(router.predict(['স্কুল'])[0][0], 'শিক্ষা')
+        self.assertIsNone(router.route(['অজানা']))
+        self.assertEqual(router.get_stats(), {'routed': 1, 'fallbacks': 1})
+
+
+class TestFastRejectFilter(unittest.TestCase):
+    """Test Bloom filter fast rejection of unanswerable queries"""
+    
+    def test_bloom_filter(self):
+        """Test no false negatives and a false-positive rate near the target"""
+        bloom = BloomFilter(1000, fp_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"শব্দ{i}")
+        self.assertTrue(all(f"শব্দ{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"অন্য{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertAlmostEqual(bloom.estimated_fp_rate(), 0.01, delta=0.005)
+    
+    def test_reject_keeps_answers(self):
+        """Test rejected queries are exactly those without a confident answer"""
+        with tempfile.TemporaryDirectory() as tmp:
+            chatbot = BanglaFAQChatbot(write_synthetic_faqs(tmp, count=200))
+            rng = random.Random(11)
+            words = [f"শব্দ{i}" for i in range(80)] + [f"অচেনা{i}" for i in range(80)]
+            for _ in range(300):
+                query = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+                topic = rng.choice([None, 'শিক্ষা', 'ভ্রমণ'])
+                if not chatbot.may_answer(query, topic):
+                    self.assertIsNone(chatbot.retriever.retrieve(
+                        query, chatbot._filter_candidates(topic, query=query),
+                        min_score=chatbot.CONFIDENCE_THRESHOLD
+                    ) or None)
+            self.assertEqual(chatbot.answer_question("অচেনা1 অচেনা2", None), (None, True))
+            stats = chatbot.get_stats()['fast_reject']
+            self.assertGreater(stats['rejected'], 0)
+            self.assertEqual(stats['fp_rate'], 0.01)
+
+    def test_reject_follows_retriever_weight(self):
+        """Test a retuned question weight keeps every answerable query"""
+        with mock.patch.object(FAQRetriever, 'QUESTION_WEIGHT', 1.4), tempfile.TemporaryDirectory() as tmp:
+            chatbot = BanglaFAQChatbot(write_synthetic_faqs(tmp, count=200))
+            self.assertEqual(chatbot.reject_filter.question_weight, 1.4)
+            rng = random.Random(12)
+            words = [f"শব্দ{i}" for i in range(80)] + [f"অচেনা{i}" for i in range(80)]
+            for _ in range(300):
+                query = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 8)))
+                if not chatbot.may_answer(query, 'শিক্ষা'):
+                    self.assertEqual(chatbot.retriever.retrieve(
+                        query, chatbot._filter_candidates('শিক্ষা'), min_score=chatbot.CONFIDENCE_THRESHOLD
+                    ), [])
+
+
+class TestHeavyHitterTracker(unittest.TestCase):
+    """Test Count-Min Sketch heavy-hitter tracking"""
+    
+    def test_top_k_and_persistence(self):
+        """Test frequent keys are kept, never undercounted and survive a restart"""
+        rng = random.Random(3)
+        keys = [f"q{rng.randrange(500)}" for _ in range(2000)] + ["hot"] * 300 + ["warm"] * 150
+        rng.shuffle(keys)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.json')
+            tracker = HeavyHitterTracker(path, top_k=5, width=256)
+            for key in keys:
+                tracker.record(key)
+            tracker.save()
+            
+            top = tracker.heavy_hitters(2)
+            self.assertEqual([key for key, _ in top], ["hot", "warm"])
+            self.assertGreaterEqual(top[0][1], 300)
+            self.assertGreaterEqual(tracker.sketch.estimate("q1"), keys.count("q1"))
+            
+            restored = HeavyHitterTracker(path, top_k=5)
+            self.assertEqual(restored.heavy_hitters(), tracker.heavy_hitters())
+            self.assertEqual(restored.sketch.estimate("warm"), tracker.sketch.estimate("warm"))
+
+
+class TestConversationSession(unittest.TestCase):
+    """Test follow-up answering within conversation sessions"""
+    
+    def test_followup_reranks_previous_candidates(self):
+        """Test follow-ups re-rank the previous turn and unrelated questions widen"""
+        with tempfile.TemporaryDirectory() as tmp:
+            chatbot = BanglaFAQChatbot(write_synthetic_faqs(tmp, count=400))
+        topic = chatbot.retriever.faqs[0]['topic']
+        partition = chatbot._filter_candidates(topic)
+        first = next(faq for faq in partition if len(set(faq['question'].split())) >= 3)
+        words = set(first['question'].split())
+        other = next(faq for faq in partition if not words & set(faq['question'].split()))
+        turns = [first['question'], ' '.join(reversed(first['question'].split())), other['question']]
+        
+        session = chatbot.sessions.get('chat', topic, None)
+        for query in turns:
+            expected, _ = chatbot.answer_question(query, topic, top_k=3)
+            results, is_fallback = chatbot.answer_question(query, topic, top_k=3, session=session)
+            self.assertFalse(is_fallback)
+            self.assertEqual(results[0], expected[0])
+        self.assertEqual(dict(chatbot.session_stats), {'widened': 2, 'reranked': 1})
+        self.assertEqual(len(session.candidates), chatbot.SESSION_CANDIDATES)
+        self.assertIsNotNone(session.partition)
+        
+        response, _ = chatbot.generate_answer(turns[0], topic, session_id='chat')
+        self.assertEqual(response, chatbot.generate_answer(turns[0], topic)[0])
+
+        # A cached answer still counts as a turn and leads the next candidates
+        cached = chatbot.sessions.get('cached', topic, None)
+        chatbot.generate_answer(other['question'], topic)
+        chatbot.generate_answer(other['question'], topic, session_id='cached')
+        self.assertEqual((cached.turns, chatbot.session_stats['cached']), (1, 1))
+        self.assertEqual(cached.candidates, [chatbot.answer_question(other['question'], topic)[0][0][0]])
+
+    def test_followup_outscored_outside_candidates_widens(self):
+        """Test a confident follow-up candidate loses to a better FAQ of the partition"""
+        topic = 'শিক্ষা'
+        faqs = [{'id': 'c1', 'topic': topic, 'question': 'জল ঘর কলম পথ', 'keywords': ['বই']}]
+        faqs += [
+            {'id': f'f{i}', 'topic': topic, 'question': f'জল ঘর শব্দ{i}', 'keywords': []}
+            for i in range(25)
+        ]
+        faqs.append({'id': 't', 'topic': topic, 'question': 'ঘর কলম বই', 'keywords': ['কলম বই']})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'faqs.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(faqs, f, ensure_ascii=False)
+            chatbot = BanglaFAQChatbot(path)
+
+        session = chatbot.sessions.get('chat', topic, None)
+        chatbot.answer_question('জল ঘর কলম', topic, session=session)
+        self.assertNotIn('t', [faq['id'] for faq in session.candidates])
+        results, _ = chatbot.answer_question('জল ঘর কলম বই', topic, session=session)
+        self.assertEqual(results[0][0]['id'], 't')
+        self.assertEqual(results, chatbot.answer_question('জল ঘর কলম বই', topic)[0])
+        self.assertEqual(chatbot.session_stats['outscored'], 1)
+
+    def test_followup_rival_check_is_pruned(self):
+        """Test the follow-up rival check is a pruned search, not an exact scan"""
+        with tempfile.TemporaryDirectory() as tmp:
+            chatbot = BanglaFAQChatbot(write_synthetic_faqs(tmp, count=400))
+        topic = chatbot.retriever.faqs[0]['topic']
+        first = next(faq for faq in chatbot._filter_candidates(topic) if len(set(faq['question'].split())) >= 3)
+
+        session = chatbot.sessions.get('chat', topic, None)
+        chatbot.answer_question(first['question'], topic, session=session)
+        stats = chatbot.retriever.stats
+        before = (stats['pruned_queries'], stats['exact_queries'])
+        chatbot.answer_question(' '.join(reversed(first['question'].split())), topic, session=session)
+        self.assertEqual(chatbot.session_stats['reranked'], 1)
+        self.assertEqual((stats['pruned_queries'], stats['exact_queries']), (before[0] + 1, before[1]))
+
+    def test_idle_and_capacity_eviction(self):
+        """Test sessions expire when idle, are bounded and reset on a topic change"""
+        store = SessionStore(idle_timeout=0.05, max_sessions=2)
+        first = store.get('a', 'শিক্ষা', None)
+        self.assertIs(store.get('a', 'শিক্ষা', None), first)
+        self.assertIsNot(store.get('a', 'স্বাস্থ্য', None), first)
+        store.get('b', None, None)
+        store.get('c', None, None)
+        self.assertEqual(list(store.sessions), ['b', 'c'])
+        time.sleep(0.1)
+        self.assertEqual(store.evict_idle(), 2)
+        self.assertEqual(store.get_stats(), {'active': 0, 'created': 4, 'evicted': 1, 'expired': 2})
+
+
+class TestDeadlineRetrieval(unittest.TestCase):
+    """Test deadline-aware answering with graceful degradation"""
+    
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as tmp:
+            cls.chatbot = BanglaFAQChatbot(write_synthetic_faqs(tmp, count=400))
+    
+    def test_generous_deadline_matches_full_ranking(self):
+        """Test answers within the budget equal answers without a deadline"""
+        for faq in self.chatbot.retriever.faqs[:40]:
+            for topic, difficulty in ((faq['topic'], None), (faq['topic'], faq['difficulty']), (None, None)):
+                expected = self.chatbot.answer_question(faq['question'], topic, difficulty, top_k=3)
+                results, is_fallback, degraded = self.chatbot.answer_within_deadline(
+                    faq['question'], topic, difficulty, time.monotonic() + 60, top_k=3
+                )
+                self.assertEqual((results, is_fallback), expected)
+                self.assertFalse(degraded)
+    
+    def test_expired_deadline_degrades(self):
+        """Test an expired deadline returns exact keyword matches, flagged and uncached"""
+        faq = next(faq for faq in self.chatbot.retriever.faqs if faq['keywords'])
+        query = f"{faq['question']} {faq['keywords'][0]}"
+        results, is_fallback, degraded = self.chatbot.answer_within_deadline(
+            query, faq['topic'], None, time.monotonic() - 1, top_k=3
+        )
+        self.assertTrue(degraded)
+        self.assertFalse(is_fallback)
+        exact = dict((item['id'], score) for item, score in self.chatbot.answer_question(query, faq['topic'], top_k=400)[0])
+        for match, score in results:
+            self.assertAlmostEqual(score, exact[match['id']])
+        
+        cached = len(self.chatbot.answer_cache)
+        response, _ = self.chatbot.generate_answer(query, faq['topic'], structured=True, deadline=time.monotonic() - 1)
+        self.assertTrue(response.degraded)
+        self.assertEqual(len(self.chatbot.answer_cache), cached)
+        self.assertGreaterEqual(self.chatbot.get_stats()['deadline']['degraded'], 2)
+    
+    def test_degraded_scores_posting_candidates_only(self):
+        """Test the seeded cost and a degraded answer scoring only posting candidates"""
+        retriever = self.chatbot.retriever
+        self.assertGreater(retriever.full_rank_cost, 0)
+        positions = retriever.partition_positions(None)
+        query = retriever.faqs[0]['question'].split()[0]
+        exact = dict((faq['id'], score) for faq, score in retriever.retrieve(query, top_k=len(retriever.faqs)))
+        
+        cost, retriever.full_rank_cost = retriever.full_rank_cost, 1.0
+        try:
+            before = retriever.stats['deadline_scanned_faqs']
+            results, degraded = retriever.retrieve_by_deadline(query, positions, time.monotonic() + 60, top_k=3)
+            scanned = retriever.stats['deadline_scanned_faqs'] - before
+        finally:
+            retriever.full_rank_cost = cost
+        self.assertTrue(degraded)
+        self.assertTrue(0 < scanned < len(positions))
+        self.assertEqual(len(results), 3)
+        for faq, score in results:
+            self.assertLessEqual(score, exact[faq['id']] + 1e-9)
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test non-interactive batch answering"""
+    
+    def test_parse_query_line(self):
+        """Test plain, TSV and JSON input lines"""
+        self.assertEqual(parse_query_line("প্রশ্ন\n"), {'query': 'প্রশ্ন', 'topic': None, 'difficulty': None})
+        self.assertEqual(
+            parse_query_line("প্রশ্ন\tশিক্ষা\tসহজ"), {'query': 'প্রশ্ন', 'topic': 'শিক্ষা', 'difficulty': 'সহজ'}
+        )
+        self.assertEqual(parse_query_line('{"query": "প্রশ্ন", "topic": "ভ্রমণ"}')['topic'], 'ভ্রমণ')
+        self.assertIsNone(parse_query_line("  \n"))
+        with self.assertRaises(ValueError):
+            parse_query_line('{"topic": "ভ্রমণ"}')
+    
+    def test_ordered_and_pooled_output(self):
+        """Test pooled results match inline results in input order"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=100)
+            lines = [f"শব্দ{i} শব্দ{i + 1}\tশিক্ষা\n" for i in range(40)] + ["{broken\n", "অচেনা\n"]
+            
+            outputs = []
+            for workers in (1, 2):
+                output = io.StringIO()
+                summary = BatchRunner(faq_path, workers=workers, chunk_size=4).run(iter(lines), output)
+                outputs.append([json.loads(line) for line in output.getvalue().splitlines()])
+                self.assertEqual(summary['queries'], 41)
+                self.assertEqual(summary['errors'], 1)
+                self.assertEqual(summary['answered'] + summary['fallbacks'], 41)
+            
+            strip = lambda rows: [{k: v for k, v in row.items() if k != 'latency_ms'} for row in rows]
+            self.assertEqual(strip(outputs[0]), strip(outputs[1]))
+            self.assertEqual([row['line'] for row in outputs[0]], list(range(1, 43)))
+
+
+class TestRelatedQuestionsGraph(unittest.TestCase):
+    """Test the precomputed related-questions graph"""
+    
+    def test_matches_search_and_incremental_update(self):
+        """Test neighbors equal a full-corpus search and updates equal a rebuild"""
+        with tempfile.TemporaryDirectory() as tmp:
+            retriever = FAQRetriever(write_synthetic_faqs(tmp))
+            graph = RelatedQuestionsGraph.build(retriever.index, k=4)
+            
+            for faq in retriever.faqs[:40]:
+                ranked = retriever.retrieve(faq['question'], top_k=len(retriever.faqs))
+                expected = [other['id'] for other, score in ranked if score > 0 and other is not faq][:4]
+                found = [retriever.faqs[pos]['id'] for pos, _ in graph.related(faq['id'])]
+                self.assertEqual(found, expected)
+            
+            # Small blocks are scored over their candidate cells only
+            with mock.patch.object(RelatedQuestionsGraph, 'BLOCK_CELLS', 16):
+                sparse = RelatedQuestionsGraph.build(retriever.index, k=4)
+            self.assertTrue(np.array_equal(sparse.neighbors, graph.neighbors))
+            self.assertTrue(np.array_equal(sparse.scores, graph.scores))
+            
+            faqs = [dict(faq) for faq in retriever.faqs]
+            faqs[3]['question'] = faqs[8]['question']
+            faqs.append(dict(faqs[5], id='syn_new'))
+            index = FAQIndex(faqs)
+            graph.update(index, [3])
+            rebuilt = RelatedQuestionsGraph.build(index, k=4)
+            self.assertTrue(np.array_equal(graph.offsets, rebuilt.offsets))
+            self.assertTrue(np.array_equal(graph.neighbors, rebuilt.neighbors))
+            self.assertEqual(graph.related('syn_new'), rebuilt.related('syn_new'))
+
+
+class TestAutocompleter(unittest.TestCase):
+    """Test prefix autocomplete"""
+    
+    def test_completions_ranked_by_popularity(self):
+        """Test completions match the prefix, stay in the topic and follow popularity"""
+        faqs = [
+            {'id': 'a', 'topic': 'শিক্ষা', 'question': 'পড়াশোনার সময়?', 'keywords': ['পড়া']},
+            {'id': 'b', 'topic': 'শিক্ষা', 'question': 'পড়ার কৌশল কী?', 'keywords': []},
+            {'id': 'c', 'topic': 'স্বাস্থ্য', 'question': 'পানি কতটা পান করব?', 'keywords': ['পানি']},
+        ]
+        completer = Autocompleter(FAQIndex(faqs), popularity={'b': 5})
+        
+        # Equal popularity: database order, then shorter key first
+        self.assertEqual(completer.complete('পড়', 'শিক্ষা'), ['পড়ার কৌশল কী?', 'পড়া', 'পড়াশোনার সময়?'])
+        self.assertEqual(completer.complete('পড়', 'শিক্ষা', limit=1), ['পড়ার কৌশল কী?'])
+        self.assertEqual(completer.complete('পা', 'শিক্ষা'), [])
+        self.assertEqual(completer.complete('  পানি'), ['পানি', 'পানি কতটা পান করব?'])
+        self.assertEqual(completer.complete('পানি '), ['পানি কতটা পান করব?'])
+        self.assertEqual(completer.size(), 5)
+        self.assertGreater(completer.nbytes(), 0)
+
+    def test_refresh_in_background_and_server_popularity(self):
+        """Test the chatbot re-ranks off the request path and the server ranks by query statistics"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=100)
+            stats_path = os.path.join(tmp, 'query_stats.json')
+            chatbot = BanglaFAQChatbot(faq_path, query_stats_path=stats_path)
+            chatbot.AUTOCOMPLETE_REFRESH = 3
+            chatbot.autocomplete("শব্দ")
+            first = chatbot.autocompleter
+            faq = chatbot.retriever.faqs[42]
+            for _ in range(3):
+                chatbot.generate_answer(faq['question'], faq['topic'])
+            chatbot.autocomplete("শব্দ")
+            chatbot.autocomplete_thread.join(10)
+            self.assertIsNot(chatbot.autocompleter, first)
+            prefix = faq['question'][:5]
+            self.assertEqual(chatbot.autocomplete(prefix, faq['topic'], limit=1), [faq['question']])
+            chatbot.close()
+
+            server = PreforkServer(faq_path, workers=1, query_stats_path=stats_path)
+            retriever = FAQRetriever(faq_path)
+            self.assertEqual(server._faq_popularity(retriever), {faq['id']: 3})
+            shared, _, completer = server._load()
+            shared.unlink()
+            self.assertEqual(completer.complete(prefix, faq['topic'], limit=1), [faq['question']])
+
+
+class TestProfiler(unittest.TestCase):
+    """Test on-demand profiling dumps"""
+    
+    def test_profile_dumps_and_memory_growth(self):
+        """Test start/stop writes pstats, collapsed stacks and a tracemalloc diff"""
+        with tempfile.TemporaryDirectory() as tmp:
+            retriever = FAQRetriever(write_synthetic_faqs(tmp, count=300))
+            profiler = Profiler(os.path.join(tmp, 'profiles'))
+            self.assertEqual(profiler.stop(), {})
+            self.assertTrue(profiler.start())
+            self.assertFalse(profiler.start())
+            for i in range(300):
+                retriever.retrieve(f"শব্দ{i % 80} শব্দ{(i * 7) % 80}", top_k=3)
+            grown = [bytearray(1024) for _ in range(500)]
+            paths = profiler.stop()
+            
+            names = [func for _, _, func in pstats.Stats(paths['pstats']).stats]
+            self.assertIn('retrieve', names)
+            with open(paths['folded'], 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertTrue(lines)
+            self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+            with open(paths['memdiff'], 'r', encoding='utf-8') as f:
+                self.assertIn('test_components.py', f.read())
+            self.assertFalse(profiler.get_stats()['running'])
+            
+            self.assertEqual(profiler.snapshot(), [])
+            grown.extend(bytearray(1024) for _ in range(500))
+            growth = profiler.snapshot()
+            self.assertIn('test_components.py', growth[0])
+            self.assertEqual(profiler.stop(), {})
+            self.assertFalse(profiler.get_stats()['tracing_memory'])
+            self.assertEqual(len(grown), 1000)
+
+
+class TestQuantizedVectorIndex(unittest.TestCase):
+    """Test int8 and product-quantized embedding storage"""
+    
+    def test_memory_and_recall(self):
+        """Test quantized indexes are smaller and keep recall, exactly with re-ranking"""
+        rng = np.random.default_rng(1)
+        centers = rng.standard_normal((20, 32)).astype(np.float32)
+        vectors = centers[rng.integers(0, 20, 1500)] + 0.5 * rng.standard_normal((1500, 32)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = vectors[:30]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            exact = QuantizedVectorIndex.build(vectors, 'none')
+            int8 = QuantizedVectorIndex.build(vectors, 'int8')
+            pq = QuantizedVectorIndex.build(vectors, 'pq', os.path.join(tmp, 'vectors.npy'), subspaces=8)
+            
+            self.assertEqual(int8.memory_bytes() * 4 - exact.memory_bytes(), int8.quantizer.nbytes() * 4)
+            self.assertEqual(pq.codes.shape, (1500, 8))
+            self.assertEqual(pq.get_stats()['rerank_file_bytes'], vectors.nbytes)
+            self.assertEqual(recall_at_k(exact, vectors, queries, k=5), 1.0)
+            self.assertGreater(recall_at_k(int8, vectors, queries, k=5), 0.9)
+            self.assertEqual(recall_at_k(pq, vectors, queries, k=5, rerank=200), 1.0)
+            
+            top = pq.search(queries[0], k=3, rerank=200)
+            self.assertEqual(top[0][0], 0)
+            self.assertAlmostEqual(top[0][1], float(vectors[0] @ queries[0]), places=5)
+
+    def test_pq_with_fewer_vectors_than_centroids(self):
+        """Test small training sets only store and use trained centroids"""
+        rng = np.random.default_rng(2)
+        vectors = rng.standard_normal((100, 32)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        pq = QuantizedVectorIndex.build(vectors, 'pq', subspaces=8)
+        self.assertEqual(pq.quantizer.centroids.shape, (8, 100, 4))
+        self.assertTrue(np.allclose(pq.quantizer.decode(pq.codes), vectors, atol=1e-5))
+        # Near-zero vectors would otherwise map to the untrained zero rows
+        self.assertLess(int(pq.quantizer.encode(0.01 * vectors).max()), 100)
+        self.assertEqual(recall_at_k(pq, vectors, vectors[:10], k=1), 1.0)
+
+
+class TestIndexCache(unittest.TestCase):
+    """Test persistent index cache"""
+    
+    def test_cache_hit_stale_and_corrupt(self):
+        """Test cache reuse, invalidation and corruption handling"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=50)
+            cache_dir = os.path.join(tmp, 'cache')
+            
+            first = FAQRetriever(faq_path, cache_dir=cache_dir)
+            self.assertEqual(first.get_stats()['index_cache_misses'], 1)
+            
+            second = FAQRetriever(faq_path, cache_dir=cache_dir)
+            self.assertEqual(second.get_stats()['index_cache_hits'], 1)
+            self.assertEqual(second.retrieve("শব্দ1 শব্দ2", top_k=5), first.retrieve("শব্দ1 শব্দ2", top_k=5))
+            self.assertIsNotNone(second.index.position(second.faqs[0]))
+            
+            # Content change must trigger a rebuild
+            with open(faq_path, 'r', encoding='utf-8') as f:
+                faqs = json.load(f)
+            faqs[0]['question'] = 'সম্পূর্ণ নতুন প্রশ্ন'
+            with open(faq_path, 'w', encoding='utf-8') as f:
+                json.dump(faqs, f, ensure_ascii=False)
+            third = FAQRetriever(faq_path, cache_dir=cache_dir)
+            self.assertEqual(third.get_stats()['index_cache_misses'], 1)
+            self.assertEqual(third.faqs[0]['question'], 'সম্পূর্ণ নতুন প্রশ্ন')
+            
+            # Corrupt payload must trigger a rebuild
+            cache_path = third.cache.cache_path(faq_path)
+            with open(cache_path, 'r+b') as f:
+                f.seek(-10, os.SEEK_END)
+                f.write(b'\x00' * 10)
+            fourth = FAQRetriever(faq_path, cache_dir=cache_dir)
+            self.assertEqual(fourth.get_stats()['index_cache_misses'], 1)
+            self.assertEqual(fourth.get_faq_count(), 50)
+    
+    def test_touched_source_rehashed_once(self):
+        """Test a touched source is validated by hash once, then by mtime again"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=50)
+            cache_dir = os.path.join(tmp, 'cache')
+            FAQRetriever(faq_path, cache_dir=cache_dir)
+            stat = os.stat(faq_path)
+            os.utime(faq_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            
+            with mock.patch.object(IndexCache, 'file_digest', wraps=IndexCache.file_digest) as digest:
+                for _ in range(2):
+                    retriever = FAQRetriever(faq_path, cache_dir=cache_dir)
+                    self.assertEqual(retriever.get_stats()['index_cache_hits'], 1)
+            self.assertEqual(digest.call_count, 1)
+    
+    def test_same_file_name_in_different_directories(self):
+        """Test sources sharing a file name keep separate caches in one cache_dir"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            paths = []
+            for seed in range(2):
+                directory = os.path.join(tmp, f'db{seed}')
+                os.makedirs(directory)
+                paths.append(write_synthetic_faqs(directory, count=40 + seed, seed=seed))
+            self.assertEqual(os.path.basename(paths[0]), os.path.basename(paths[1]))
+            
+            for path in paths:
+                FAQRetriever(path, cache_dir=cache_dir)
+            for seed, path in enumerate(paths):
+                retriever = FAQRetriever(path, cache_dir=cache_dir)
+                self.assertEqual(retriever.get_stats()['index_cache_hits'], 1)
+                self.assertEqual(retriever.get_faq_count(), 40 + seed)
+
+
+class TestTenantRegistry(unittest.TestCase):
+    """Test lazily loaded tenants under a memory budget"""
+    
+    def test_shared_tokens_eviction_and_cache_reload(self):
+        """Test tenants share token strings, cold tenants are evicted and reload from cache"""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {}
+            for seed in range(3):
+                directory = os.path.join(tmp, f'db{seed}')
+                os.makedirs(directory)
+                paths[f'tenant{seed}'] = write_synthetic_faqs(directory, count=200, seed=seed)
+            
+            probe = TenantRegistry()
+            probe.register('tenant0', paths['tenant0'])
+            probe.get('tenant0')
+            size = probe.memory_bytes()
+            probe.close()
+            
+            registry = TenantRegistry(os.path.join(tmp, 'cache'), memory_budget=int(size * 2.5))
+            for tenant_id, path in paths.items():
+                registry.register(tenant_id, path)
+            with self.assertRaises(KeyError):
+                registry.get('unknown')
+            
+            first, second = registry.get('tenant0'), registry.get('tenant1')
+            token = first.retriever.index.vocabulary.tokens[0]
+            other = second.retriever.index.vocabulary
+            self.assertIs(other.tokens[other.ids[token]], token)
+            
+            expected = BanglaFAQChatbot(paths['tenant2']).generate_answer("শব্দ1 শব্দ2", None)
+            self.assertEqual(registry.generate_answer('tenant2', "শব্দ1 শব্দ2", None), expected)
+            self.assertEqual(registry.get_stats()['loaded'], ['tenant1', 'tenant2'])
+            self.assertLessEqual(registry.memory_bytes(), registry.memory_budget)
+            
+            registry.get('tenant0')
+            stats = registry.get_stats()
+            self.assertEqual(stats['loaded'], ['tenant2', 'tenant0'])
+            self.assertEqual((stats['loads'], stats['evictions'], stats['cache_reloads']), (4, 2, 1))
+
+            # The pool holds exactly the loaded tenants' tokens
+            in_use = set()
+            for tenant_id in stats['loaded']:
+                index = registry.get(tenant_id).retriever.index
+                in_use.update(index.vocabulary.tokens)
+                in_use.update(index.keyword_postings)
+            self.assertEqual(set(registry.token_pool.tokens), in_use)
+            self.assertGreater(stats['pruned_tokens'], 0)
+            registry.close()
+
+    def test_concurrent_first_queries_load_once(self):
+        """Test concurrent first queries to one tenant build a single chatbot"""
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = TenantRegistry()
+            registry.register('tenant0', write_synthetic_faqs(tmp, count=200))
+            barrier = threading.Barrier(4)
+            chatbots = []
+
+            def query():
+                barrier.wait()
+                chatbots.append(registry.get('tenant0'))
+
+            threads = [threading.Thread(target=query) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(chatbots), 4)
+            self.assertTrue(all(chatbot is chatbots[0] for chatbot in chatbots))
+            stats = registry.get_stats()
+            self.assertEqual((stats['loads'], stats['hits']), (1, 3))
+            registry.close()
+
+
+class TestSharedIndex(unittest.TestCase):
+    """Test shared-memory index and pre-fork server"""
+    
+    def test_rank_matches_retriever(self):
+        """Test shared index ranking and answers match the in-process path"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=300)
+            retriever = FAQRetriever(faq_path)
+            chatbot = BanglaFAQChatbot(faq_path)
+            shared = SharedIndex.build(retriever.index)
+            try:
+                self.assertEqual(shared.faq(7), retriever.faqs[7])
+                service = SharedIndexService(shared, chatbot.router)
+                rng = random.Random(3)
+                for _ in range(100):
+                    query = ' '.join(f"শব্দ{rng.randint(0, 90)}" for _ in range(rng.randint(1, 5)))
+                    topic = rng.choice(list(MetadataFilter.VALID_TOPICS))
+                    candidates = retriever.get_topic_faqs([topic])
+                    expected = [
+                        (retriever.index.position(faq), score)
+                        for faq, score in retriever.retrieve(query, candidates, top_k=5, mode='exact')
+                    ]
+                    self.assertEqual(shared.rank(query, shared.candidate_mask([topic]), top_k=5), expected)
+                    
+                    response, is_fallback = chatbot.generate_answer(query, topic)
+                    answer = service.answer(query, topic)
+                    self.assertEqual((answer['response'], answer['is_fallback']), (response, is_fallback))
+                
+                with self.assertRaises(RuntimeError):
+                    service.profile('start')
+                service.profiler = Profiler(os.path.join(tmp, 'profiles'))
+                self.assertTrue(service.profile('start')['started'])
+                service.answer("শব্দ1 শব্দ2", None)
+                self.assertTrue(os.path.exists(service.profile('stop')['dumps']['pstats']))
+            finally:
+                shared.unlink()
+    
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires fork")
+    def test_prefork_server(self):
+        """Test workers answer, restart after a crash and reload on SIGHUP"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=100)
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'src.server', '--faqs', faq_path, '--port', '0', '--workers', '2'],
+                cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+            try:
+                line = process.stdout.readline()
+                while line and 'http://' not in line:
+                    line = process.stdout.readline()
+                base = line.split('http://')[1].split()[0]
+                
+                def get(path):
+                    with urllib.request.urlopen(f"http://{base}{path}", timeout=10) as response:
+                        return json.loads(response.read().decode('utf-8'))
+                
+                query = urllib.parse.quote("শব্দ1 শব্দ2")
+                answer = get(f"/answer?q={query}&top_k=3")
+                self.assertIn('is_fallback', answer)
+                stats = get('/stats')
+                self.assertEqual(stats['index']['faqs'], 100)
+                suggestions = get(f"/suggest?q={urllib.parse.quote('শব্দ1')}&limit=3")['suggestions']
+                self.assertTrue(0 < len(suggestions) <= 3)
+                self.assertTrue(all(text.startswith('শব্দ1') for text in suggestions))
+                self.assertFalse(get('/admin/profile?action=status')['profiler']['running'])
+                
+                os.kill(stats['pid'], signal.SIGKILL)
+                self.assertEqual(process.stdout.readline().split()[1], 'Worker')
+                self.assertEqual(get('/health')['status'], 'ok')
+                
+                process.send_signal(signal.SIGHUP)
+                self.assertIn('generation 1', process.stdout.readline())
+                self.assertEqual(get('/health')['generation'], 1)
+                self.assertEqual(get(f"/answer?q={query}&top_k=3"), answer)
+                # Replacement workers map only the new index
+                reloaded = get('/stats')
+                self.assertNotEqual(reloaded['index']['name'], stats['index']['name'])
+                if os.path.exists(f"/proc/{reloaded['pid']}/maps"):
+                    with open(f"/proc/{reloaded['pid']}/maps") as f:
+                        maps = f.read()
+                    self.assertIn(reloaded['index']['name'], maps)
+                    self.assertNotIn(stats['index']['name'], maps)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+                process.stdout.close()
+            self.assertEqual(process.returncode, 0)
+
+
+class TestShardCoordinator(unittest.TestCase):
+    """Test scatter-gather over shard server processes"""
+    
+    @staticmethod
+    def start_shard(faq_path):
+        """Start a one-worker shard server and return (process, base URL)"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'src.server', '--faqs', faq_path, '--port', '0', '--workers', '1'],
+            cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, start_new_session=True
+        )
+        line = process.stdout.readline()
+        while line and 'http://' not in line:
+            line = process.stdout.readline()
+        return process, 'http://' + line.split('http://')[1].split()[0]
+    
+    @unittest.skipUnless(hasattr(os, 'fork'), "requires fork")
+    def test_merge_failover_and_partial_results(self):
+        """Test merged shard results equal one node, with a dead replica and a dead shard"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=300)
+            shard_paths = split_faqs(faq_path, 3, os.path.join(tmp, 'shards'))
+            with socket.socket() as probe:
+                probe.bind(('127.0.0.1', 0))
+                dead = f"http://127.0.0.1:{probe.getsockname()[1]}"
+            
+            processes, urls = [], []
+            try:
+                for path in shard_paths:
+                    process, url = self.start_shard(path)
+                    processes.append(process)
+                    urls.append(url)
+                coordinator = ShardCoordinator([[dead, urls[0]], [urls[1]], [urls[2]]], timeout=5.0)
+                local = BanglaFAQChatbot(faq_path)
+                chatbot = BanglaFAQChatbot(faq_path, coordinator=coordinator)
+                
+                rng = random.Random(5)
+                for _ in range(30):
+                    query = ' '.join(f"শব্দ{rng.randint(0, 90)}" for _ in range(rng.randint(1, 5)))
+                    topic = rng.choice(list(MetadataFilter.VALID_TOPICS))
+                    self.assertEqual(
+                        chatbot.answer_question(query, topic, top_k=5),
+                        local.answer_question(query, topic, top_k=5)
+                    )
+                stats = coordinator.get_stats()
+                self.assertEqual(stats['failovers'], 30)
+                self.assertNotIn('partial', stats)
+                
+                # Kill the whole shard, master and worker
+                os.killpg(processes[2].pid, signal.SIGKILL)
+                processes[2].wait(timeout=10)
+                results, missing = coordinator.search('শব্দ1 শব্দ2', top_k=300)
+                self.assertEqual(missing, [2])
+                self.assertTrue(results)
+                self.assertLess(len(results), 300)
+                chatbot.close()
+            finally:
+                for process in processes:
+                    process.terminate()
+                    process.wait(timeout=10)
+                    process.stdout.close()
+
+    def test_coordinator_only_does_not_cache_partial_answers(self):
+        """Test a chatbot without local FAQs, whose shard answers are all partial"""
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            dead = f"http://127.0.0.1:{probe.getsockname()[1]}"
+        coordinator = ShardCoordinator([[dead]], timeout=1.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            stats_path = os.path.join(tmp, 'query_stats.json')
+            chatbot = BanglaFAQChatbot(None, coordinator=coordinator, query_stats_path=stats_path)
+            try:
+                self.assertIsNone(chatbot.retriever)
+                for _ in range(2):
+                    chatbot.generate_answer("ভ্রমণ ভিসা কি?", "ভ্রমণ")
+                self.assertEqual(coordinator.stats['queries'], 2)
+                self.assertEqual(len(chatbot.answer_cache), 0)
+                self.assertNotIn('total_faqs', chatbot.get_stats())
+                with self.assertRaises(RuntimeError):
+                    chatbot.autocomplete("ফি")
+            finally:
+                chatbot.close()
+            
+            # Pre-warming at startup does not cache partial answers either
+            coordinator = ShardCoordinator([[dead]], timeout=1.0)
+            restarted = BanglaFAQChatbot(None, coordinator=coordinator, query_stats_path=stats_path)
+            try:
+                self.assertTrue(restarted.wait_prewarmed(10))
+                self.assertEqual(coordinator.stats['queries'], 1)
+                self.assertEqual(len(restarted.answer_cache), 0)
+                self.assertNotIn('prewarmed', restarted.cache_stats)
+            finally:
+                restarted.close()
+        with self.assertRaises(ValueError):
+            BanglaFAQChatbot(None)
+
+
+class TestVoiceHandler(unittest.TestCase):
+    """Test voice pipeline with offline backends"""
+    
+    def setUp(self):
+        """Set up handler with stand-in backends"""
+        self.player = RecordingPlayer()
+        self.voice = VoiceHandler(
+            tts_backend=TextTTSBackend(),
+            recognizer=ScriptedRecognizer(["প্রথম", "দ্বিতীয়"]),
+            player=self.player
+        )
+    
+    def tearDown(self):
+        """Stop workers"""
+        self.voice.close()
+    
+    def test_speak_async_keeps_order(self):
+        """Test queued speech plays in submission order"""
+        futures = [self.voice.speak_async(f"বাক্য {i}") for i in range(5)]
+        self.assertTrue(all(future.result(timeout=5) for future in futures))
+        self.assertEqual(self.player.played, [f"বাক্য {i}".encode('utf-8') for i in range(5)])
+        self.assertTrue(self.voice.speak("শেষ"))
+    
+    def test_no_recognition_during_playback(self):
+        """Test the voice turn listener pauses while an answer is being spoken"""
+        class SlowPlayer(RecordingPlayer):
+            playing = False
+
+            def play(self, audio, audio_format):
+                SlowPlayer.playing = True
+                time.sleep(0.05)
+                super().play(audio, audio_format)
+                SlowPlayer.playing = False
+
+        class OverhearingRecognizer(ScriptedRecognizer):
+            overheard = 0
+
+            def listen(self, timeout=10):
+                if SlowPlayer.playing:
+                    OverhearingRecognizer.overheard += 1
+                time.sleep(0.01)
+                return super().listen(timeout)
+
+        class EchoChatbot:
+            def generate_answer(self, query, topic, difficulty=None):
+                return f"{query} প্রথম বাক্য। {query} দ্বিতীয় বাক্য।", False
+
+        voice = VoiceHandler(
+            tts_backend=TextTTSBackend(),
+            recognizer=OverhearingRecognizer([f"প্রশ্ন {i}" for i in range(4)] + ["বন্ধ"]),
+            player=SlowPlayer()
+        )
+        try:
+            turns = VoiceTurnPipeline(voice, EchoChatbot()).run()
+        finally:
+            voice.close()
+        self.assertEqual([turn['query'] for turn in turns], [f"প্রশ্ন {i}" for i in range(4)])
+        self.assertTrue(all(turn['played'] for turn in turns))
+        self.assertEqual(OverhearingRecognizer.overheard, 0)
+
+    def test_listening_overlaps_retrieval(self):
+        """Test the next question is listened for while the current one is answered"""
+        events = []
+
+        class TimedRecognizer(ScriptedRecognizer):
+            def listen(self, timeout=10):
+                start = time.perf_counter()
+                time.sleep(0.01)
+                text = super().listen(timeout)
+                events.append(('listen', start, time.perf_counter()))
+                return text
+
+        class SlowChatbot:
+            def generate_answer(self, query, topic, difficulty=None):
+                start = time.perf_counter()
+                time.sleep(0.1)
+                events.append(('answer', start, time.perf_counter()))
+                return f"{query} উত্তর।", False
+
+        voice = VoiceHandler(
+            tts_backend=TextTTSBackend(),
+            recognizer=TimedRecognizer([f"প্রশ্ন {i}" for i in range(3)] + ["বন্ধ"]),
+            player=RecordingPlayer()
+        )
+        try:
+            turns = VoiceTurnPipeline(voice, SlowChatbot()).run()
+        finally:
+            voice.close()
+        self.assertEqual(len(turns), 3)
+        listens = [(start, end) for stage, start, end in events if stage == 'listen']
+        answers = [(start, end) for stage, start, end in events if stage == 'answer']
+        self.assertTrue(any(
+            l_start < a_end and a_start < l_end
+            for l_start, l_end in listens for a_start, a_end in answers
+        ))
+
+    def test_recognize(self):
+        """Test recognition through the pipeline"""
+        self.assertEqual(self.voice.recognize(), "প্রথম")
+        self.assertEqual(self.voice.recognize_async().result(timeout=5), "দ্বিতীয়")
+        self.assertEqual(self.voice.recognize(), "")
+
+
+class TestAudioCache(unittest.TestCase):
+    """Test pre-synthesized TTS audio cache"""
+    
+    def test_prerender_and_playback_from_cache(self):
+        """Test pre-rendered answers play without synthesis"""
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = write_synthetic_faqs(tmp, count=20)
+            cache_dir = os.path.join(tmp, 'audio')
+            summary = prerender_faq_answers(faq_path, cache_dir, engine='text', workers=2)
+            self.assertEqual(summary['rendered'], 20)
+            
+            class CountingTTS(TextTTSBackend):
+                calls = 0
+                
+                def synthesize(self, text):
+                    CountingTTS.calls += 1
+                    return super().synthesize(text)
+            
+            player = RecordingPlayer()
+            voice = VoiceHandler(tts_backend=CountingTTS(), player=player, audio_cache=AudioCache(cache_dir))
+            try:
+                with open(faq_path, 'r', encoding='utf-8') as f:
+                    faq = json.load(f)[0]
+                response = ResponseGenerator.format_response_with_context(
+                    faq['answer'], faq['topic'], faq['difficulty'], 0.9
+                )
+                self.assertTrue(voice.speak(response))
+                self.assertEqual(CountingTTS.calls, 0)
+                self.assertEqual(player.played, [faq['answer'].encode('utf-8')])
+                self.assertTrue(voice.speak("নতুন বাক্য"))
+                self.assertEqual(CountingTTS.calls, 1)
+            finally:
+                voice.close()
+    
+    def test_size_bounded_eviction(self):
+        """Test least recently used entries are evicted"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AudioCache(tmp, max_bytes=25)
+            cache._entries = lambda: self.fail("directory scanned after startup")
+            backend = TextTTSBackend()
+            for i in range(5):
+                cache.put(f"text {i}", backend, b'x' * 10)
+            self.assertIsNotNone(cache.get("text 3", backend))
+            cache.put("text 5", backend, b'x' * 10)
+            stats = cache.get_stats()
+            self.assertLessEqual(stats['bytes'], 25)
+            self.assertEqual(stats['entries'], 2)
+            self.assertIsNotNone(cache.get("text 3", backend))
+            self.assertIsNone(cache.get("text 4", backend))
+
+            reopened = AudioCache(tmp, max_bytes=25)
+            self.assertEqual((reopened.total_bytes(), reopened.get_stats()['entries']), (20, 2))
 
 
 class TestChatbot(unittest.TestCase):
@@ -124,6 +1283,88 @@ class TestChatbot(unittest.TestCase):
                 self.assertIsInstance(is_fallback, bool)
             except FileNotFoundError:
                 self.skipTest("FAQ file not found")
+    
+    def test_answer_without_topic(self):
+        """Test topic-less questions are routed to a partition"""
+        if os.path.exists(self.faq_path):
+            chatbot = BanglaFAQChatbot(self.faq_path)
+            faq = chatbot.retriever.get_all_faqs()[0]
+            results, is_fallback = chatbot.answer_question(faq['question'], None)
+            self.assertFalse(is_fallback)
+            self.assertEqual(results[0][0]['id'], faq['id'])
+            self.assertEqual(chatbot.route_topics(faq['question']), [faq['topic']])
+    
+    def test_heavy_hitters_prewarmed(self):
+        """Test recorded frequent questions are answered into the cache at startup"""
+        if os.path.exists(self.faq_path):
+            with tempfile.TemporaryDirectory() as tmp:
+                stats_path = os.path.join(tmp, 'query_stats.json')
+                chatbot = BanglaFAQChatbot(self.faq_path, query_stats_path=stats_path)
+                expected = chatbot.generate_answer("পানি পান", "স্বাস্থ্য")
+                chatbot.generate_answer("পানি পান", "স্বাস্থ্য")
+                self.assertEqual(chatbot.get_stats()['answer_cache']['hits'], 1)
+                chatbot.close()
+                
+                restarted = BanglaFAQChatbot(self.faq_path, query_stats_path=stats_path)
+                self.assertTrue(restarted.wait_prewarmed(10))
+                self.assertEqual(restarted.get_stats()['answer_cache']['prewarmed'], 1)
+                self.assertEqual(restarted.generate_answer("পানি পান", "স্বাস্থ্য"), expected)
+                self.assertEqual(restarted.get_stats()['answer_cache']['hits'], 1)
+    
+    def test_related_questions(self):
+        """Test related questions exclude the FAQ itself and are cached"""
+        if os.path.exists(self.faq_path):
+            with tempfile.TemporaryDirectory() as tmp:
+                chatbot = BanglaFAQChatbot(self.faq_path, cache_dir=tmp)
+                faq = chatbot.retriever.get_all_faqs()[0]
+                related = chatbot.related_questions(faq['id'])
+                self.assertLessEqual(len(related), 3)
+                self.assertNotIn(faq['id'], [other['id'] for other in related])
+                
+                restarted = BanglaFAQChatbot(self.faq_path, cache_dir=tmp)
+                self.assertEqual(restarted.related_questions(faq['id']), related)
+                self.assertEqual(restarted.related_questions('missing'), [])
+    
+    def test_voice_turn_pipeline(self):
+        """Test recognized questions are answered and spoken sentence by sentence"""
+        if os.path.exists(self.faq_path):
+            chatbot = BanglaFAQChatbot(self.faq_path)
+            player = RecordingPlayer()
+            voice = VoiceHandler(
+                tts_backend=TextTTSBackend(),
+                recognizer=ScriptedRecognizer(["পানি পান", "xyz", "বন্ধ", "শোনা হবে না"]),
+                player=player
+            )
+            try:
+                turns = VoiceTurnPipeline(voice, chatbot, topic='স্বাস্থ্য').run()
+            finally:
+                voice.close()
+            
+            self.assertEqual([turn['query'] for turn in turns], ["পানি পান", "xyz"])
+            self.assertFalse(turns[0]['is_fallback'])
+            self.assertTrue(turns[1]['is_fallback'])
+            self.assertGreater(turns[0]['chunks'], 1)
+            for turn in turns:
+                self.assertTrue(turn['played'])
+                self.assertLessEqual(turn['first_audio_ms'], turn['total_ms'])
+            spoken = b' '.join(player.played[:turns[0]['chunks']]).decode('utf-8')
+            self.assertEqual(spoken, ResponseGenerator.speech_text(turns[0]['response']))
+    
+    def test_stream_answer(self):
+        """Test streamed answers join to the detailed response"""
+        if os.path.exists(self.faq_path):
+            chatbot = BanglaFAQChatbot(self.faq_path)
+            topic = 'স্বাস্থ্য'
+            results, is_fallback = chatbot.answer_question("পানি পান", topic, top_k=3)
+            self.assertFalse(is_fallback)
+            expected = ResponseGenerator.generate_detailed_response(results, top_k=3)
+            self.assertEqual(''.join(chatbot.stream_answer("পানি পান", topic)), expected)
+            chunks = list(chatbot.stream_answer("পানি পান", topic, sentence_chunks=True))
+            self.assertEqual(''.join(chunks), expected)
+            self.assertEqual(
+                list(chatbot.stream_answer("xyz", topic)),
+                [ResponseGenerator.get_fallback_response(topic)]
+            )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,42 @@
+"""Performance regression tier (opt-in: PERF_TESTS=1)"""
+
+import os
+import unittest
+
+from benchmarks.perf_gate import measure, compare, load_baseline
+
+
+class TestPerformanceGate(unittest.TestCase):
+    """Test the regression comparison against a baseline"""
+    
+    def test_compare_flags_regressions(self):
+        """Test slowdowns and allocation growth beyond tolerance are reported"""
+        baseline = {
+            'tolerance': {'ops_per_sec': 0.3, 'peak_kb': 0.25},
+            'workloads': {
+                'retrieve': {'normalized': 10.0, 'peak_kb': 400.0},
+                'tokenize': {'normalized': 800.0, 'peak_kb': 4.0}
+            }
+        }
+        current = {'workloads': {
+            'retrieve': {'normalized': 7.5, 'peak_kb': 480.0},
+            'tokenize': {'normalized': 500.0, 'peak_kb': 6.0}
+        }}
+        messages = compare(current, baseline)
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(all(message.startswith('tokenize') for message in messages))
+        self.assertEqual(compare({'workloads': {}}, baseline), ['retrieve: workload missing', 'tokenize: workload missing'])
+
+
+@unittest.skipUnless(os.environ.get('PERF_TESTS'), "set PERF_TESTS=1 to run the performance tier")
+class TestPerformanceBaseline(unittest.TestCase):
+    """Test throughput and peak allocations stay within the checked-in baseline"""
+    
+    def test_within_baseline(self):
+        """Test no workload regressed (refresh: python3 benchmarks/perf_gate.py --refresh)"""
+        regressions = compare(measure(), load_baseline())
+        self.assertEqual(regressions, [], '\n'.join(regressions))
+
+
+if __name__ == '__main__':
+    unittest.main()